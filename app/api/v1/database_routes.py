@@ -12,6 +12,9 @@ from app.database.models import (
     SavedParagraphCreate, SavedParagraphResponse,
     LearnedVocabsCreate, LearnedVocabsCreateInternal, LearnedVocabsResponse
 )
+from app.utils.logging_conf import get_logger
+
+logger = get_logger("database_routes")
 
 router = APIRouter(prefix="/db", tags=["Database"])
 
@@ -120,15 +123,14 @@ async def create_input_history(history_data: InputHistoryCreate, response: Respo
     
     learned_vocabs_crud = get_learned_vocabs_crud()
     
-    # Debug: Log the incoming request
-    print(f"🔍 DEBUG: Checking for duplicate vocabs {history_data.words} for user {user_id}")
+    logger.debug("Checking for duplicate vocabs %s for user %s", history_data.words, user_id)
     
     # Check if learned vocabs with same words already exists for this user
     existing_vocabs = await learned_vocabs_crud.find_by_exact_vocabs(user_id, history_data.words)
     
     if existing_vocabs:
         # Return existing vocabs as InputHistoryResponse format for backward compatibility
-        print(f"✅ DEBUG: Found existing learned vocabs with ID {existing_vocabs.id}")
+        logger.debug("Found existing learned vocabs %s", existing_vocabs.id)
         response.status_code = status.HTTP_200_OK
         return InputHistoryResponse(
             id=existing_vocabs.id,
@@ -137,8 +139,7 @@ async def create_input_history(history_data: InputHistoryCreate, response: Respo
             created_at=existing_vocabs.created_at
         )
     
-    # Debug: Log that we're creating new entry
-    print(f"🆕 DEBUG: No duplicate found, creating new learned vocabs entry")
+    logger.debug("No duplicate found, creating new learned vocabs entry")
     
     # Create learned vocabs data with user_id from token
     vocabs_create_data = LearnedVocabsCreateInternal(
@@ -205,7 +206,7 @@ async def create_saved_paragraph(paragraph_data: SavedParagraphCreate):
             detail="Input history not found"
         )
     
-    paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data)
+    paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data, str(history.user_id))
     return SavedParagraphResponse(**paragraph.dict())
 
 @router.get("/saved-paragraphs/{paragraph_id}", response_model=SavedParagraphResponse)
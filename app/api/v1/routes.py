@@ -1,16 +1,21 @@
 from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from app.api.v1 import schemas
 from app.api.v1.database_routes import router as db_router
-from app.services.openai_client import OpenAIClient
-from app.services.gemini_client import GeminiClient
-from app.services.claude_client import ClaudeClient
 from app.services.google_auth import google_auth_service
+from app.services.llm_registry import llm_registry, ProviderUnavailableError, UnknownProviderError
+from app.services.generation_cache import generation_cache, make_cache_key
+from app.services.token_cache import revoke_user_tokens, token_revocations, verified_token_cache
+from app.core.config import settings
 from app.database.crud import get_user_crud, get_refresh_token_crud
 from app.database.models import GoogleUserCreate, RefreshTokenCreate
+from app.database.pagination import InvalidCursorError, keyset_page, page_size
 from app.utils.logging_conf import get_logger
 from typing import Optional
-from datetime import datetime
+from datetime import datetime, timezone
 from bson import ObjectId
+import json
+import re
 
 logger = get_logger("routes")
 router = APIRouter(prefix="/api/v1", tags=["v1"])
@@ -18,46 +23,33 @@ router = APIRouter(prefix="/api/v1", tags=["v1"])
 # Include database routes
 router.include_router(db_router)
 
-gemini_client = GeminiClient()
-openai_client = OpenAIClient()
-claude_client = ClaudeClient()
-
 # === Google Authentication ===
 @router.post("/auth/google/login", response_model=schemas.GoogleLoginResponse)
-async def google_login(req: schemas.GoogleLoginRequest):
+async def google_login(req: schemas.GoogleLoginRequest, origin: Optional[str] = Header(None)):
     """
     Handle Google OAuth login using authorization code from React app
+    
+    The redirect URI is the one in the request, else the one that worked before for
+    the request's Origin; see GoogleAuthService.exchange_code.
     """
     try:
-        logger.info(f"🔄 Starting Google login with code: {req.authorization_code[:20]}...")
-        
-        # Try different redirect URIs that might have been used
-        redirect_uris_to_try = [
-            "http://localhost:5173",  # Vite default
-            "http://localhost:3000",  # React default  
-            "postmessage",            # For popup mode
-            "urn:ietf:wg:oauth:2.0:oob"  # For desktop/mobile
-        ]
+        logger.debug("Starting Google login for origin %s", origin)
         
         auth_result = None
         last_error = None
         
-        for redirect_uri in redirect_uris_to_try:
-            try:
-                logger.info(f"🔄 Trying redirect_uri: {redirect_uri}")
-                auth_result = await google_auth_service.exchange_code_for_tokens(
-                    req.authorization_code, 
-                    redirect_uri
-                )
-                logger.info(f"✅ Success with redirect_uri: {redirect_uri}")
-                break
-            except Exception as e:
-                logger.warning(f"❌ Failed with redirect_uri {redirect_uri}: {str(e)}")
-                last_error = e
-                continue
+        try:
+            auth_result = await google_auth_service.exchange_code(
+                req.authorization_code,
+                origin=origin,
+                redirect_uri=req.redirect_uri
+            )
+        except Exception as e:
+            logger.warning("Code exchange failed for origin %s: %s", origin, e)
+            last_error = e
         
         if not auth_result:
-            error_message = str(last_error) if last_error else "All redirect_uri attempts failed"
+            error_message = str(last_error) if last_error else "Authorization code exchange failed"
             
             # Check for specific Google errors and return appropriate HTTP status
             if "invalid_grant" in error_message.lower():
@@ -91,66 +83,22 @@ async def google_login(req: schemas.GoogleLoginRequest):
         user_crud = get_user_crud()
         refresh_token_crud = get_refresh_token_crud()
         
-        # Check if user already exists
-        existing_user = await user_crud.get_user_by_google_id(user_info.get("id"))
-        
-        if existing_user:
-            # Update existing user with latest info
-            updated_user = await user_crud.update_google_user(user_info.get("id"), user_info)
-            user_db = updated_user
-            logger.info(f"🔄 Updated existing Google user: {user_info.get('email')}")
-        else:
-            # Create new user
-            google_user_data = GoogleUserCreate(
-                google_id=user_info.get("id"),
-                name=user_info.get("name"),
-                email=user_info.get("email"),
-                picture=user_info.get("picture"),
-                verified_email=user_info.get("verified_email")
-            )
-            user_db = await user_crud.create_google_user(google_user_data)
-            logger.info(f"✅ Created new Google user: {user_info.get('email')}")
-        
-        # Check if user has a default vocabulary collection, create one if not
-        from app.database.crud import get_vocab_collection_crud
-        from app.database.models import VocabCollectionCreate, UserUpdate
-        
-        vocab_collection_crud = get_vocab_collection_crud()
-        user_collections = await vocab_collection_crud.get_user_vocab_collections(str(user_db.id))
-        
-        if not user_collections:
-            # Create default "Default" collection for new user
-            default_collection_data = VocabCollectionCreate(
-                name="Default",
-                user_id=str(user_db.id)
-            )
-            default_collection = await vocab_collection_crud.create_vocab_collection(default_collection_data)
-            logger.info(f"📚 Created default vocabulary collection for user: {user_db.email} (Collection ID: {default_collection.id})")
-            
-            # Set the selected_collection_id to the default collection
-            update_data = UserUpdate(
-                name=None,
-                email=None,
-                avt=None
-            )
-            await user_crud.collection.update_one(
-                {"_id": ObjectId(str(user_db.id))},
-                {"$set": {"selected_collection_id": str(default_collection.id)}}
-            )
-            logger.info(f"📚 Set selected_collection_id to default collection for user: {user_db.email}")
-        else:
-            logger.info(f"📚 User {user_db.email} already has {len(user_collections)} vocabulary collection(s)")
-            
-            # If user doesn't have selected_collection_id set, set it to the first collection
-            if not user_db.selected_collection_id:
-                await user_crud.collection.update_one(
-                    {"_id": ObjectId(str(user_db.id))},
-                    {"$set": {"selected_collection_id": str(user_collections[0].id)}}
-                )
-                logger.info(f"📚 Set selected_collection_id to first collection for user: {user_db.email}")
+        # Create or update the user in one upsert
+        google_user_data = GoogleUserCreate(
+            google_id=user_info.get("id"),
+            name=user_info.get("name"),
+            email=user_info.get("email"),
+            picture=user_info.get("picture"),
+            verified_email=user_info.get("verified_email")
+        )
+        user_db, created = await user_crud.upsert_google_user(google_user_data)
+        logger.debug("%s Google user %s", "Created" if created else "Updated", user_db.id)
         
-        # Fetch updated user to get the selected_collection_id
-        user_db = await user_crud.get_user_by_id(str(user_db.id))
+        # Make sure the user has a selected vocabulary collection ("Default" for new users);
+        # returning users already have one and skip this
+        if not user_db.selected_collection_id:
+            user_db = await user_crud.ensure_selected_collection(user_db, created)
+            logger.debug("Set selected_collection_id to %s for user %s", user_db.selected_collection_id, user_db.id)
         
         # Create JWT token for our application (using database user ID)
         jwt_user_data = {
@@ -174,9 +122,8 @@ async def google_login(req: schemas.GoogleLoginRequest):
             refresh_token=jwt_refresh_token
         )
         await refresh_token_crud.create_refresh_token(refresh_token_data)
-        logger.info(f"💾 Saved JWT refresh token for user: {user_db.email}")
         
-        logger.info(f"✅ User {user_info.get('email')} logged in successfully")
+        logger.info("User %s logged in with Google (new user: %s)", user_db.id, created)
         
         return schemas.GoogleLoginResponse(
             jwt_token=jwt_token,
@@ -200,17 +147,14 @@ async def debug_token_exchange(req: schemas.GoogleLoginRequest):
     Debug endpoint to test token exchange with detailed logging
     """
     try:
-        logger.info(f"🐛 DEBUG: Starting token exchange debug")
-        logger.info(f"🐛 Authorization code length: {len(req.authorization_code)}")
-        logger.info(f"🐛 Code starts with: {req.authorization_code[:10]}...")
-        
-        # Get service config
-        logger.info(f"🐛 Client ID: {google_auth_service.client_id[:20]}..." if google_auth_service.client_id else "🐛 NO CLIENT ID")
-        logger.info(f"🐛 Client Secret: {'SET' if google_auth_service.client_secret else 'NOT SET'}")
-        logger.info(f"🐛 Redirect URI: {google_auth_service.redirect_uri}")
+        # Lengths and flags only: the code and the client credentials never go to the logs
+        logger.debug("Debug token exchange: code length %d", len(req.authorization_code))
+        logger.debug("Client ID set: %s, client secret set: %s, redirect URI: %s",
+                     bool(google_auth_service.client_id), bool(google_auth_service.client_secret),
+                     google_auth_service.redirect_uri)
         
         # Try the exchange
-        auth_result = await google_auth_service.exchange_code_for_tokens(req.authorization_code)
+        auth_result = await google_auth_service.exchange_code_for_tokens(req.authorization_code, req.redirect_uri)
         
         return {
             "status": True,
@@ -225,7 +169,7 @@ async def debug_token_exchange(req: schemas.GoogleLoginRequest):
         }
         
     except Exception as e:
-        logger.exception("🐛 DEBUG: Token exchange failed")
+        logger.exception("Debug token exchange failed")
         
         error_message = str(e)
         if "invalid_grant" in error_message.lower():
@@ -374,7 +318,7 @@ async def renew_jwt_token(req: schemas.RenewJWTRequest):
         # Create new JWT token with updated user data
         new_jwt_token = google_auth_service.create_jwt_token(user_data)
         
-        logger.info(f"✅ JWT token renewed for user: {user_data.get('email')}")
+        logger.info("JWT token renewed for user %s", user_data.get("user_id") or user_data.get("id"))
         
         return schemas.RenewJWTResponse(
             status=True,
@@ -460,7 +404,13 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
         })
     
     token = authorization.split(" ")[1]
-    user_data = google_auth_service.verify_jwt_token(token)
+    
+    # Skip the decode + HMAC check for a token verified earlier
+    user_data = verified_token_cache.get(token) if settings.TOKEN_CACHE_ENABLED else None
+    if user_data is None:
+        user_data = google_auth_service.verify_jwt_token(token)
+        if user_data and settings.TOKEN_CACHE_ENABLED:
+            verified_token_cache.put(token, user_data)
     
     if not user_data:
         raise HTTPException(status_code=401, detail={
@@ -468,12 +418,20 @@ async def get_current_user(authorization: Optional[str] = Header(None)):
             "message": "Token is invalid or expired"
         })
     
-    return user_data
+    if token_revocations.is_revoked(user_data):
+        raise HTTPException(status_code=401, detail={
+            "error": "token_revoked",
+            "message": "Token was revoked by a logout"
+        })
+    
+    # Copy, so a route changing the claims does not change the cached entry
+    return dict(user_data)
 
 @router.post("/auth/logout", response_model=schemas.LogoutResponse)
 async def logout(current_user: dict = Depends(get_current_user)):
     """
-    Logout user by deleting all JWT refresh tokens from database
+    Logout user by deleting all JWT refresh tokens from database and revoking
+    the access tokens issued so far
     Requires Bearer token in Authorization header
     """
     try:
@@ -489,7 +447,10 @@ async def logout(current_user: dict = Depends(get_current_user)):
         # Delete all refresh tokens for this user
         deleted_count = await refresh_token_crud.delete_user_refresh_tokens(user_id)
         
-        logger.info(f"🚪 User {current_user.get('email')} logged out. Deleted {deleted_count} refresh tokens.")
+        # Reject the user's access tokens issued so far (other workers sync within seconds)
+        await revoke_user_tokens(user_id)
+        
+        logger.info("User %s logged out, deleted %d refresh tokens", user_id, deleted_count)
         
         return schemas.LogoutResponse(
             status=True,
@@ -554,7 +515,7 @@ async def change_selected_collection(req: schemas.ChangeSelectedCollectionReques
                 "message": "Failed to update selected collection"
             })
         
-        logger.info(f"✅ User {current_user.get('email')} changed selected collection to {req.selected_collection_id}")
+        logger.info("User %s changed selected collection to %s", user_id, req.selected_collection_id)
         
         return schemas.ChangeSelectedCollectionResponse(
             status=True,
@@ -574,76 +535,125 @@ async def change_selected_collection(req: schemas.ChangeSelectedCollectionReques
 
 
 # === Paragraph with vocabularies ===
-@router.post("/generate-paragraph", response_model=schemas.ParagraphResponse)
-async def generate_paragraph(req: schemas.ParagraphRequest, current_user: dict = Depends(get_current_user)):
+def _get_llm_client(provider: Optional[str]):
+    """Resolve the LLM client for a request (defaults to DEFAULT_LLM_PROVIDER, built on first use)"""
+    name = (provider or settings.DEFAULT_LLM_PROVIDER).strip().lower()
     try:
-        # Validate required fields
-        if not req.language or req.language.strip() == "":
-            raise HTTPException(status_code=400, detail={
-                "error": "missing_language",
-                "message": "Language is required"
-            })
-            
-        if not req.vocabularies or len(req.vocabularies) == 0:
-            raise HTTPException(status_code=400, detail={
-                "error": "missing_vocabularies", 
-                "message": "At least one vocabulary is required"
-            })
-            
-        if not req.level or req.level.strip() == "":
-            raise HTTPException(status_code=400, detail={
-                "error": "missing_level",
-                "message": "Level is required"
-            })
-            
-        # Validate length
-        if req.length and req.length <= 0:
-            raise HTTPException(status_code=400, detail={
-                "error": "invalid_length",
-                "message": "Length must be a positive number"
-            })
+        return llm_registry.get(name)
+    except UnknownProviderError as e:
+        raise HTTPException(status_code=400, detail={
+            "error": "invalid_provider",
+            "message": str(e)
+        })
+    except ProviderUnavailableError as e:
+        raise HTTPException(status_code=503, detail={
+            "error": "provider_unavailable",
+            "message": f"Provider '{name}' is not available",
+            "details": str(e)
+        })
+
+def _validate_paragraph_request(req: schemas.ParagraphRequest):
+    """Validate required fields of a paragraph generation request"""
+    if not req.language or req.language.strip() == "":
+        raise HTTPException(status_code=400, detail={
+            "error": "missing_language",
+            "message": "Language is required"
+        })
         
-        paragraphLength = req.length if req.length and req.length > 0 else 1
-        print(paragraphLength)
-        print(paragraphLength)
-        base_prompt = (
-            f"Write {'one meaningful sentence' if paragraphLength == 1 else f'one meaningful paragraph of {paragraphLength} words'} "
-            f"in {req.language}, at {req.level} level, with a {req.tone} tone, "
-            f"about the topic: {req.topic if req.topic else 'beginner'}. "
-            f"The text must include all of the following vocabularies at least once: {', '.join(req.vocabularies)}. "
-            f"Only highlight each vocabulary in **bold** in the text, ignore all other text. Don't hightlight 'none' word\n\n"
-            f"Then, for each vocabulary:\n"
-            f"1. Provide phonetic transcription and part of speech.\n"
-            f"2. List all meanings based on the Cambridge Dictionary, and give one example for each meaning.\n"
-            f"3. Indicate which specific meaning is used in the generated text.\n\n"
-            f"Return the final result strictly in the following JSON format:\n"
-            f"{{\n"
-            f'  "paragraph": "<the generated text>",\n'
-            f'  "explain_vocabs": {{\n'
-            f'    "vocabulary_1": [\n'
-            f'      {{ "phonetic_transcription": "<IPA>", "part_of_speech": "<pos>" }},\n'
-            f'      {{ "meaning": "<meaning 1>", "example": "<example sentence>" }},\n'
-            f'      {{ "meaning": "<meaning 2>", "example": "<example sentence>" }}\n'
-            f'    ],\n'
-            f'    "vocabulary_2": [\n'
-            f'      {{ "phonetic_transcription": "<IPA>", "part_of_speech": "<pos>" }},\n'
-            f'      {{ "meaning": "<meaning>", "example": "<example sentence>" }}\n'
-            f'    ]\n'
-            f'  }},\n'
-            f'  "explanation_in_paragraph": {{\n'
-            f'    "vocabulary_1": "explanation of the meaning used in the paragraph (highlight the vocabulary in **bold**)",\n'
-            f'    "vocabulary_2": "explanation of the meaning used in the paragraph (highlight the vocabulary in **bold**)"\n'
-            f'  }}\n'
-            f"}}"
-        )
+    if not req.vocabularies or len(req.vocabularies) == 0:
+        raise HTTPException(status_code=400, detail={
+            "error": "missing_vocabularies", 
+            "message": "At least one vocabulary is required"
+        })
+        
+    if not req.level or req.level.strip() == "":
+        raise HTTPException(status_code=400, detail={
+            "error": "missing_level",
+            "message": "Level is required"
+        })
+        
+    # Validate length
+    if req.length and req.length <= 0:
+        raise HTTPException(status_code=400, detail={
+            "error": "invalid_length",
+            "message": "Length must be a positive number"
+        })
 
-        if req.prompt:
-            final_prompt = f"{base_prompt}\nAdditional instruction: {req.prompt}"
-        else:
-            final_prompt = base_prompt
+def _paragraph_length(req: schemas.ParagraphRequest) -> int:
+    return req.length if req.length and req.length > 0 else 1
+
+def _paragraph_cache_key(req: schemas.ParagraphRequest, llm_client) -> Optional[str]:
+    """Cache key for the request, or None when the cache is disabled or opted out"""
+    if generation_cache is None or req.use_cache is False:
+        return None
+    
+    return make_cache_key(
+        language=req.language,
+        level=req.level,
+        vocabularies=req.vocabularies,
+        length=_paragraph_length(req),
+        tone=req.tone,
+        topic=req.topic,
+        prompt=req.prompt,
+        model=f"{llm_client.provider}:{llm_client.model_name}"
+    )
+
+def _build_paragraph_prompt(req: schemas.ParagraphRequest) -> str:
+    """Build the LLM prompt for a paragraph generation request"""
+    paragraphLength = _paragraph_length(req)
+    base_prompt = (
+        f"Write {'one meaningful sentence' if paragraphLength == 1 else f'one meaningful paragraph of {paragraphLength} words'} "
+        f"in {req.language}, at {req.level} level, with a {req.tone} tone, "
+        f"about the topic: {req.topic if req.topic else 'beginner'}. "
+        f"The text must include all of the following vocabularies at least once: {', '.join(req.vocabularies)}. "
+        f"Only highlight each vocabulary in **bold** in the text, ignore all other text. Don't hightlight 'none' word\n\n"
+        f"Then, for each vocabulary:\n"
+        f"1. Provide phonetic transcription and part of speech.\n"
+        f"2. List all meanings based on the Cambridge Dictionary, and give one example for each meaning.\n"
+        f"3. Indicate which specific meaning is used in the generated text.\n\n"
+        f"Return the final result strictly in the following JSON format:\n"
+        f"{{\n"
+        f'  "paragraph": "<the generated text>",\n'
+        f'  "explain_vocabs": {{\n'
+        f'    "vocabulary_1": [\n'
+        f'      {{ "phonetic_transcription": "<IPA>", "part_of_speech": "<pos>" }},\n'
+        f'      {{ "meaning": "<meaning 1>", "example": "<example sentence>" }},\n'
+        f'      {{ "meaning": "<meaning 2>", "example": "<example sentence>" }}\n'
+        f'    ],\n'
+        f'    "vocabulary_2": [\n'
+        f'      {{ "phonetic_transcription": "<IPA>", "part_of_speech": "<pos>" }},\n'
+        f'      {{ "meaning": "<meaning>", "example": "<example sentence>" }}\n'
+        f'    ]\n'
+        f'  }},\n'
+        f'  "explanation_in_paragraph": {{\n'
+        f'    "vocabulary_1": "explanation of the meaning used in the paragraph (highlight the vocabulary in **bold**)",\n'
+        f'    "vocabulary_2": "explanation of the meaning used in the paragraph (highlight the vocabulary in **bold**)"\n'
+        f'  }}\n'
+        f"}}"
+    )
 
-        # res_text = await openai_client.generate_text(final_prompt)
-        res_text = await gemini_client.generate_text(final_prompt)
+    if req.prompt:
+        return f"{base_prompt}\nAdditional instruction: {req.prompt}"
+    return base_prompt
+
+@router.post("/generate-paragraph", response_model=schemas.ParagraphResponse)
+async def generate_paragraph(req: schemas.ParagraphRequest, current_user: dict = Depends(get_current_user)):
+    try:
+        _validate_paragraph_request(req)
+        llm_client = _get_llm_client(req.provider)
+        
+        # Serve repeated requests (same fields and vocabulary set) from the generation cache
+        cache_key = _paragraph_cache_key(req, llm_client)
+        if cache_key:
+            cached_text = await generation_cache.get(cache_key)
+            if cached_text is not None:
+                return schemas.ParagraphResponse(result=cached_text, status=True)
+        
+        final_prompt = _build_paragraph_prompt(req)
+        res_text = await llm_client.generate_text(final_prompt)
+        
+        if cache_key and res_text:
+            await generation_cache.set(cache_key, res_text)
         
         return schemas.ParagraphResponse(result=res_text, status=True)
         
@@ -657,6 +667,90 @@ async def generate_paragraph(req: schemas.ParagraphRequest, current_user: dict =
             "details": str(e)
         })
 
+# Matches the complete "paragraph" string value in a partially streamed JSON answer
+_PARAGRAPH_VALUE_RE = re.compile(r'"paragraph"\s*:\s*("(?:[^"\\]|\\.)*")')
+
+def _sse_event(event: str, data: dict) -> str:
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+@router.post("/generate-paragraph/stream")
+async def generate_paragraph_stream(req: schemas.ParagraphRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Stream paragraph generation as Server-Sent Events
+    
+    Events:
+        token     - {"text": "<chunk>"} for every chunk forwarded from the provider
+        paragraph - {"paragraph": "<text>"} as soon as the "paragraph" value is complete
+        result    - final ParagraphResponse ({"result": "<full text>", "status": true})
+        error     - {"error": ..., "message": ..., "details": ...} if generation fails mid-stream
+    """
+    _validate_paragraph_request(req)
+    llm_client = _get_llm_client(req.provider)
+    cache_key = _paragraph_cache_key(req, llm_client)
+    
+    async def event_stream():
+        try:
+            if cache_key:
+                cached_text = await generation_cache.get(cache_key)
+                if cached_text is not None:
+                    yield _sse_event("token", {"text": cached_text})
+                    yield _sse_event("result", schemas.ParagraphResponse(result=cached_text, status=True).model_dump())
+                    return
+            
+            final_prompt = _build_paragraph_prompt(req)
+            chunks = []
+            paragraph_sent = False
+            async for chunk in llm_client.stream_text(final_prompt):
+                chunks.append(chunk)
+                yield _sse_event("token", {"text": chunk})
+                
+                # Let clients render the paragraph before the vocabulary explanations arrive
+                if not paragraph_sent:
+                    match = _PARAGRAPH_VALUE_RE.search("".join(chunks))
+                    if match:
+                        paragraph_sent = True
+                        yield _sse_event("paragraph", {"paragraph": json.loads(match.group(1))})
+            
+            res_text = "".join(chunks)
+            response = schemas.ParagraphResponse(result=res_text, status=True)
+            
+            if cache_key and res_text:
+                await generation_cache.set(cache_key, res_text)
+            
+            yield _sse_event("result", response.model_dump())
+            
+        except Exception as e:
+            logger.exception("Error streaming paragraph")
+            yield _sse_event("error", {
+                "error": "paragraph_generation_failed",
+                "message": "Failed to generate paragraph",
+                "details": str(e)
+            })
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={
+            "Cache-Control": "no-cache",
+            "X-Accel-Buffering": "no"  # Disable proxy buffering so tokens are flushed immediately
+        }
+    )
+
+@router.get("/generate-paragraph/cache-stats", response_model=schemas.GenerationCacheStatsResponse)
+async def get_generation_cache_stats(current_user: dict = Depends(get_current_user)):
+    """
+    Get hit/miss counters of the paragraph generation cache
+    """
+    if generation_cache is None:
+        return schemas.GenerationCacheStatsResponse(enabled=False, stats=None, status=True)
+    
+    return schemas.GenerationCacheStatsResponse(
+        enabled=True,
+        stats=generation_cache.stats(),
+        status=True
+    )
+
 # === Save paragraph and vocabularies ===
 @router.post("/save-paragraph", response_model=schemas.SaveParagraphResponse)
 async def save_paragraph(req: schemas.SaveParagraphRequest, current_user: dict = Depends(get_current_user)):
@@ -707,7 +801,7 @@ async def save_paragraph(req: schemas.SaveParagraphRequest, current_user: dict =
         if existing_input_history:
             # Use existing input history
             input_history = existing_input_history
-            logger.info(f"Reusing existing input history: {input_history.id}")
+            logger.debug("Reusing existing input history %s", input_history.id)
             message = "Using existing vocabularies, paragraph saved successfully"
         else:
             # Create new input history
@@ -717,7 +811,7 @@ async def save_paragraph(req: schemas.SaveParagraphRequest, current_user: dict =
             )
             
             input_history = await input_history_crud.create_input_history(history_data)
-            logger.info(f"Created new input history: {input_history.id}")
+            logger.debug("Created new input history %s", input_history.id)
             message = "New vocabularies and paragraph saved successfully"
         
         # Create saved paragraph
@@ -726,8 +820,8 @@ async def save_paragraph(req: schemas.SaveParagraphRequest, current_user: dict =
             paragraph=req.paragraph
         )
         
-        saved_paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data)
-        logger.info(f"Created saved paragraph: {saved_paragraph.id}")
+        saved_paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data, user_id)
+        logger.info("Created saved paragraph %s", saved_paragraph.id)
         
         return schemas.SaveParagraphResponse(
             input_history_id=str(input_history.id),
@@ -747,16 +841,31 @@ async def save_paragraph(req: schemas.SaveParagraphRequest, current_user: dict =
         })
 
 # === Get all saved paragraphs with vocabularies ===
+MAX_PARAGRAPHS_PER_GROUP = 100
+
+def _invalid_cursor(error: InvalidCursorError) -> HTTPException:
+    """400 response for a malformed after/before cursor"""
+    return HTTPException(status_code=400, detail={
+        "error": "invalid_cursor",
+        "message": "Invalid pagination cursor",
+        "details": str(error)
+    })
+
 @router.get("/all-paragraphs")
 @router.get("/saved-paragraphs")  # Alias endpoint
-async def get_all_paragraphs(limit: int = 100, grouped: bool = True, current_user: dict = Depends(get_current_user)):
+async def get_all_paragraphs(limit: int = 100, grouped: bool = True, paragraphs_per_group: int = 20,
+                             after: Optional[str] = None, before: Optional[str] = None,
+                             current_user: dict = Depends(get_current_user)):
     """
     Get all saved paragraphs with their vocabularies
     Available at both /all-paragraphs and /saved-paragraphs
     
     Args:
-        limit: Maximum number of results
+        limit: Maximum number of paragraphs (or groups, when grouped) per page
         grouped: If True, group paragraphs by input_history_id (same vocabularies)
+        paragraphs_per_group: Maximum number of paragraph texts returned per group (newest first)
+        after: next_cursor of the previous page
+        before: prev_cursor of the following page
     """
     try:
         from app.database.crud import get_saved_paragraph_crud
@@ -769,77 +878,78 @@ async def get_all_paragraphs(limit: int = 100, grouped: bool = True, current_use
                 "message": "User ID not found in token (missing both 'user_id' and 'id' fields)"
             })
         
-        # Get user's saved paragraphs with input history info
-        paragraphs_data = await saved_paragraph_crud.get_user_saved_paragraphs(user_id, limit)
+        limit = page_size(limit)
         
         if grouped:
-            # Group paragraphs by input_history_id
-            grouped_data = {}
-            
-            for item in paragraphs_data:
-                try:
-                    input_history_id = str(item['input_history']['_id'])
-                    vocabs = item['input_history']['words']
-                    paragraph_text = item['paragraph']
-                    
-                    # Group by input_history_id
-                    if input_history_id not in grouped_data:
-                        grouped_data[input_history_id] = {
-                            "input_history_id": input_history_id,
-                            "vocabs": vocabs,
-                            "paragraphs": [],
-                            "total_paragraphs": 0
-                        }
-                    
-                    # Add paragraph text directly to array
-                    grouped_data[input_history_id]["paragraphs"].append(paragraph_text)
-                    grouped_data[input_history_id]["total_paragraphs"] += 1
-                    
-                except Exception as item_error:
-                    logger.error(f"Error processing paragraph item: {item_error}")
-                    continue
+            # Get one page of groups, grouped by input_history_id in the database
+            groups_data = await saved_paragraph_crud.get_user_paragraph_groups(
+                user_id, limit + 1, paragraphs_per_group=page_size(paragraphs_per_group, MAX_PARAGRAPHS_PER_GROUP),
+                after=after, before=before
+            )
+            groups_data, next_cursor, prev_cursor = keyset_page(
+                groups_data, limit, after, before, key=lambda group: (group['latest_created_at'], group['_id'])
+            )
             
-            # Convert to list and create response items
             result_groups = []
-            for group_data in grouped_data.values():
+            for group in groups_data:
+                if not group.get('input_history'):
+                    # Input history was deleted, nothing to show the paragraphs with
+                    continue
+                
                 # Create group item with simplified structure
-                group_item = {
-                    "id": group_data["input_history_id"],
-                    "vocabs": group_data["vocabs"],
+                result_groups.append({
+                    "id": str(group['_id']),
+                    "vocabs": group['input_history']['words'],
                     "is_group": True,
-                    "paragraphs": group_data["paragraphs"],  # Array of paragraph texts
-                    "total_paragraphs": group_data["total_paragraphs"]
-                }
-                result_groups.append(group_item)
+                    "paragraphs": group['paragraphs'],  # Array of paragraph texts (newest first, capped)
+                    "total_paragraphs": group['total_paragraphs']
+                })
             
             return {
                 "data": result_groups,
                 "total": len(result_groups),
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
                 "status": True
             }
             
         else:
-            # Original ungrouped format
+            # Original ungrouped format: one page of the user's saved paragraphs with input history info
+            paragraphs_data = await saved_paragraph_crud.get_user_saved_paragraphs(
+                user_id, limit + 1, after=after, before=before
+            )
+            paragraphs_data, next_cursor, prev_cursor = keyset_page(
+                paragraphs_data, limit, after, before, key=lambda item: (item['created_at'], item['_id'])
+            )
+            
             paragraphs = []
             for item in paragraphs_data:
                 try:
+                    # The input history may have been deleted; the paragraph is still the user's
+                    input_history = item.get('input_history') or {}
                     paragraph_item = {
                         "id": str(item['_id']),
-                        "vocabs": item['input_history']['words'],
+                        "vocabs": input_history.get('words', []),
                         "paragraph": item['paragraph'],
-                        "created_at": ""  # Not available in aggregation result
+                        "created_at": item['created_at'].isoformat() if item.get('created_at') else ""
                     }
                     paragraphs.append(paragraph_item)
                 except Exception as item_error:
-                    logger.error(f"Error processing paragraph item: {item_error}")
+                    logger.error("Error processing paragraph item: %s", item_error)
                     continue
             
             return {
                 "data": paragraphs,
                 "total": len(paragraphs),
+                "next_cursor": next_cursor,
+                "prev_cursor": prev_cursor,
                 "status": True
             }
         
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
     except Exception as e:
         logger.exception("Error getting all paragraphs")
         return {
@@ -911,7 +1021,9 @@ async def get_paragraphs_by_group(input_history_id: str, current_user: dict = De
 
 # === Get vocabularies by collection ===
 @router.get("/vocabs_base_on_category")
-async def get_vocabs_by_collection(collection_id: str, sort: str = "newest", current_user: dict = Depends(get_current_user)):
+async def get_vocabs_by_collection(collection_id: str, sort: str = "newest", limit: int = 1000,
+                                   after: Optional[str] = None, before: Optional[str] = None,
+                                   current_user: dict = Depends(get_current_user)):
     """
     Get learned vocabularies documents from a specific collection
     Returns complete documents sorted by date, excluding user_id
@@ -919,9 +1031,14 @@ async def get_vocabs_by_collection(collection_id: str, sort: str = "newest", cur
     Args:
         collection_id: ID of the vocabulary collection to filter by (required)
         sort: Sort order - "newest" (default), "oldest", "alphabetical", "frequent"
+        limit: Maximum number of documents per page
+        after: next_cursor of the previous page
+        before: prev_cursor of the following page
     """
     try:
-        from app.database.crud import get_learned_vocabs_crud, get_vocab_collection_crud
+        from app.database.crud import (
+            get_learned_vocabs_crud, get_vocab_collection_crud, VOCAB_SORT_ORDERS, vocab_sort_key
+        )
         
         learned_vocabs_crud = get_learned_vocabs_crud()
         vocab_collection_crud = get_vocab_collection_crud()
@@ -955,15 +1072,21 @@ async def get_vocabs_by_collection(collection_id: str, sort: str = "newest", cur
             })
         
         # Validate sort parameter
-        valid_sorts = ["newest", "oldest", "alphabetical", "frequent"]
+        valid_sorts = list(VOCAB_SORT_ORDERS)
         if sort not in valid_sorts:
             raise HTTPException(status_code=400, detail={
                 "error": "invalid_sort_parameter",
                 "message": f"Sort must be one of: {', '.join(valid_sorts)}"
             })
         
-        # Get learned vocabs entries for the specific collection
-        learned_vocabs_entries = await learned_vocabs_crud.get_vocabs_by_collection(collection_id, limit=1000)
+        # Get one page of learned vocabs entries for the specific collection, sorted by the database
+        limit = page_size(limit)
+        learned_vocabs_entries = await learned_vocabs_crud.get_vocabs_by_collection(
+            collection_id, limit=limit + 1, sort=sort, after=after, before=before
+        )
+        learned_vocabs_entries, next_cursor, prev_cursor = keyset_page(
+            learned_vocabs_entries, limit, after, before, key=lambda entry: vocab_sort_key(entry, sort)
+        )
         
         # Format documents for response (exclude user_id, include all fields)
         documents = []
@@ -980,20 +1103,6 @@ async def get_vocabs_by_collection(collection_id: str, sort: str = "newest", cur
             }
             documents.append(document)
         
-        # Apply sorting based on sort parameter
-        if sort == "newest":
-            # Sort by created_at (newest first) - handle None values properly
-            documents.sort(key=lambda x: x["created_at"] or "1900-01-01T00:00:00", reverse=True)
-        elif sort == "oldest":
-            # Sort by created_at (oldest first) - handle None values properly
-            documents.sort(key=lambda x: x["created_at"] or "1900-01-01T00:00:00", reverse=False)
-        elif sort == "alphabetical":
-            # Sort by vocabulary word alphabetically
-            documents.sort(key=lambda x: x["vocab"].lower() if x["vocab"] else "zzz")
-        elif sort == "frequent":
-            # Sort by usage_count (most frequent first), then by created_at (newest first) as tiebreaker
-            documents.sort(key=lambda x: (x["usage_count"], x["created_at"] or "1900-01-01T00:00:00"), reverse=True)
-        
         return {
             "status": True,
             "collection_id": collection_id,
@@ -1002,11 +1111,15 @@ async def get_vocabs_by_collection(collection_id: str, sort: str = "newest", cur
             "documents": documents,
             "sort": documents,  # Put the sorted data array in the sort field
             "sort_method": sort,  # Keep the sort method in a separate field
+            "next_cursor": next_cursor,
+            "prev_cursor": prev_cursor,
             "message": f"Found {len(documents)} vocabulary documents in collection '{collection.name}' sorted by {sort}"
         }
         
     except HTTPException:
         raise
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
     except Exception as e:
         logger.exception("Error getting vocabulary documents from learned_vocabs by collection")
         return {
@@ -1046,7 +1159,6 @@ async def create_learned_vocabs(req: schemas.LearnedVocabsCreateRequest, current
             })
         
         from app.database.crud import get_learned_vocabs_crud, get_vocab_collection_crud
-        from app.database.models import LearnedVocabsCreateInternal
         
         learned_vocabs_crud = get_learned_vocabs_crud()
         user_id = current_user.get("user_id") or current_user.get("id")
@@ -1072,49 +1184,26 @@ async def create_learned_vocabs(req: schemas.LearnedVocabsCreateRequest, current
                 "message": "You can only add vocabularies to your own collections"
             })
         
-        # Create one document for each vocabulary word
+        # Resolve and write all words in one batch (one document per vocabulary word)
+        results = await learned_vocabs_crud.upsert_vocabs_batch(req.collection_id, cleaned_vocabs)
+        
         created_vocabs = []
-        for vocab in cleaned_vocabs:
-            # Check if this exact vocabulary already exists in this collection
-            existing_vocab = await learned_vocabs_crud.find_by_exact_vocab(req.collection_id, vocab)
-            
-            if existing_vocab:
-                # Increment usage count for existing entry
-                updated_vocab = await learned_vocabs_crud.increment_usage_count(str(existing_vocab.id))
-                logger.info(f"Incremented usage count for learned vocab '{vocab}' ID: {existing_vocab.id}")
-                
-                created_vocabs.append(schemas.LearnedVocabsResponse(
-                    id=str(updated_vocab.id if updated_vocab else existing_vocab.id),
-                    vocab=updated_vocab.vocab if updated_vocab else existing_vocab.vocab,
-                    collection_id=str(existing_vocab.collection_id),
-                    usage_count=updated_vocab.usage_count if updated_vocab else getattr(existing_vocab, 'usage_count', 1),
-                    created_at=updated_vocab.created_at.isoformat() if updated_vocab and updated_vocab.created_at else existing_vocab.created_at.isoformat() if existing_vocab.created_at else "",
-                    updated_at=updated_vocab.updated_at.isoformat() if updated_vocab and updated_vocab.updated_at else existing_vocab.updated_at.isoformat() if existing_vocab.updated_at else None,
-                    is_new=False,
-                    usage_incremented=True,
-                    status=True
-                ))
-            else:
-                # Create new learned vocab entry
-                vocab_create_data = LearnedVocabsCreateInternal(
-                    vocab=vocab,
-                    collection_id=req.collection_id
-                )
-                
-                learned_vocab = await learned_vocabs_crud.create_learned_vocabs(vocab_create_data)
-                logger.info(f"Created new learned vocab '{vocab}' with ID: {learned_vocab.id}")
-                
-                created_vocabs.append(schemas.LearnedVocabsResponse(
-                    id=str(learned_vocab.id),
-                    vocab=learned_vocab.vocab,
-                    collection_id=str(learned_vocab.collection_id),
-                    usage_count=getattr(learned_vocab, 'usage_count', 1),
-                    created_at=learned_vocab.created_at.isoformat() if learned_vocab.created_at else "",
-                    updated_at=learned_vocab.updated_at.isoformat() if learned_vocab.updated_at else None,
-                    is_new=True,
-                    usage_incremented=False,
-                    status=True
-                ))
+        for learned_vocab, is_new in results:
+            created_vocabs.append(schemas.LearnedVocabsResponse(
+                id=str(learned_vocab.id),
+                vocab=learned_vocab.vocab,
+                collection_id=str(learned_vocab.collection_id),
+                usage_count=learned_vocab.usage_count,
+                created_at=learned_vocab.created_at.isoformat() if learned_vocab.created_at else "",
+                updated_at=learned_vocab.updated_at.isoformat() if learned_vocab.updated_at else None,
+                is_new=is_new,
+                usage_incremented=not is_new,
+                status=True
+            ))
+        
+        new_count = sum(1 for _, is_new in results if is_new)
+        logger.info("Added %d learned vocabs to collection %s (%d new, %d incremented)",
+                    len(results), req.collection_id, new_count, len(results) - new_count)
         
         return schemas.LearnedVocabsBatchResponse(
             created=created_vocabs,
@@ -1176,7 +1265,7 @@ async def delete_vocabulary(req: dict, current_user: dict = Depends(get_current_
         deleted_count = await learned_vocabs_crud.delete_vocabs_containing_word(user_id, vocab.strip())
         
         if deleted_count > 0:
-            logger.info(f"Deleted {deleted_count} learned vocabs entries containing word '{vocab}' for user {user_id}")
+            logger.info("Deleted %d learned vocabs entries containing word '%s' for user %s", deleted_count, vocab, user_id)
             return {
                 "status": True,
                 "message": f"Successfully deleted {deleted_count} vocabulary entries containing '{vocab.strip()}'",
@@ -1243,9 +1332,10 @@ async def create_vocab_collection(req: schemas.VocabCollectionCreateRequest, cur
         })
 
 @router.get("/vocab-collections", response_model=schemas.VocabCollectionsListResponse)
-async def get_vocab_collections(current_user: dict = Depends(get_current_user)):
+async def get_vocab_collections(limit: int = 100, after: Optional[str] = None, before: Optional[str] = None,
+                                current_user: dict = Depends(get_current_user)):
     """
-    Get user's vocabulary collections
+    Get user's vocabulary collections (newest first, paged by after/before cursors)
     """
     try:
         from app.database.crud import get_vocab_collection_crud
@@ -1259,8 +1349,14 @@ async def get_vocab_collections(current_user: dict = Depends(get_current_user)):
                 "message": "User ID not found in token"
             })
         
-        # Get user's collections only
-        collections = await vocab_collection_crud.get_user_vocab_collections(user_id)
+        # Get one page of the user's collections only
+        limit = page_size(limit)
+        collections = await vocab_collection_crud.get_user_vocab_collections(
+            user_id, limit=limit + 1, after=after, before=before
+        )
+        collections, next_cursor, prev_cursor = keyset_page(
+            collections, limit, after, before, key=lambda collection: (collection.created_at, collection.id)
+        )
         
         collection_responses = []
         for collection in collections:
@@ -1276,9 +1372,15 @@ async def get_vocab_collections(current_user: dict = Depends(get_current_user)):
         return schemas.VocabCollectionsListResponse(
             collections=collection_responses,
             total=len(collection_responses),
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
             status=True
         )
         
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
     except Exception as e:
         logger.exception("Error getting vocab collections")
         raise HTTPException(status_code=500, detail={
@@ -1322,15 +1424,35 @@ async def update_vocab_collection(collection_id: str, req: schemas.VocabCollecti
             "details": str(e)
         })
 
+def _deletion_job_response(job) -> dict:
+    """Progress of a collection deletion cascade job"""
+    return {
+        "job_id": str(job.id),
+        "collection_id": str(job.collection_id),
+        "status": job.status,
+        "total_vocabs": job.total_vocabs,
+        "deleted_vocabs": job.deleted_vocabs,
+        "error": job.error,
+        "created_at": job.created_at.isoformat() if job.created_at else None,
+        "completed_at": job.completed_at.isoformat() if job.completed_at else None
+    }
+
 @router.delete("/vocab-collections/{collection_id}")
 async def delete_vocab_collection(collection_id: str, current_user: dict = Depends(get_current_user)):
     """
     Delete vocabulary collection with cascade deletion of associated learned vocabularies
     Also updates user's selected_collection_id if it points to the deleted collection
+    
+    Collections with more than CASCADE_CHUNK_SIZE vocabularies are removed right away
+    and their vocabularies are deleted by a background job; poll
+    GET /vocab-collections/deletions/{job_id} for its progress.
     """
     try:
-        from app.database.crud import get_vocab_collection_crud, get_learned_vocabs_crud
-        from bson import ObjectId
+        from app.database.crud import (
+            get_vocab_collection_crud, get_learned_vocabs_crud, get_collection_deletion_job_crud,
+            CASCADE_CHUNK_SIZE
+        )
+        from app.services.collection_cascade import start_collection_cascade
         
         vocab_collection_crud = get_vocab_collection_crud()
         learned_vocabs_crud = get_learned_vocabs_crud()
@@ -1358,11 +1480,27 @@ async def delete_vocab_collection(collection_id: str, current_user: dict = Depen
             })
         
         # Get count of vocabularies before deletion for response
-        vocabs_in_collection = await learned_vocabs_crud.get_vocabs_by_collection(collection_id, limit=10000)
-        vocab_count = len(vocabs_in_collection)
+        vocab_count = await learned_vocabs_crud.count_vocabs_by_collection(collection_id)
         
-        # Perform cascade deletion (collection + all associated learned_vocabs)
-        success = await vocab_collection_crud.delete_vocab_collection(collection_id)
+        cascade_job = None
+        if vocab_count <= CASCADE_CHUNK_SIZE:
+            # Small collection: cascade in the request (a single bounded chunk)
+            success = await vocab_collection_crud.delete_vocab_collection(collection_id)
+        else:
+            # Large collection: remove the collection now, its vocabularies in the background.
+            # The job is written first, so the vocabularies are never left without one
+            job_crud = get_collection_deletion_job_crud()
+            cascade_job = await job_crud.create_job(collection_id, user_id, collection.name, vocab_count)
+            try:
+                success = await vocab_collection_crud.delete_collection_document(collection_id)
+            except Exception:
+                await job_crud.delete_job(str(cascade_job.id))
+                raise
+            if success:
+                start_collection_cascade(str(cascade_job.id))
+            else:
+                await job_crud.delete_job(str(cascade_job.id))
+                cascade_job = None
         
         if not success:
             raise HTTPException(status_code=500, detail={
@@ -1370,34 +1508,28 @@ async def delete_vocab_collection(collection_id: str, current_user: dict = Depen
                 "message": "Failed to delete vocabulary collection"
             })
         
-        # Check if user's selected_collection_id points to the deleted collection
-        user_db = await user_crud.get_user_by_id(user_id)
-        if user_db and user_db.selected_collection_id == collection_id:
-            # Get user's remaining collections
-            remaining_collections = await vocab_collection_crud.get_user_vocab_collections(user_id)
-            
-            if remaining_collections:
-                # Set selected_collection_id to the first remaining collection
-                new_selected_id = str(remaining_collections[0].id)
-                await user_crud.collection.update_one(
-                    {"_id": ObjectId(user_id)},
-                    {"$set": {"selected_collection_id": new_selected_id}}
-                )
-                logger.info(f"✅ Updated user's selected_collection_id to: {new_selected_id}")
-            else:
-                # No collections left, set to None
-                await user_crud.collection.update_one(
-                    {"_id": ObjectId(user_id)},
-                    {"$set": {"selected_collection_id": None}}
-                )
-                logger.info(f"✅ User has no more collections, set selected_collection_id to None")
+        # Move selected_collection_id to the newest remaining collection if it pointed to the deleted one
+        remaining_collections = await vocab_collection_crud.get_user_vocab_collections(user_id, limit=1)
+        new_selected_id = str(remaining_collections[0].id) if remaining_collections else None
+        if await user_crud.replace_selected_collection(user_id, collection_id, new_selected_id):
+            logger.info("Updated user's selected_collection_id to %s", new_selected_id)
         
-        logger.info(f"✅ Deleted collection '{collection.name}' and {vocab_count} associated vocabularies")
+        if cascade_job:
+            logger.info("Deleted collection %s, cascade job %s removes %d vocabularies", collection_id, cascade_job.id, vocab_count)
+            return {
+                "status": True,
+                "message": f"Vocabulary collection deleted successfully ({vocab_count} vocabularies are being removed)",
+                "deleted_vocab_count": vocab_count,
+                "cascade": _deletion_job_response(cascade_job)
+            }
+        
+        logger.info("Deleted collection %s and %d associated vocabularies", collection_id, vocab_count)
         
         return {
             "status": True,
             "message": f"Vocabulary collection deleted successfully (including {vocab_count} vocabularies)",
-            "deleted_vocab_count": vocab_count
+            "deleted_vocab_count": vocab_count,
+            "cascade": None
         }
         
     except HTTPException:
@@ -1410,7 +1542,59 @@ async def delete_vocab_collection(collection_id: str, current_user: dict = Depen
             "details": str(e)
         })
 
+@router.get("/vocab-collections/deletions/{job_id}")
+async def get_vocab_collection_deletion(job_id: str, current_user: dict = Depends(get_current_user)):
+    """
+    Get progress of a background collection deletion cascade
+    """
+    from app.database.crud import get_collection_deletion_job_crud
+    
+    user_id = current_user.get("user_id") or current_user.get("id")
+    if not user_id:
+        raise HTTPException(status_code=401, detail={
+            "error": "invalid_user_data",
+            "message": "User ID not found in token"
+        })
+    
+    job = await get_collection_deletion_job_crud().get_job(job_id) if ObjectId.is_valid(job_id) else None
+    if not job or str(job.user_id) != user_id:
+        raise HTTPException(status_code=404, detail={
+            "error": "deletion_job_not_found",
+            "message": "Collection deletion job not found"
+        })
+    
+    return {"status": True, "job": _deletion_job_response(job)}
+
 # === Study History Management ===
+MAX_STUDY_EVENTS_PER_BATCH = 500
+
+def _parse_study_date(study_date: Optional[str]) -> datetime:
+    """
+    Parse a YYYY-MM-DD or ISO datetime study_date (default: today, without time)
+    
+    Datetimes with "Z" or an offset are converted to naive UTC, the form MongoDB
+    returns them in, so the day is the UTC day and read-backs compare equal.
+    """
+    if not study_date:
+        today = datetime.utcnow().date()
+        return datetime.combine(today, datetime.min.time())
+    
+    try:
+        # Try parsing as full datetime first
+        if 'T' in study_date or 'Z' in study_date:
+            parsed = datetime.fromisoformat(study_date.replace('Z', '+00:00'))
+            if parsed.tzinfo is not None:
+                parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+            return parsed
+        # Parse as date-only (YYYY-MM-DD)
+        date_obj = datetime.strptime(study_date, '%Y-%m-%d').date()
+        return datetime.combine(date_obj, datetime.min.time())
+    except ValueError:
+        raise HTTPException(status_code=400, detail={
+            "error": "invalid_date_format",
+            "message": "study_date must be in YYYY-MM-DD or ISO datetime format"
+        })
+
 @router.post("/study-session", response_model=schemas.StudySessionResponse)
 async def record_study_session(req: schemas.StudySessionRequest, current_user: dict = Depends(get_current_user)):
     """
@@ -1430,37 +1614,24 @@ async def record_study_session(req: schemas.StudySessionRequest, current_user: d
                 "message": "User ID not found in token"
             })
         
-        # Verify vocab belongs to user
-        vocab = await vocabs_crud.get_learned_vocabs_by_id(req.vocab_id)
-        if not vocab or str(vocab.user_id) != user_id:
+        if not ObjectId.is_valid(req.vocab_id):
+            raise HTTPException(status_code=400, detail={
+                "error": "invalid_vocab_id",
+                "message": "Invalid vocab_id format"
+            })
+        
+        # Verify vocab belongs to user (through its collection)
+        if req.vocab_id not in await vocabs_crud.filter_user_vocab_ids(user_id, [req.vocab_id]):
             raise HTTPException(status_code=404, detail={
                 "error": "vocab_not_found",
                 "message": "Vocabulary not found or access denied"
             })
         
         # Parse study date or use current date
-        if req.study_date:
-            try:
-                # Try parsing as full datetime first
-                if 'T' in req.study_date or 'Z' in req.study_date:
-                    study_date = datetime.fromisoformat(req.study_date.replace('Z', '+00:00'))
-                else:
-                    # Parse as date-only (YYYY-MM-DD)
-                    from datetime import date
-                    date_obj = datetime.strptime(req.study_date, '%Y-%m-%d').date()
-                    study_date = datetime.combine(date_obj, datetime.min.time())
-            except ValueError:
-                raise HTTPException(status_code=400, detail={
-                    "error": "invalid_date_format",
-                    "message": "study_date must be in YYYY-MM-DD or ISO datetime format"
-                })
-        else:
-            # Use current date (without time)
-            today = datetime.utcnow().date()
-            study_date = datetime.combine(today, datetime.min.time())
+        study_date = _parse_study_date(req.study_date)
         
         # Record study session
-        history = await history_crud.increment_study_count(req.vocab_id, study_date)
+        history = await history_crud.increment_study_count(req.vocab_id, study_date, user_id=user_id)
         
         return schemas.StudySessionResponse(
             id=str(history.id),
@@ -1481,10 +1652,86 @@ async def record_study_session(req: schemas.StudySessionRequest, current_user: d
             "details": str(e)
         })
 
+@router.post("/study-session/batch", response_model=schemas.StudySessionBatchResponse)
+async def record_study_sessions_batch(req: schemas.StudySessionBatchRequest, current_user: dict = Depends(get_current_user)):
+    """
+    Record a burst of study events (e.g. from a flashcard run) in one write
+    """
+    try:
+        from app.database.crud import get_history_by_date_crud, get_learned_vocabs_crud
+        
+        user_id = current_user.get("user_id") or current_user.get("id")
+        if not user_id:
+            raise HTTPException(status_code=401, detail={
+                "error": "invalid_user_data",
+                "message": "User ID not found in token"
+            })
+        
+        if not req.events:
+            raise HTTPException(status_code=400, detail={
+                "error": "empty_events",
+                "message": "At least one study event is required"
+            })
+        
+        if len(req.events) > MAX_STUDY_EVENTS_PER_BATCH:
+            raise HTTPException(status_code=400, detail={
+                "error": "too_many_events",
+                "message": f"At most {MAX_STUDY_EVENTS_PER_BATCH} study events per request"
+            })
+        
+        invalid_ids = sorted({event.vocab_id for event in req.events if not ObjectId.is_valid(event.vocab_id)})
+        if invalid_ids:
+            raise HTTPException(status_code=400, detail={
+                "error": "invalid_vocab_id",
+                "message": "Invalid vocab_id format",
+                "details": invalid_ids
+            })
+        
+        events = [(event.vocab_id, _parse_study_date(event.study_date)) for event in req.events]
+        
+        # Verify every vocab belongs to the user
+        owned_ids = await get_learned_vocabs_crud().filter_user_vocab_ids(user_id, [vocab_id for vocab_id, _ in events])
+        missing_ids = sorted({vocab_id for vocab_id, _ in events} - owned_ids)
+        if missing_ids:
+            raise HTTPException(status_code=404, detail={
+                "error": "vocab_not_found",
+                "message": "Vocabulary not found or access denied",
+                "details": missing_ids
+            })
+        
+        histories = await get_history_by_date_crud().record_study_events(events, user_id=user_id)
+        
+        return schemas.StudySessionBatchResponse(
+            recorded=[
+                schemas.StudySessionResponse(
+                    id=str(history.id),
+                    vocab_id=str(history.vocab_id),
+                    study_date=history.study_date.strftime('%Y-%m-%d'),
+                    count=history.count,
+                    created_at=history.created_at.isoformat() if history.created_at else "",
+                    status=True
+                )
+                for history in histories
+            ],
+            total_events=len(events),
+            status=True
+        )
+        
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.exception("Error recording study sessions")
+        raise HTTPException(status_code=500, detail={
+            "error": "recording_failed",
+            "message": "Failed to record study sessions",
+            "details": str(e)
+        })
+
 @router.get("/study-history", response_model=schemas.StudyHistoryResponse)
-async def get_study_history(limit: int = 50, current_user: dict = Depends(get_current_user)):
+async def get_study_history(limit: int = 50, after: Optional[str] = None, before: Optional[str] = None,
+                            current_user: dict = Depends(get_current_user)):
     """
-    Get user's study history
+    Get user's study history (most recent first, paged by after/before cursors)
     """
     try:
         from app.database.crud import get_history_by_date_crud
@@ -1497,12 +1744,19 @@ async def get_study_history(limit: int = 50, current_user: dict = Depends(get_cu
                 "message": "User ID not found in token"
             })
         
-        # Get study history with vocab info
-        history_data = await history_crud.get_user_study_history(user_id, limit)
+        # Get one page of study history with vocab info
+        limit = page_size(limit)
+        history_data = await history_crud.get_user_study_history(user_id, limit + 1, after=after, before=before)
+        history_data, next_cursor, prev_cursor = keyset_page(
+            history_data, limit, after, before, key=lambda item: (item["study_date"], item["_id"])
+        )
         
         # Format response
         formatted_history = []
         for item in history_data:
+            if not item["vocab_info"]:
+                # Vocab was deleted since it was studied
+                continue
             formatted_item = {
                 "id": str(item["_id"]),
                 "vocab_id": str(item["vocab_id"]),
@@ -1511,7 +1765,7 @@ async def get_study_history(limit: int = 50, current_user: dict = Depends(get_cu
                 "created_at": item["created_at"].isoformat() if item.get("created_at") else "",
                 "vocab_info": {
                     "id": str(item["vocab_info"]["_id"]),
-                    "vocabs": item["vocab_info"]["vocabs"],
+                    "vocab": item["vocab_info"]["vocab"],
                     "collection_id": str(item["vocab_info"]["collection_id"]) if item["vocab_info"].get("collection_id") else None,
                     "usage_count": item["vocab_info"].get("usage_count", 1)
                 }
@@ -1521,9 +1775,15 @@ async def get_study_history(limit: int = 50, current_user: dict = Depends(get_cu
         return schemas.StudyHistoryResponse(
             history=formatted_history,
             total=len(formatted_history),
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
             status=True
         )
         
+    except HTTPException:
+        raise
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
     except Exception as e:
         logger.exception("Error getting study history")
         raise HTTPException(status_code=500, detail={
@@ -1552,7 +1812,7 @@ async def submit_feedback(req: schemas.UserFeedbackRequest):
         )
         feedback = await feedback_crud.create_feedback(feedback_data)
         
-        logger.info(f"📝 New feedback received from {req.email}")
+        logger.info("New feedback received")
         
         return schemas.UserFeedbackResponse(
             id=str(feedback.id),
@@ -1572,15 +1832,20 @@ async def submit_feedback(req: schemas.UserFeedbackRequest):
         })
 
 @router.get("/feedback", response_model=schemas.UserFeedbackListResponse)
-async def get_all_feedback(limit: int = 100, current_user: dict = Depends(get_current_user)):
+async def get_all_feedback(limit: int = 100, after: Optional[str] = None, before: Optional[str] = None,
+                           current_user: dict = Depends(get_current_user)):
     """
-    Get all feedback (admin only - requires authentication)
+    Get all feedback (admin only - requires authentication), newest first, paged by after/before cursors
     """
     try:
         from app.database.crud import get_user_feedback_crud
         
         feedback_crud = get_user_feedback_crud()
-        feedbacks = await feedback_crud.get_all_feedback(limit)
+        limit = page_size(limit)
+        feedbacks = await feedback_crud.get_all_feedback(limit + 1, after=after, before=before)
+        feedbacks, next_cursor, prev_cursor = keyset_page(
+            feedbacks, limit, after, before, key=lambda feedback: (feedback.created_at, feedback.id)
+        )
         
         feedback_responses = []
         for feedback in feedbacks:
@@ -1596,9 +1861,13 @@ async def get_all_feedback(limit: int = 100, current_user: dict = Depends(get_cu
         return schemas.UserFeedbackListResponse(
             feedbacks=feedback_responses,
             total=len(feedback_responses),
+            next_cursor=next_cursor,
+            prev_cursor=prev_cursor,
             status=True
         )
         
+    except InvalidCursorError as e:
+        raise _invalid_cursor(e)
     except Exception as e:
         logger.exception("Error getting feedback")
         raise HTTPException(status_code=500, detail={
@@ -1656,7 +1925,8 @@ async def create_streak(req: schemas.StreakCreateRequest, current_user: dict = D
         
         streak = await streak_crud.create_streak(streak_data)
         
-        logger.info(f"📈 Streak recorded for user {user_id} on {learned_date.strftime('%Y-%m-%d')}: count={streak.count}, is_qualify={streak.is_qualify}")
+        logger.info("Streak recorded for user %s on %s: count=%d, is_qualify=%s",
+                    user_id, learned_date.date(), streak.count, streak.is_qualify)
         
         return schemas.StreakResponse(
             id=str(streak.id),
@@ -1844,7 +2114,7 @@ async def get_today_yesterday_streak_status(date: str = "today", current_user: d
     except HTTPException:
         raise
     except Exception as e:
-        logger.exception(f"Error getting streak status for {date}")
+        logger.exception("Error getting streak status for %s", date)
         raise HTTPException(status_code=500, detail={
             "error": "retrieval_failed",
             "message": f"Failed to get streak status for {date}",
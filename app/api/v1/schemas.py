@@ -32,11 +32,18 @@ class ParagraphRequest(BaseModel):
     prompt: Optional[str] = None
     tone: Optional[str] = None
     topic : Optional[str] = None
+    use_cache: Optional[bool] = True  # Set to False to always call the LLM provider
+    provider: Optional[str] = None  # "gemini" (default), "openai" or "claude"
 
 class ParagraphResponse(BaseModel):
     result: str
     status: bool
 
+class GenerationCacheStatsResponse(BaseModel):
+    enabled: bool
+    stats: Optional[dict] = None
+    status: bool
+
 # === Save paragraph and vocabularies ===
 class SaveParagraphRequest(BaseModel):
     vocabs: List[str]
@@ -84,6 +91,8 @@ class UniqueVocabsResponse(BaseModel):
 # === Google Authentication ===
 class GoogleLoginRequest(BaseModel):
     authorization_code: str
+    # redirect_uri used to obtain the code ("postmessage" for popup mode); optional
+    redirect_uri: Optional[str] = None
 
 class UserInfo(BaseModel):
     id: str
@@ -155,6 +164,8 @@ class VocabCollectionResponse(BaseModel):
 class VocabCollectionsListResponse(BaseModel):
     collections: List[VocabCollectionResponse]
     total: int
+    next_cursor: Optional[str] = None  # Pass as ?after= for the next page
+    prev_cursor: Optional[str] = None  # Pass as ?before= for the previous page
     status: bool
 
 # === History by Date ===
@@ -170,9 +181,20 @@ class StudySessionResponse(BaseModel):
     created_at: str
     status: bool = True
 
+class StudySessionBatchRequest(BaseModel):
+    events: List[StudySessionRequest]
+
+class StudySessionBatchResponse(BaseModel):
+    """Response for batch recording of study events"""
+    recorded: List[StudySessionResponse]  # One entry per (vocab, day) touched
+    total_events: int
+    status: bool = True
+
 class StudyHistoryResponse(BaseModel):
     history: List[dict]  # Contains vocab info and study data
     total: int
+    next_cursor: Optional[str] = None  # Pass as ?after= for the next page
+    prev_cursor: Optional[str] = None  # Pass as ?before= for the previous page
     status: bool
 
 # === User Feedback ===
@@ -192,6 +214,8 @@ class UserFeedbackResponse(BaseModel):
 class UserFeedbackListResponse(BaseModel):
     feedbacks: List[UserFeedbackResponse]
     total: int
+    next_cursor: Optional[str] = None  # Pass as ?after= for the next page
+    prev_cursor: Optional[str] = None  # Pass as ?before= for the previous page
     status: bool
 
 # === Updated Learned Vocabs (with collection support) ===
@@ -1,22 +1,74 @@
+from typing import Optional
+
 from pydantic_settings import BaseSettings
 
 class Settings(BaseSettings):
-    # Gemini settings
-    GEMINI_API_KEY: str
+    # LLM provider settings; a provider without its key is reported as unavailable when requested
+    GEMINI_API_KEY: Optional[str] = None
+    OPENAI_API_KEY: Optional[str] = None
+    CLAUDE_API_KEY: Optional[str] = None
+    LLM_PROVIDERS: str = "gemini,openai,claude"  # comma-separated, enabled providers
+    DEFAULT_LLM_PROVIDER: str = "gemini"
     
     # MongoDB settings
     MONGODB_URL: str = "mongodb://localhost:27017"
     MONGODB_DATABASE: str = "english_server_db"
+    # Connection pool of each worker process (total connections = workers x MONGODB_MAX_POOL_SIZE)
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 0
+    MONGODB_MAX_IDLE_TIME_MS: Optional[int] = None  # close pooled connections idle this long
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: Optional[int] = None  # fail instead of waiting forever for a free connection
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 30000
+    MONGODB_CONNECT_TIMEOUT_MS: int = 20000
     
     # Schema synchronization settings
     AUTO_SYNC_SCHEMA: bool = True
     AUTO_CREATE_COLLECTIONS: bool = True
     AUTO_UPDATE_INDEXES: bool = True
     AUTO_UPDATE_VALIDATION: bool = True
+    SCHEMA_SYNC_IN_BACKGROUND: bool = True  # don't hold startup for index builds
+    SCHEMA_SYNC_LEASE_SECONDS: int = 300  # only the lease holder migrates; renewed while it runs
+    
+    # Paragraph generation cache settings
+    GENERATION_CACHE_ENABLED: bool = True
+    GENERATION_CACHE_BACKEND: str = "memory"  # "memory" (per worker) or "mongo" (shared)
+    GENERATION_CACHE_TTL_SECONDS: int = 86400
+    GENERATION_CACHE_MAX_ENTRIES: int = 1000
+    
+    # Verified access-token cache used by get_current_user (per worker)
+    TOKEN_CACHE_ENABLED: bool = True
+    TOKEN_CACHE_MAX_ENTRIES: int = 10000
+    # How often each worker loads logouts handled by other workers
+    TOKEN_REVOCATION_SYNC_SECONDS: int = 5
+    
+    # Google OAuth HTTP client (one pooled client per worker)
+    GOOGLE_TOKEN_URL: str = "https://oauth2.googleapis.com/token"
+    GOOGLE_USERINFO_URL: str = "https://www.googleapis.com/oauth2/v2/userinfo"
+    GOOGLE_CERTS_URL: str = "https://www.googleapis.com/oauth2/v1/certs"
+    GOOGLE_HTTP2: bool = True  # used when the h2 package is installed
+    GOOGLE_HTTP_TIMEOUT_SECONDS: float = 10.0
+    GOOGLE_HTTP_CONNECT_TIMEOUT_SECONDS: float = 5.0
+    GOOGLE_HTTP_MAX_CONNECTIONS: int = 20
+    
+    # Password hashing (bcrypt runs on a bounded thread pool)
+    PASSWORD_HASH_ROUNDS: int = 12  # bcrypt work factor for new hashes
+    PASSWORD_HASH_MAX_WORKERS: int = 2
+    
+    # Prometheus metrics at /metrics; with several workers also set PROMETHEUS_MULTIPROC_DIR
+    METRICS_ENABLED: bool = True
+    
+    # Logging (written by a background thread; see app/utils/logging_conf.py)
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"  # "json" or "text"
+    LOG_QUEUE_SIZE: int = 10000  # records beyond this are dropped instead of blocking requests
+    LOG_SAMPLE_RATES: str = ""  # INFO sampling per route handler, e.g. "*=0.1,google_login=1"
+    ACCESS_LOG: bool = True  # uvicorn access log line per request
     
     # Server settings
     ENV: str = "development"
+    HOST: str = "0.0.0.0"
     PORT: int = 8000
+    WEB_CONCURRENCY: int = 0  # worker processes for `python -m app.server`; 0 = one per available CPU
 
     class Config:
         env_file = ".env"
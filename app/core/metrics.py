@@ -0,0 +1,277 @@
+"""
+Prometheus metrics: HTTP routes, MongoDB commands and LLM provider calls
+
+Served at /metrics in the Prometheus text format. Every label has a bounded
+set of values so the number of series stays fixed however much traffic
+arrives:
+- route: the route template ("/api/v1/db/users/{user_id}"), never the raw
+  path; requests that match no route share "unmatched"
+- method: the standard HTTP methods, anything else is "OTHER"
+- MongoDB command: an allowlist of driver commands, anything else is "other";
+  collection: the first MAX_COLLECTION_LABELS names seen, then "other"
+- LLM provider: the providers the registry knows; error: the exception class
+
+With several worker processes (`python -m app.server`), set
+PROMETHEUS_MULTIPROC_DIR to an empty directory shared by the workers so
+/metrics aggregates all of them instead of answering for one worker.
+"""
+import os
+import threading
+import time
+from typing import Dict, List, Optional, Pattern, Tuple
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.routing import compile_path
+
+from app.core.config import settings
+
+METRICS_PATH = "/metrics"
+
+HTTP_METHODS = frozenset({"GET", "POST", "PUT", "PATCH", "DELETE", "HEAD", "OPTIONS"})
+UNMATCHED_ROUTE = "unmatched"
+
+MONGO_COMMANDS = frozenset({
+    "find", "getMore", "insert", "update", "delete", "findAndModify", "aggregate",
+    "count", "distinct", "createIndexes", "dropIndexes", "listIndexes", "listCollections",
+    "create", "collMod", "drop", "dropDatabase", "ping", "endSessions",
+    "commitTransaction", "abortTransaction", "killCursors",
+})
+MAX_COLLECTION_LABELS = 64
+# Started commands waiting for their succeeded/failed event, per worker
+MAX_PENDING_COMMANDS = 10000
+
+HTTP_REQUESTS = Counter(
+    "http_requests_total", "HTTP requests served",
+    ["method", "route", "status"]
+)
+HTTP_REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time from request start to the end of the response body",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+HTTP_REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "HTTP requests being served",
+    ["method", "route"],
+    multiprocess_mode="livesum"
+)
+
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds", "MongoDB command round trip as reported by the driver",
+    ["collection", "command"],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total", "MongoDB commands that returned an error",
+    ["collection", "command"]
+)
+
+LLM_REQUEST_DURATION = Histogram(
+    "llm_request_duration_seconds", "LLM generation time (streams: until the last chunk)",
+    ["provider", "operation"],
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0, 120.0)
+)
+LLM_PROMPT_CHARS = Histogram(
+    "llm_prompt_chars", "Prompt size in characters",
+    ["provider"],
+    buckets=(256, 1024, 2048, 4096, 8192, 16384, 32768, 65536)
+)
+LLM_RESPONSE_CHARS = Histogram(
+    "llm_response_chars", "Generated text size in characters",
+    ["provider"],
+    buckets=(64, 256, 1024, 2048, 4096, 8192, 16384, 32768)
+)
+LLM_ERRORS = Counter(
+    "llm_errors_total", "LLM calls that raised",
+    ["provider", "error"]
+)
+
+LOG_RECORDS_DROPPED = Counter(
+    "log_records_dropped_total", "Log records dropped because the logging queue was full"
+)
+
+# HTTP
+
+def _route_templates(routes, prefix: str = ""):
+    """(full path template, methods) of every route, descending into included routers"""
+    for route in routes:
+        included = getattr(route, "original_router", None)
+        if included is not None:
+            # Newer FastAPI keeps included routers nested instead of copying their routes
+            yield from _route_templates(included.routes, prefix + route.include_context.prefix)
+        elif hasattr(route, "path"):
+            yield prefix + route.path, getattr(route, "methods", None)
+
+_route_tables: Dict[int, List[Tuple[Pattern, str, Optional[set]]]] = {}
+
+def route_table(app) -> List[Tuple[Pattern, str, Optional[set]]]:
+    """Compiled route templates of an app, built on its first request"""
+    table = _route_tables.get(id(app))
+    if table is None:
+        table = [
+            (compile_path(template)[0], template, methods)
+            for template, methods in _route_templates(app.router.routes)
+        ]
+        _route_tables[id(app)] = table
+    return table
+
+def route_label(app, scope) -> str:
+    """Template of the route that will serve this request"""
+    path = scope["path"]
+    partial = None
+    for regex, template, methods in route_table(app):
+        if regex.match(path):
+            if methods is None or scope["method"] in methods:
+                return template
+            if partial is None:
+                # Path matches but not the method (405): same choice as the router
+                partial = template
+    return partial or UNMATCHED_ROUTE
+
+def method_label(method: str) -> str:
+    return method if method in HTTP_METHODS else "OTHER"
+
+class PrometheusMiddleware:
+    """
+    ASGI middleware recording count, duration and in-flight requests per route
+
+    Plain ASGI rather than BaseHTTPMiddleware so streamed responses pass
+    through untouched; duration covers the whole body, so a streamed
+    paragraph is timed until its last event.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["path"] == METRICS_PATH:
+            await self.app(scope, receive, send)
+            return
+
+        method = method_label(scope["method"])
+        route = route_label(scope["app"], scope)
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        in_progress = HTTP_REQUESTS_IN_PROGRESS.labels(method, route)
+        in_progress.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route).observe(time.perf_counter() - start)
+            HTTP_REQUESTS.labels(method, route, str(status_code)).inc()
+            in_progress.dec()
+
+def metrics_registry():
+    """Registry to expose: the default one, or all workers' files in multiprocess mode"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    from prometheus_client import REGISTRY
+    return REGISTRY
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+def mark_worker_dead():
+    """Drop this worker's live gauges from the shared files (called on shutdown)"""
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        multiprocess.mark_process_dead(os.getpid())
+
+# MongoDB
+
+class MongoCommandMetrics(monitoring.CommandListener):
+    """
+    pymongo CommandListener timing every command per collection and command
+
+    Succeeded/failed events carry neither the collection nor the command
+    document, so the labels are remembered from the started event, keyed by
+    (connection, request id). A command whose connection dies may never get
+    its closing event; beyond max_pending remembered commands the oldest are
+    forgotten, so such strays cannot pile up.
+    """
+
+    def __init__(self, max_collections: int = MAX_COLLECTION_LABELS, max_pending: int = MAX_PENDING_COMMANDS):
+        self.max_collections = max_collections
+        self.max_pending = max_pending
+        self._collections = set()
+        self._pending: Dict[Tuple, Tuple[str, str]] = {}
+        self._lock = threading.Lock()
+
+    def _collection_label(self, name: Optional[str]) -> str:
+        if not name:
+            return "none"
+        if name in self._collections:
+            return name
+        with self._lock:
+            if len(self._collections) < self.max_collections:
+                self._collections.add(name)
+                return name
+        return "other"
+
+    def _labels(self, event) -> Tuple[str, str]:
+        command_name = event.command_name
+        command = command_name if command_name in MONGO_COMMANDS else "other"
+        target = event.command.get(command_name) if event.command else None
+        if command_name == "getMore":
+            target = event.command.get("collection")
+        return self._collection_label(target if isinstance(target, str) else None), command
+
+    def started(self, event):
+        self._pending[(event.connection_id, event.request_id)] = self._labels(event)
+        if len(self._pending) > self.max_pending:
+            self._forget_oldest()
+
+    def _forget_oldest(self):
+        # Dicts keep insertion order: the first entries are the longest outstanding
+        with self._lock:
+            while len(self._pending) > self.max_pending:
+                self._pending.pop(next(iter(self._pending)), None)
+
+    def succeeded(self, event):
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is not None:
+            MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1_000_000)
+
+    def failed(self, event):
+        labels = self._pending.pop((event.connection_id, event.request_id), None)
+        if labels is not None:
+            MONGO_COMMAND_DURATION.labels(*labels).observe(event.duration_micros / 1_000_000)
+            MONGO_COMMAND_FAILURES.labels(*labels).inc()
+
+mongo_command_metrics = MongoCommandMetrics()
+
+# LLM providers
+
+def observe_llm_call(provider: str, operation: str, prompt: str, started: float,
+                     response: Optional[str] = None, response_chars: Optional[int] = None,
+                     error: Optional[BaseException] = None):
+    """Record one generate/stream call of a provider client (no-op with METRICS_ENABLED off)"""
+    if not settings.METRICS_ENABLED:
+        return
+    LLM_REQUEST_DURATION.labels(provider, operation).observe(time.perf_counter() - started)
+    LLM_PROMPT_CHARS.labels(provider).observe(len(prompt))
+    if error is not None:
+        LLM_ERRORS.labels(provider, type(error).__name__).inc()
+        return
+    if response is not None:
+        response_chars = len(response)
+    if response_chars is not None:
+        LLM_RESPONSE_CHARS.labels(provider).observe(response_chars)
@@ -0,0 +1,77 @@
+"""
+Password hashing off the event loop
+
+bcrypt is deliberately slow (~100-300 ms per hash at the default cost), so
+hashing and checking run on a small bounded thread pool instead of inline in
+a request handler; bcrypt releases the GIL while it works, so other requests
+keep being served. PASSWORD_HASH_ROUNDS sets the work factor of new hashes;
+existing hashes keep verifying at whatever cost they were created with.
+
+Accounts that never log in with a password (Google OAuth) store an unusable
+sentinel instead of a hash of a random password: it satisfies the schema,
+costs nothing to create, and never verifies.
+"""
+import asyncio
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+import bcrypt
+
+from app.core.config import settings
+
+# Prefix that no bcrypt hash starts with ("$2b$...")
+UNUSABLE_PASSWORD_PREFIX = "!"
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_password_executor() -> ThreadPoolExecutor:
+    """Get (or lazily create) the executor for bcrypt calls"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=settings.PASSWORD_HASH_MAX_WORKERS,
+            thread_name_prefix="password-hash"
+        )
+    return _executor
+
+def shutdown_password_executor():
+    """Shut down the bcrypt executor (called on application shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+def hash_password_sync(password: str) -> str:
+    """Hash a password with bcrypt (blocking)"""
+    salt = bcrypt.gensalt(rounds=settings.PASSWORD_HASH_ROUNDS)
+    return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+
+def verify_password_sync(password: str, hashed_password: str) -> bool:
+    """Check a password against a bcrypt hash (blocking)"""
+    if not is_password_usable(hashed_password):
+        return False
+    try:
+        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    except ValueError:
+        # Not a bcrypt hash
+        return False
+
+async def hash_password(password: str) -> str:
+    """Hash a password on the bcrypt executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), hash_password_sync, password)
+
+async def verify_password(password: str, hashed_password: str) -> bool:
+    """Check a password on the bcrypt executor; unusable passwords fail without hashing"""
+    if not is_password_usable(hashed_password):
+        return False
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_password_executor(), verify_password_sync, password, hashed_password)
+
+def make_unusable_password() -> str:
+    """Password value for accounts that cannot log in with a password"""
+    return UNUSABLE_PASSWORD_PREFIX + secrets.token_urlsafe(16)
+
+def is_password_usable(hashed_password: Optional[str]) -> bool:
+    return bool(hashed_password) and not hashed_password.startswith(UNUSABLE_PASSWORD_PREFIX)
@@ -1,8 +1,14 @@
 """
 MongoDB connection setup using Motor (async MongoDB driver)
+
+Every worker process owns its client: connect_to_mongo runs in the lifespan
+of each worker. `python -m app.server` spawns its workers, so none of them
+inherits a client; a server that forks workers after importing the app must
+likewise connect in each worker (MongoClient is not fork-safe).
 """
-import os
+import asyncio
 import logging
+from typing import Optional, Tuple
 from motor.motor_asyncio import AsyncIOMotorClient
 from pymongo import MongoClient
 from app.core.config import settings
@@ -12,55 +18,121 @@ logger = logging.getLogger(__name__)
 class MongoDB:
     client: AsyncIOMotorClient = None
     database = None
+    schema_sync_task: asyncio.Task = None
+    server_version: Optional[Tuple[int, ...]] = None
 
-# Global MongoDB instance
+# Global MongoDB instance (one per process)
 mongodb = MongoDB()
 
+def mongo_client_options() -> dict:
+    """Pool and timeout options of the per-worker client, from Settings"""
+    options = {
+        "maxPoolSize": settings.MONGODB_MAX_POOL_SIZE,
+        "minPoolSize": settings.MONGODB_MIN_POOL_SIZE,
+        "serverSelectionTimeoutMS": settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+        "connectTimeoutMS": settings.MONGODB_CONNECT_TIMEOUT_MS,
+    }
+    if settings.MONGODB_MAX_IDLE_TIME_MS is not None:
+        options["maxIdleTimeMS"] = settings.MONGODB_MAX_IDLE_TIME_MS
+    if settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS is not None:
+        options["waitQueueTimeoutMS"] = settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS
+    if settings.METRICS_ENABLED:
+        from app.core.metrics import mongo_command_metrics
+        options["event_listeners"] = [mongo_command_metrics]
+    return options
+
 async def connect_to_mongo():
     """Create database connection"""
-    mongodb.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    mongodb.client = AsyncIOMotorClient(settings.MONGODB_URL, **mongo_client_options())
+    mongodb.server_version = None
     mongodb.database = mongodb.client[settings.MONGODB_DATABASE]
     
     # Test connection
     try:
-        await mongodb.client.admin.command('ping')
-        logger.info(f"Successfully connected to MongoDB: {settings.MONGODB_DATABASE}")
-        
         # Auto-sync schema if enabled
         if settings.AUTO_SYNC_SCHEMA:
-            from app.database.migrations import auto_sync_schema
+            from app.database.migrations import SchemaMigration, schema_is_current
             
-            logger.info("Starting automatic schema synchronization...")
-            sync_results = await auto_sync_schema(
-                mongodb.database,
-                auto_create=settings.AUTO_CREATE_COLLECTIONS,
-                update_indexes=settings.AUTO_UPDATE_INDEXES,
-                update_validation=settings.AUTO_UPDATE_VALIDATION
+            fingerprint = SchemaMigration(mongodb.database).schema_fingerprint(
+                settings.AUTO_CREATE_COLLECTIONS, settings.AUTO_UPDATE_INDEXES, settings.AUTO_UPDATE_VALIDATION
             )
+            # One read: doubles as the connection test
+            schema_current = await schema_is_current(mongodb.database, fingerprint)
+            logger.info("Successfully connected to MongoDB: %s", settings.MONGODB_DATABASE)
             
-            success_count = sum(1 for result in sync_results.values() if result)
-            total_count = len(sync_results)
-            
-            if success_count == total_count:
-                logger.info(f"✅ Schema sync completed successfully ({success_count}/{total_count} collections)")
+            if schema_current:
+                logger.info("Schema unchanged (fingerprint %s), skipping synchronization", fingerprint[:12])
+            elif settings.SCHEMA_SYNC_IN_BACKGROUND:
+                # Index builds can take a while; serve requests meanwhile
+                mongodb.schema_sync_task = asyncio.create_task(_sync_schema())
             else:
-                logger.warning(f"⚠️ Schema sync partially completed ({success_count}/{total_count} collections)")
-                for collection, success in sync_results.items():
-                    if not success:
-                        logger.warning(f"   Failed: {collection}")
+                await _sync_schema()
         else:
+            await mongodb.client.admin.command('ping')
+            logger.info("Successfully connected to MongoDB: %s", settings.MONGODB_DATABASE)
             logger.info("Automatic schema synchronization is disabled")
             
     except Exception as e:
-        logger.error(f"Failed to connect to MongoDB: {e}")
+        logger.error("Failed to connect to MongoDB: %s", e)
         raise
 
+async def _sync_schema():
+    """Sync the schema under the migration lease, then report index coverage"""
+    from app.database.migrations import report_unsupported_query_patterns, sync_schema_under_lease
+    
+    try:
+        logger.info("Starting automatic schema synchronization...")
+        sync_results = await sync_schema_under_lease(
+            mongodb.database,
+            auto_create=settings.AUTO_CREATE_COLLECTIONS,
+            update_indexes=settings.AUTO_UPDATE_INDEXES,
+            update_validation=settings.AUTO_UPDATE_VALIDATION,
+            lease_seconds=settings.SCHEMA_SYNC_LEASE_SECONDS
+        )
+    except asyncio.CancelledError:
+        raise
+    except Exception as e:
+        logger.error("Schema synchronization failed: %s", e)
+        return
+    
+    if not sync_results:
+        # Another worker is migrating, or it finished while we waited for the lease
+        return
+    
+    success_count = sum(1 for result in sync_results.values() if result)
+    total_count = len(sync_results)
+    
+    if success_count == total_count:
+        logger.info("Schema sync completed successfully (%d/%d collections)", success_count, total_count)
+    else:
+        logger.warning("Schema sync partially completed (%d/%d collections)", success_count, total_count)
+        for collection, success in sync_results.items():
+            if not success:
+                logger.warning("   Failed: %s", collection)
+    
+    # Report route queries that would scan a collection
+    try:
+        await report_unsupported_query_patterns(mongodb.database)
+    except Exception as e:
+        logger.warning("Index coverage report failed: %s", e)
+
 async def close_mongo_connection():
     """Close database connection"""
+    if mongodb.schema_sync_task and not mongodb.schema_sync_task.done():
+        # The lease is released; the next start retries the sync
+        mongodb.schema_sync_task.cancel()
+        await asyncio.gather(mongodb.schema_sync_task, return_exceptions=True)
     if mongodb.client:
         mongodb.client.close()
         logger.info("Disconnected from MongoDB")
 
+async def get_server_version() -> Tuple[int, ...]:
+    """(major, minor, patch) of the connected server, read on first use (not at startup)"""
+    if mongodb.server_version is None:
+        info = await mongodb.client.server_info()
+        mongodb.server_version = tuple(info.get("versionArray", [0, 0, 0])[:3])
+    return mongodb.server_version
+
 def get_database():
     """Get database instance"""
     return mongodb.database
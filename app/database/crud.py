@@ -1,26 +1,75 @@
 """
 Database operations for MongoDB collections
 """
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
+from collections import Counter
 from datetime import datetime, timedelta
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorCollection
-import bcrypt
+from pymongo import ASCENDING, DESCENDING, InsertOne, ReturnDocument, UpdateOne
+from pymongo.errors import BulkWriteError, DuplicateKeyError
+import hashlib
+import json
 import secrets
 import string
 
-from app.database.connection import get_collection
+from app.core import security
+from app.database.connection import get_collection, get_server_version
+from app.database.pagination import keyset_query, keyset_order
 from app.database.models import (
     UserCreate, GoogleUserCreate, UserInDB, UserUpdate, UserResponse,
     RefreshTokenCreate, RefreshTokenInDB, RefreshTokenResponse,
     InputHistoryCreate, InputHistoryCreateInternal, InputHistoryInDB, InputHistoryResponse,
     SavedParagraphCreate, SavedParagraphInDB, SavedParagraphResponse,
-    LearnedVocabsCreate, LearnedVocabsCreateInternal, LearnedVocabsInDB, LearnedVocabsResponse,
+    LearnedVocabsCreate, LearnedVocabsCreateInternal, LearnedVocabsInDB, LearnedVocabsResponse, VOCAB_COLLATION,
     VocabCollectionCreate, VocabCollectionInDB, VocabCollectionResponse,
     HistoryByDateCreate, HistoryByDateInDB, HistoryByDateResponse,
     UserFeedbackCreate, UserFeedbackInDB, UserFeedbackResponse,
-    StreakCreate, StreakCreateInternal, StreakInDB, StreakResponse
+    StreakCreate, StreakCreateInternal, StreakInDB, StreakResponse,
+    CollectionDeletionJobInDB
 )
+from app.utils.logging_conf import get_logger
+
+logger = get_logger("crud")
+
+def normalize_words(word_list: List[str]) -> List[str]:
+    """Filter out empty/whitespace-only words, convert to lowercase, strip, and sort"""
+    normalized = []
+    for word in word_list:
+        if isinstance(word, str):
+            cleaned = word.strip().lower()
+            if cleaned:  # Only add non-empty words
+                normalized.append(cleaned)
+    return sorted(normalized)
+
+def make_words_key(word_list: List[str]) -> Optional[str]:
+    """Canonical key of a word list (SHA-256 of the normalized, sorted words)"""
+    normalized = normalize_words(word_list)
+    if not normalized:
+        return None
+    return hashlib.sha256(json.dumps(normalized, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+# learned_vocabs removed per round trip when cascading a collection deletion
+CASCADE_CHUNK_SIZE = 1000
+
+def normalize_vocab(vocab: str) -> str:
+    """Normalized form of a single vocabulary word (stored as vocab_norm)"""
+    return vocab.strip().lower() if isinstance(vocab, str) else ""
+
+# Sort modes of /vocabs_base_on_category: (sort fields, direction, collation); _id breaks ties.
+# Each one is backed by a learned_vocabs index in SchemaMigration._get_collections_config.
+VOCAB_SORT_ORDERS = {
+    "newest": (("created_at",), DESCENDING, None),
+    "oldest": (("created_at",), ASCENDING, None),
+    "alphabetical": (("vocab",), ASCENDING, VOCAB_COLLATION),
+    "frequent": (("usage_count", "created_at"), DESCENDING, None),
+}
+
+def vocab_sort_key(vocab: LearnedVocabsInDB, sort: str) -> Tuple:
+    """(sort value, _id) of a learned vocab for the given sort mode, for keyset cursors"""
+    fields = VOCAB_SORT_ORDERS[sort][0]
+    values = tuple(getattr(vocab, field) for field in fields)
+    return (values[0] if len(values) == 1 else values), vocab.id
 
 class UserCRUD:
     """CRUD operations for Users collection"""
@@ -29,14 +78,13 @@ class UserCRUD:
     def collection(self) -> AsyncIOMotorCollection:
         return get_collection("users")
     
-    def hash_password(self, password: str) -> str:
-        """Hash password using bcrypt"""
-        salt = bcrypt.gensalt()
-        return bcrypt.hashpw(password.encode('utf-8'), salt).decode('utf-8')
+    async def hash_password(self, password: str) -> str:
+        """Hash password using bcrypt, off the event loop"""
+        return await security.hash_password(password)
     
-    def verify_password(self, password: str, hashed_password: str) -> bool:
-        """Verify password against hash"""
-        return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+    async def verify_password(self, password: str, hashed_password: str) -> bool:
+        """Verify password against hash, off the event loop (unusable passwords never match)"""
+        return await security.verify_password(password, hashed_password)
     
     def generate_random_password(self, length: int = 16) -> str:
         """Generate a random password for OAuth users"""
@@ -46,7 +94,7 @@ class UserCRUD:
     async def create_user(self, user_data: UserCreate) -> UserInDB:
         """Create new user"""
         # Hash password
-        hashed_password = self.hash_password(user_data.password)
+        hashed_password = await self.hash_password(user_data.password)
         
         # Create user document
         user_dict = user_data.dict()
@@ -55,30 +103,25 @@ class UserCRUD:
         user_dict['created_at'] = datetime.utcnow()  # Ensure created_at is set
         
         # Insert to database
-        result = await self.collection.insert_one(user_dict)
+        await self.collection.insert_one(user_dict)  # sets user_dict["_id"]
         
         # Return created user
-        created_user = await self.collection.find_one({"_id": result.inserted_id})
-        return UserInDB(**created_user)
+        return UserInDB(**user_dict)
     
     async def create_google_user(self, user_data: GoogleUserCreate) -> UserInDB:
         """Create new Google user"""
-        # Generate random password for OAuth users (required by schema)
-        random_password = self.generate_random_password()
-        hashed_password = self.hash_password(random_password)
-        
         # Create user document
         user_dict = user_data.dict()
         user_dict['auth_type'] = 'google'
-        user_dict['password'] = hashed_password  # Add required password field
+        # OAuth users never log in with a password; the schema still requires the field
+        user_dict['password'] = security.make_unusable_password()
         user_dict['created_at'] = datetime.utcnow()  # Add required created_at field
         
         # Insert to database
-        result = await self.collection.insert_one(user_dict)
+        await self.collection.insert_one(user_dict)  # sets user_dict["_id"]
         
         # Return created user
-        created_user = await self.collection.find_one({"_id": result.inserted_id})
-        return UserInDB(**created_user)
+        return UserInDB(**user_dict)
     
     async def get_user_by_google_id(self, google_id: str) -> Optional[UserInDB]:
         """Get user by Google ID"""
@@ -98,13 +141,92 @@ class UserCRUD:
         # Remove None values
         update_dict = {k: v for k, v in update_dict.items() if v is not None}
         
-        if update_dict:
-            await self.collection.update_one(
-                {"google_id": google_id, "auth_type": "google"}, 
-                {"$set": update_dict}
-            )
+        if not update_dict:
+            return await self.get_user_by_google_id(google_id)
         
-        return await self.get_user_by_google_id(google_id)
+        user = await self.collection.find_one_and_update(
+            {"google_id": google_id, "auth_type": "google"}, 
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
+        )
+        return UserInDB(**user) if user else None
+    
+    async def upsert_google_user(self, user_data: GoogleUserCreate) -> Tuple[UserInDB, bool]:
+        """
+        Create a Google user or refresh their profile in one round trip.
+        Returns (user, created). Safe to run concurrently for the same user.
+        """
+        profile = {
+            k: v for k, v in user_data.dict().items()
+            if k in ("name", "email", "picture", "verified_email", "avt") and v is not None
+        }
+        new_id = ObjectId()
+        
+        for attempt in range(2):
+            try:
+                user = await self.collection.find_one_and_update(
+                    {"google_id": user_data.google_id, "auth_type": "google"},
+                    {
+                        "$set": profile,
+                        "$setOnInsert": {
+                            "_id": new_id,
+                            # OAuth users never log in with a password; the schema still requires the field
+                            "password": security.make_unusable_password(),
+                            "selected_collection_id": None,
+                            "created_at": datetime.utcnow()
+                        }
+                    },
+                    upsert=True,
+                    return_document=ReturnDocument.AFTER
+                )
+                return UserInDB(**user), user["_id"] == new_id
+            except DuplicateKeyError:
+                # A concurrent login inserted the same user first; the retry updates it.
+                # A second failure is a real conflict (e.g. the email belongs to a local account).
+                if attempt:
+                    raise
+    
+    async def ensure_selected_collection(self, user: UserInDB, created: bool = False) -> UserInDB:
+        """
+        Give a user without selected_collection_id one: their newest collection, or a new
+        "Default" collection. Writes are conditional, so concurrent logins agree on one
+        collection and a "Default" created by the losing login is removed again.
+        """
+        if user.selected_collection_id:
+            return user
+        
+        user_id = ObjectId(str(user.id))
+        vocab_collections = get_collection("vocab_collections")
+        
+        # A user inserted by this login has no collections yet
+        existing = None if created else await vocab_collections.find_one(
+            {"user_id": user_id}, {"_id": 1}, sort=[("created_at", DESCENDING), ("_id", DESCENDING)]
+        )
+        
+        if existing:
+            collection_id = existing["_id"]
+        else:
+            # Insert before claiming, so the user never points at a missing collection
+            collection_id = ObjectId()
+            now = datetime.utcnow()
+            await vocab_collections.insert_one({
+                "_id": collection_id, "name": "Default", "user_id": user_id,
+                "created_at": now, "updated_at": now
+            })
+        
+        selected = await self.collection.find_one_and_update(
+            {"_id": user_id, "selected_collection_id": None},
+            {"$set": {"selected_collection_id": str(collection_id)}},
+            return_document=ReturnDocument.AFTER
+        )
+        if selected:
+            return UserInDB(**selected)
+        
+        # Another login selected a collection first
+        current = await self.collection.find_one({"_id": user_id})
+        if not existing and current.get("selected_collection_id") != str(collection_id):
+            await vocab_collections.delete_one({"_id": collection_id})
+        return UserInDB(**current)
     
     async def get_user_by_id(self, user_id: str) -> Optional[UserInDB]:
         """Get user by ID"""
@@ -120,21 +242,48 @@ class UserCRUD:
         """Update user"""
         update_dict = {k: v for k, v in update_data.dict().items() if v is not None}
         
-        if update_dict:
-            await self.collection.update_one(
-                {"_id": ObjectId(user_id)}, 
-                {"$set": update_dict}
-            )
+        if not update_dict:
+            return await self.get_user_by_id(user_id)
         
-        return await self.get_user_by_id(user_id)
+        user = await self.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)}, 
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
+        )
+        return UserInDB(**user) if user else None
     
     async def update_selected_collection(self, user_id: str, collection_id: str) -> Optional[UserInDB]:
         """Update user's selected collection"""
+        user = await self.collection.find_one_and_update(
+            {"_id": ObjectId(user_id)},
+            {"$set": {"selected_collection_id": collection_id}},
+            return_document=ReturnDocument.AFTER
+        )
+        return UserInDB(**user) if user else None
+    
+    async def replace_selected_collection(self, user_id: str, old_collection_id: str,
+                                          new_collection_id: Optional[str]) -> bool:
+        """Point selected_collection_id at new_collection_id only if it still is old_collection_id"""
+        result = await self.collection.update_one(
+            {"_id": ObjectId(user_id), "selected_collection_id": old_collection_id},
+            {"$set": {"selected_collection_id": new_collection_id}}
+        )
+        return result.modified_count > 0
+    
+    async def set_tokens_revoked_before(self, user_id: str, revoked_before: datetime):
+        """Store the logout cutoff for a user's access tokens (never moves it back)"""
         await self.collection.update_one(
             {"_id": ObjectId(user_id)},
-            {"$set": {"selected_collection_id": collection_id}}
+            {"$max": {"tokens_revoked_before": revoked_before}}
+        )
+    
+    async def get_tokens_revoked_since(self, since: datetime) -> Dict[str, datetime]:
+        """Access-token cutoffs set after `since`, by user ID"""
+        cursor = self.collection.find(
+            {"tokens_revoked_before": {"$gt": since}},
+            {"tokens_revoked_before": 1}
         )
-        return await self.get_user_by_id(user_id)
+        return {str(user["_id"]): user["tokens_revoked_before"] async for user in cursor}
     
     async def delete_user(self, user_id: str) -> bool:
         """Delete user"""
@@ -156,11 +305,10 @@ class RefreshTokenCRUD:
         token_dict['created_at'] = datetime.utcnow()  # Add required created_at field
         
         # Insert to database
-        result = await self.collection.insert_one(token_dict)
+        await self.collection.insert_one(token_dict)  # sets token_dict["_id"]
         
         # Return created token
-        created_token = await self.collection.find_one({"_id": result.inserted_id})
-        return RefreshTokenInDB(**created_token)
+        return RefreshTokenInDB(**token_dict)
     
     async def get_refresh_token_by_token(self, refresh_token: str) -> Optional[RefreshTokenInDB]:
         """Get refresh token by token string"""
@@ -199,18 +347,24 @@ class InputHistoryCRUD:
         return get_collection("input_history")
     
     async def create_input_history(self, history_data: InputHistoryCreateInternal) -> InputHistoryInDB:
-        """Create new input history"""
+        """Create new input history (concurrent saves of the same words return the existing one)"""
         history_dict = history_data.dict()
         # Convert user_id string to ObjectId for storage
         history_dict['user_id'] = ObjectId(history_dict['user_id'])
+        words_key = make_words_key(history_dict['words'])
+        if words_key:
+            history_dict['words_key'] = words_key
         history_dict['created_at'] = datetime.utcnow()  # Add required created_at field
         
         # Insert to database
-        result = await self.collection.insert_one(history_dict)
+        try:
+            await self.collection.insert_one(history_dict)  # sets history_dict["_id"]
+        except DuplicateKeyError:
+            # Another request stored the same word set first (unique user_id + words_key)
+            return await self.find_by_exact_words(str(history_dict['user_id']), history_dict['words'])
         
         # Return created history
-        created_history = await self.collection.find_one({"_id": result.inserted_id})
-        return InputHistoryInDB(**created_history)
+        return InputHistoryInDB(**history_dict)
     
     async def get_input_history_by_id(self, history_id: str) -> Optional[InputHistoryInDB]:
         """Get input history by ID"""
@@ -226,44 +380,18 @@ class InputHistoryCRUD:
         return histories
     
     async def find_by_exact_words(self, user_id: str, words: List[str]) -> Optional[InputHistoryInDB]:
-        """Find input history by exact word match for a user"""
-        # Normalize and sort words for consistent comparison
-        def normalize_words(word_list):
-            # Filter out empty/whitespace-only words, convert to lowercase, strip, and sort
-            normalized = []
-            for word in word_list:
-                if isinstance(word, str):
-                    cleaned = word.strip().lower()
-                    if cleaned:  # Only add non-empty words
-                        normalized.append(cleaned)
-            return sorted(normalized)
-        
-        target_words = normalize_words(words)
-        print(f"🔍 DEBUG: Looking for normalized words: {target_words}")
+        """Find input history by exact word match for a user (indexed on user_id + words_key)"""
+        words_key = make_words_key(words)
         
         # Don't search if no valid words provided
-        if not target_words:
-            print("⚠️ DEBUG: No valid words provided, returning None")
+        if not words_key:
             return None
         
-        # Find all input histories for the user
-        cursor = self.collection.find({"user_id": ObjectId(user_id)})
-        
-        count = 0
-        async for history in cursor:
-            count += 1
-            # Get the words from the document
-            history_words = history.get('words', [])
-            existing_words = normalize_words(history_words)
-            print(f"🔍 DEBUG: Comparing with existing #{count}: {existing_words}")
-            
-            # Check if words match exactly
-            if existing_words == target_words:
-                print(f"✅ DEBUG: Match found at record #{count}!")
-                return InputHistoryInDB(**history)
-        
-        print(f"❌ DEBUG: No match found among {count} records")
-        return None
+        history = await self.collection.find_one({
+            "user_id": ObjectId(user_id),
+            "words_key": words_key
+        })
+        return InputHistoryInDB(**history) if history else None
     
     async def delete_input_history(self, history_id: str) -> bool:
         """Delete input history"""
@@ -277,19 +405,19 @@ class SavedParagraphCRUD:
     def collection(self) -> AsyncIOMotorCollection:
         return get_collection("saved_paragraph")
     
-    async def create_saved_paragraph(self, paragraph_data: SavedParagraphCreate) -> SavedParagraphInDB:
-        """Create new saved paragraph"""
+    async def create_saved_paragraph(self, paragraph_data: SavedParagraphCreate, user_id: str) -> SavedParagraphInDB:
+        """Create new saved paragraph (user_id is the owner of the input history)"""
         paragraph_dict = paragraph_data.dict()
         # Convert input_history_id string to ObjectId for storage
         paragraph_dict['input_history_id'] = ObjectId(paragraph_dict['input_history_id'])
+        paragraph_dict['user_id'] = ObjectId(user_id)
         paragraph_dict['created_at'] = datetime.utcnow()  # Add required created_at field
         
         # Insert to database
-        result = await self.collection.insert_one(paragraph_dict)
+        await self.collection.insert_one(paragraph_dict)  # sets paragraph_dict["_id"]
         
         # Return created paragraph
-        created_paragraph = await self.collection.find_one({"_id": result.inserted_id})
-        return SavedParagraphInDB(**created_paragraph)
+        return SavedParagraphInDB(**paragraph_dict)
     
     async def get_saved_paragraph_by_id(self, paragraph_id: str) -> Optional[SavedParagraphInDB]:
         """Get saved paragraph by ID"""
@@ -304,9 +432,23 @@ class SavedParagraphCRUD:
             paragraphs.append(SavedParagraphInDB(**paragraph))
         return paragraphs
     
-    async def get_user_saved_paragraphs(self, user_id: str, limit: int = 50) -> List[dict]:
-        """Get saved paragraphs for a user with input history info"""
+    async def get_user_saved_paragraphs(self, user_id: str, limit: int = 50,
+                                        after: Optional[str] = None, before: Optional[str] = None) -> List[dict]:
+        """Get saved paragraphs for a user with input history info (newest first, keyset paged)"""
+        range_filter, sort = keyset_query("created_at", DESCENDING, after, before)
+        
+        # Select and page on the (user_id, created_at) index first, then join
+        # input_history only for the returned paragraphs
         pipeline = [
+            {
+                "$match": {"user_id": ObjectId(user_id), **range_filter}
+            },
+            {
+                "$sort": dict(sort)
+            },
+            {
+                "$limit": limit
+            },
             {
                 "$lookup": {
                     "from": "input_history",
@@ -316,25 +458,88 @@ class SavedParagraphCRUD:
                 }
             },
             {
-                "$unwind": "$input_history"
+                # Kept when the input history is gone, so the page size and cursors stay exact
+                "$unwind": {"path": "$input_history", "preserveNullAndEmptyArrays": True}
+            }
+        ]
+        
+        paragraphs = []
+        async for paragraph in self.collection.aggregate(pipeline):
+            paragraphs.append(paragraph)
+        return keyset_order(paragraphs, before)
+    
+    async def get_user_paragraph_groups(self, user_id: str, limit: int = 50, paragraphs_per_group: int = 20,
+                                        after: Optional[str] = None, before: Optional[str] = None) -> List[dict]:
+        """
+        Get a user's saved paragraphs grouped by input history (most recently active group first, keyset paged)
+        
+        Each group has _id (the input_history_id), latest_created_at, total_paragraphs,
+        up to paragraphs_per_group paragraph texts (newest first) and input_history.
+        """
+        range_filter, sort = keyset_query("latest_created_at", DESCENDING, after, before)
+        
+        # Read the user's paragraphs newest first on the (user_id, created_at, _id) index so
+        # $first / $firstN see them in that order, group them, then page over the groups and
+        # join input_history only for the returned groups. On MongoDB 5.2+ $firstN keeps at
+        # most paragraphs_per_group texts per group in the accumulator, so memory follows the
+        # page, not the user's whole history; older servers collect every text with $push
+        # and slice the returned groups
+        if await get_server_version() >= (5, 2):
+            paragraphs = {"$firstN": {"n": paragraphs_per_group, "input": "$paragraph"}}
+            cap_paragraphs = []
+        else:
+            paragraphs = {"$push": "$paragraph"}
+            cap_paragraphs = [{
+                "$project": {
+                    "latest_created_at": 1,
+                    "total_paragraphs": 1,
+                    "paragraphs": {"$slice": ["$paragraphs", paragraphs_per_group]}
+                }
+            }]
+        
+        pipeline = [
+            {
+                "$match": {"user_id": ObjectId(user_id)}
+            },
+            {
+                "$sort": {"created_at": -1, "_id": -1}
             },
             {
-                "$match": {
-                    "input_history.user_id": ObjectId(user_id)
+                "$group": {
+                    "_id": "$input_history_id",
+                    "latest_created_at": {"$first": "$created_at"},
+                    "total_paragraphs": {"$sum": 1},
+                    "paragraphs": paragraphs
                 }
             },
             {
-                "$sort": {"created_at": -1}
+                "$match": range_filter
+            },
+            {
+                "$sort": dict(sort)
             },
             {
                 "$limit": limit
+            },
+            *cap_paragraphs,
+            {
+                "$lookup": {
+                    "from": "input_history",
+                    "localField": "_id",
+                    "foreignField": "_id",
+                    "as": "input_history"
+                }
+            },
+            {
+                # Kept when the input history is gone, so the page size and cursors stay exact
+                "$unwind": {"path": "$input_history", "preserveNullAndEmptyArrays": True}
             }
         ]
         
-        paragraphs = []
-        async for paragraph in self.collection.aggregate(pipeline):
-            paragraphs.append(paragraph)
-        return paragraphs
+        groups = []
+        async for group in self.collection.aggregate(pipeline, allowDiskUse=True):
+            groups.append(group)
+        return keyset_order(groups, before)
     
     async def delete_saved_paragraph(self, paragraph_id: str) -> bool:
         """Delete saved paragraph"""
@@ -353,6 +558,7 @@ class LearnedVocabsCRUD:
         vocabs_dict = vocabs_data.dict()
         # Convert collection_id string to ObjectId for storage
         vocabs_dict['collection_id'] = ObjectId(vocabs_dict['collection_id'])
+        vocabs_dict['vocab_norm'] = normalize_vocab(vocabs_dict['vocab'])
         current_time = datetime.utcnow()
         vocabs_dict['created_at'] = current_time
         vocabs_dict['updated_at'] = current_time
@@ -361,11 +567,126 @@ class LearnedVocabsCRUD:
         vocabs_dict['usage_count'] = 1  # Initialize usage count
         
         # Insert to database
-        result = await self.collection.insert_one(vocabs_dict)
+        await self.collection.insert_one(vocabs_dict)  # sets vocabs_dict["_id"]
         
         # Return created entry
-        created_vocabs = await self.collection.find_one({"_id": result.inserted_id})
-        return LearnedVocabsInDB(**created_vocabs)
+        return LearnedVocabsInDB(**vocabs_dict)
+    
+    async def upsert_vocabs_batch(self, collection_id: str, vocabs: List[str]) -> List[Tuple[LearnedVocabsInDB, bool]]:
+        """
+        Add a batch of words to a collection with one lookup and one bulk write
+        
+        Words already in the collection (matched on vocab_norm) get their usage_count
+        incremented, new words are inserted. A word repeated in the batch counts once
+        per occurrence. Returns (entry, is_new) for every input word, in input order,
+        with the usage_count the entry had right after that occurrence - the same
+        results as adding the words one at a time.
+        """
+        collection_oid = ObjectId(collection_id)
+        words = [(vocab.strip(), normalize_vocab(vocab)) for vocab in vocabs if normalize_vocab(vocab)]
+        if not words:
+            return []
+        
+        norms = list(dict.fromkeys(norm for _, norm in words))
+        occurrences = Counter(norm for _, norm in words)
+        
+        # Resolve every word in one query
+        existing = {}
+        cursor = self.collection.find({
+            "collection_id": collection_oid,
+            "vocab_norm": {"$in": norms},
+            "is_deleted": False
+        })
+        async for vocabs_entry in cursor:
+            existing[vocabs_entry["vocab_norm"]] = vocabs_entry
+        
+        current_time = datetime.utcnow()
+        new_entries = {}
+        for vocab, norm in words:
+            if norm not in existing and norm not in new_entries:
+                new_entries[norm] = {
+                    "_id": ObjectId(),
+                    "vocab": vocab,
+                    "vocab_norm": norm,
+                    "collection_id": collection_oid,
+                    "usage_count": occurrences[norm],
+                    "created_at": current_time,
+                    "updated_at": current_time,
+                    "is_deleted": False,
+                    "deleted_at": None
+                }
+        
+        # Inserts first, so bulk write error indexes map back to new_entries order
+        operations = [InsertOne(entry) for entry in new_entries.values()]
+        operations += [
+            UpdateOne(
+                {"_id": entry["_id"]},
+                {"$inc": {"usage_count": occurrences[norm]}, "$set": {"updated_at": current_time}}
+            )
+            for norm, entry in existing.items()
+        ]
+        
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in write_errors):
+                raise
+            
+            # A concurrent request inserted some of these words first: increment them instead.
+            # Upserts, so a word whose racing entry is gone again (soft-deleted meanwhile)
+            # is still inserted rather than lost
+            inserted_norms = list(new_entries)
+            raced_norms = [inserted_norms[error["index"]] for error in write_errors]
+            result = await self.collection.bulk_write([
+                UpdateOne(
+                    {"collection_id": collection_oid, "vocab_norm": norm, "is_deleted": False},
+                    {
+                        "$inc": {"usage_count": occurrences[norm]},
+                        "$set": {"updated_at": current_time},
+                        "$setOnInsert": {
+                            field: value for field, value in new_entries[norm].items()
+                            if field not in ("collection_id", "vocab_norm", "is_deleted", "usage_count", "updated_at")
+                        }
+                    },
+                    upsert=True
+                )
+                for norm in raced_norms
+            ], ordered=False)
+            reinserted = {raced_norms[index] for index in result.upserted_ids}
+            
+            cursor = self.collection.find({
+                "collection_id": collection_oid,
+                "vocab_norm": {"$in": [norm for norm in raced_norms if norm not in reinserted]},
+                "is_deleted": False
+            })
+            async for vocabs_entry in cursor:
+                # Rewind to the count before this batch so per-occurrence counts line up
+                vocabs_entry["usage_count"] -= occurrences[vocabs_entry["vocab_norm"]]
+                existing[vocabs_entry["vocab_norm"]] = vocabs_entry
+                new_entries.pop(vocabs_entry["vocab_norm"], None)
+            
+            missing = [norm for norm in raced_norms if norm not in reinserted and norm not in existing]
+            if missing:
+                # Only if the entry was deleted between the upsert and the re-read
+                raise RuntimeError(f"Vocabularies changed during the batch: {', '.join(missing)}")
+        
+        results = []
+        applied = Counter()
+        for vocab, norm in words:
+            applied[norm] += 1
+            if norm in existing:
+                entry = existing[norm]
+                results.append((LearnedVocabsInDB(**{
+                    **entry,
+                    "usage_count": (entry.get("usage_count") or 1) + applied[norm],
+                    "updated_at": current_time
+                }), False))
+            else:
+                entry = new_entries[norm]
+                results.append((LearnedVocabsInDB(**{**entry, "usage_count": applied[norm]}), applied[norm] == 1))
+        
+        return results
     
     async def get_learned_vocabs_by_id(self, vocabs_id: str) -> Optional[LearnedVocabsInDB]:
         """Get learned vocabs by ID"""
@@ -383,29 +704,57 @@ class LearnedVocabsCRUD:
     async def find_by_exact_vocab(self, collection_id: str, vocab: str) -> Optional[LearnedVocabsInDB]:
         """Find learned vocab by exact vocab match within a collection"""
         # Normalize the vocab for comparison
-        normalized_vocab = vocab.strip().lower()
-        
-        print(f"🔍 DEBUG: Looking for normalized vocab: '{normalized_vocab}' in collection {collection_id}")
+        normalized_vocab = normalize_vocab(vocab)
         
         # Don't search if no valid vocab provided
         if not normalized_vocab:
-            print("⚠️ DEBUG: No valid vocab provided, returning None")
             return None
         
-        # Find the vocab in the collection (case-insensitive)
+        # Case-insensitive match through the (collection_id, vocab_norm) index
         vocabs_entry = await self.collection.find_one({
             "collection_id": ObjectId(collection_id),
-            "vocab": {"$regex": f"^{normalized_vocab}$", "$options": "i"},
+            "vocab_norm": normalized_vocab,
             "is_deleted": False
         })
         
         if vocabs_entry:
-            print(f"✅ DEBUG: Match found!")
             return LearnedVocabsInDB(**vocabs_entry)
         
-        print(f"❌ DEBUG: No match found")
         return None
     
+    async def count_vocabs_by_collection(self, collection_id: str) -> int:
+        """Count all learned vocabs entries (active and soft-deleted) of a collection"""
+        return await self.collection.count_documents({"collection_id": ObjectId(collection_id)})
+    
+    async def delete_vocabs_chunk(self, collection_id: str, chunk_size: int) -> int:
+        """Delete up to chunk_size learned vocabs entries of a collection; returns how many were deleted"""
+        cursor = self.collection.find({"collection_id": ObjectId(collection_id)}, {"_id": 1}).limit(chunk_size)
+        vocab_ids = [vocabs_entry["_id"] async for vocabs_entry in cursor]
+        if not vocab_ids:
+            return 0
+        result = await self.collection.delete_many({"_id": {"$in": vocab_ids}})
+        return result.deleted_count
+    
+    async def filter_user_vocab_ids(self, user_id: str, vocab_ids: List[str]) -> set:
+        """Return the vocab_ids that are active entries in the user's collections"""
+        vocab_oids = [ObjectId(vocab_id) for vocab_id in set(vocab_ids)]
+        if not vocab_oids:
+            return set()
+        
+        vocab_collections = get_collection("vocab_collections")
+        user_collection_ids = [
+            collection["_id"]
+            async for collection in vocab_collections.find({"user_id": ObjectId(user_id)}, {"_id": 1})
+        ]
+        if not user_collection_ids:
+            return set()
+        
+        cursor = self.collection.find(
+            {"_id": {"$in": vocab_oids}, "collection_id": {"$in": user_collection_ids}, "is_deleted": False},
+            {"_id": 1}
+        )
+        return {str(vocabs_entry["_id"]) async for vocabs_entry in cursor}
+    
     async def get_all_user_vocabs(self, user_id: str) -> List[str]:
         """Get all unique vocabs learned by a user"""
         cursor = self.collection.find({"user_id": ObjectId(user_id), "is_deleted": False})
@@ -419,27 +768,35 @@ class LearnedVocabsCRUD:
         
         return sorted(list(all_vocabs))
     
-    async def get_vocabs_by_collection(self, collection_id: str, limit: int = 1000) -> List[LearnedVocabsInDB]:
-        """Get all learned vocabs entries for a specific collection"""
-        cursor = self.collection.find({"collection_id": ObjectId(collection_id), "is_deleted": False}).sort("created_at", -1).limit(limit)
+    async def get_vocabs_by_collection(self, collection_id: str, limit: int = 1000, sort: str = "newest",
+                                       after: Optional[str] = None, before: Optional[str] = None) -> List[LearnedVocabsInDB]:
+        """Get learned vocabs entries for a specific collection in a VOCAB_SORT_ORDERS order (keyset paged)"""
+        fields, direction, collation = VOCAB_SORT_ORDERS[sort]
+        range_filter, sort_spec = keyset_query(fields if len(fields) > 1 else fields[0], direction, after, before)
+        cursor = self.collection.find({
+            "collection_id": ObjectId(collection_id),
+            "is_deleted": False,
+            **range_filter
+        }, collation=collation).sort(sort_spec).limit(limit)
         vocabs_list = []
         async for vocabs in cursor:
             vocabs_list.append(LearnedVocabsInDB(**vocabs))
-        return vocabs_list
+        return keyset_order(vocabs_list, before)
     
     async def update_learned_vocabs(self, vocabs_id: str, new_vocab: str) -> Optional[LearnedVocabsInDB]:
         """Update learned vocab entry (single word)"""
         update_dict = {
             "vocab": new_vocab,
+            "vocab_norm": normalize_vocab(new_vocab),
             "updated_at": datetime.utcnow()
         }
         
-        await self.collection.update_one(
+        vocabs = await self.collection.find_one_and_update(
             {"_id": ObjectId(vocabs_id), "is_deleted": False}, 
-            {"$set": update_dict}
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
         )
-        
-        return await self.get_learned_vocabs_by_id(vocabs_id)
+        return LearnedVocabsInDB(**vocabs) if vocabs else None
     
     async def increment_usage_count(self, vocabs_id: str) -> Optional[LearnedVocabsInDB]:
         """Increment usage count for learned vocabs entry"""
@@ -448,12 +805,12 @@ class LearnedVocabsCRUD:
             "$set": {"updated_at": datetime.utcnow()}
         }
         
-        await self.collection.update_one(
+        vocabs = await self.collection.find_one_and_update(
             {"_id": ObjectId(vocabs_id), "is_deleted": False}, 
-            update_dict
+            update_dict,
+            return_document=ReturnDocument.AFTER
         )
-        
-        return await self.get_learned_vocabs_by_id(vocabs_id)
+        return LearnedVocabsInDB(**vocabs) if vocabs else None
     
     async def soft_delete_learned_vocabs(self, vocabs_id: str) -> bool:
         """Soft delete learned vocabs entry"""
@@ -477,7 +834,7 @@ class LearnedVocabsCRUD:
     async def delete_vocabs_containing_word(self, user_id: str, word: str) -> int:
         """Delete all learned vocab entries matching the specified word for a user (through their collections)"""
         # Normalize the word for comparison
-        normalized_word = word.strip().lower()
+        normalized_word = normalize_vocab(word)
         
         if not normalized_word:
             return 0
@@ -498,7 +855,7 @@ class LearnedVocabsCRUD:
         # Delete all learned vocab entries in user's collections that match the word (case-insensitive)
         result = await self.collection.delete_many({
             "collection_id": {"$in": user_collection_ids},
-            "vocab": {"$regex": f"^{normalized_word}$", "$options": "i"},
+            "vocab_norm": normalized_word,
             "is_deleted": False
         })
         
@@ -519,9 +876,8 @@ class VocabCollectionCRUD:
         collection_dict['created_at'] = datetime.utcnow()
         collection_dict['updated_at'] = datetime.utcnow()
         
-        result = await self.collection.insert_one(collection_dict)
-        created_collection = await self.collection.find_one({"_id": result.inserted_id})
-        return VocabCollectionInDB(**created_collection)
+        await self.collection.insert_one(collection_dict)  # sets collection_dict["_id"]
+        return VocabCollectionInDB(**collection_dict)
     
     async def get_vocab_collection_by_id(self, collection_id: str) -> Optional[VocabCollectionInDB]:
         """Get vocab collection by ID"""
@@ -536,13 +892,15 @@ class VocabCollectionCRUD:
             collections.append(VocabCollectionInDB(**collection))
         return collections
     
-    async def get_user_vocab_collections(self, user_id: str, limit: int = 100) -> List[VocabCollectionInDB]:
-        """Get all vocab collections for a specific user"""
-        cursor = self.collection.find({"user_id": ObjectId(user_id)}).sort("created_at", -1).limit(limit)
+    async def get_user_vocab_collections(self, user_id: str, limit: int = 100,
+                                         after: Optional[str] = None, before: Optional[str] = None) -> List[VocabCollectionInDB]:
+        """Get vocab collections for a specific user (newest first, keyset paged)"""
+        range_filter, sort = keyset_query("created_at", DESCENDING, after, before)
+        cursor = self.collection.find({"user_id": ObjectId(user_id), **range_filter}).sort(sort).limit(limit)
         collections = []
         async for collection in cursor:
             collections.append(VocabCollectionInDB(**collection))
-        return collections
+        return keyset_order(collections, before)
     
     async def update_vocab_collection(self, collection_id: str, name: str) -> Optional[VocabCollectionInDB]:
         """Update vocab collection name"""
@@ -551,33 +909,160 @@ class VocabCollectionCRUD:
             "updated_at": datetime.utcnow()
         }
         
-        await self.collection.update_one(
+        collection = await self.collection.find_one_and_update(
             {"_id": ObjectId(collection_id)}, 
-            {"$set": update_dict}
+            {"$set": update_dict},
+            return_document=ReturnDocument.AFTER
         )
-        
-        return await self.get_vocab_collection_by_id(collection_id)
+        return VocabCollectionInDB(**collection) if collection else None
     
     async def delete_vocab_collection(self, collection_id: str) -> bool:
         """
         Delete vocab collection and cascade delete all associated learned vocabularies
         
+        Runs the whole cascade in the caller; DELETE /vocab-collections/{id} hands
+        large collections to app.services.collection_cascade instead.
+        
         Returns:
             bool: True if collection was deleted, False otherwise
         """
-        # First, delete all learned_vocabs associated with this collection
-        learned_vocabs_collection = get_collection("learned_vocabs")
-        vocabs_delete_result = await learned_vocabs_collection.delete_many({
-            "collection_id": ObjectId(collection_id)
-        })
+        # First, delete all learned_vocabs associated with this collection, one chunk at a time
+        learned_vocabs_crud = LearnedVocabsCRUD()
+        deleted_vocabs = 0
+        while True:
+            deleted = await learned_vocabs_crud.delete_vocabs_chunk(collection_id, CASCADE_CHUNK_SIZE)
+            if not deleted:
+                break
+            deleted_vocabs += deleted
         
-        # Log how many vocabularies were deleted
-        print(f"🗑️ Cascade deleted {vocabs_delete_result.deleted_count} learned vocabularies from collection {collection_id}")
+        logger.info("Cascade deleted %d learned vocabularies from collection %s", deleted_vocabs, collection_id)
         
         # Then delete the collection itself
+        return await self.delete_collection_document(collection_id)
+    
+    async def delete_collection_document(self, collection_id: str) -> bool:
+        """Delete only the vocab collection document (its learned vocabs are left to a cascade)"""
         result = await self.collection.delete_one({"_id": ObjectId(collection_id)})
         return result.deleted_count > 0
 
+class CollectionDeletionJobCRUD:
+    """CRUD operations for the collection deletion (cascade) jobs"""
+    
+    @property
+    def collection(self) -> AsyncIOMotorCollection:
+        return get_collection("collection_deletion_jobs")
+    
+    async def create_job(self, collection_id: str, user_id: str, collection_name: str,
+                         total_vocabs: int) -> CollectionDeletionJobInDB:
+        """Create a pending cascade job"""
+        current_time = datetime.utcnow()
+        job_dict = {
+            "collection_id": ObjectId(collection_id),
+            "user_id": ObjectId(user_id),
+            "collection_name": collection_name,
+            "status": "pending",
+            "total_vocabs": total_vocabs,
+            "deleted_vocabs": 0,
+            "lease_expires_at": None,
+            "error": None,
+            "failed_attempts": 0,
+            "created_at": current_time,
+            "updated_at": current_time,
+            "completed_at": None
+        }
+        await self.collection.insert_one(job_dict)  # sets job_dict["_id"]
+        return CollectionDeletionJobInDB(**job_dict)
+    
+    async def delete_job(self, job_id: str):
+        """Remove a job that never started (its collection was not deleted)"""
+        await self.collection.delete_one({"_id": ObjectId(job_id), "status": "pending"})
+    
+    async def get_job(self, job_id: str) -> Optional[CollectionDeletionJobInDB]:
+        """Get cascade job by ID"""
+        job = await self.collection.find_one({"_id": ObjectId(job_id)})
+        return CollectionDeletionJobInDB(**job) if job else None
+    
+    async def claim_job(self, job_id: str, lease: timedelta) -> Optional[CollectionDeletionJobInDB]:
+        """
+        Take (or renew) the lease on an unfinished job
+        
+        Returns None when the job is finished or another worker holds a live lease.
+        """
+        current_time = datetime.utcnow()
+        job = await self.collection.find_one_and_update(
+            {
+                "_id": ObjectId(job_id),
+                "status": {"$in": ["pending", "running"]},
+                "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": current_time}}]
+            },
+            {"$set": {"status": "running", "lease_expires_at": current_time + lease, "updated_at": current_time}},
+            return_document=ReturnDocument.AFTER
+        )
+        return CollectionDeletionJobInDB(**job) if job else None
+    
+    async def record_progress(self, job_id: str, deleted: int, lease: timedelta):
+        """Add a deleted chunk to the job's progress and extend its lease"""
+        current_time = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$inc": {"deleted_vocabs": deleted},
+                "$set": {"lease_expires_at": current_time + lease, "updated_at": current_time}
+            }
+        )
+    
+    async def finish_job(self, job_id: str, error: Optional[str] = None):
+        """Mark a job completed (or failed with error) and release its lease"""
+        current_time = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {"$set": {
+                "status": "failed" if error else "completed",
+                "error": error,
+                "lease_expires_at": None,
+                "updated_at": current_time,
+                "completed_at": current_time
+            }}
+        )
+    
+    async def retry_job_later(self, job_id: str, error: str, delay: timedelta):
+        """
+        Record a failed run and put the job back to pending
+        
+        The lease is left to expire after `delay`, so no worker claims the job before then.
+        """
+        current_time = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id)},
+            {
+                "$inc": {"failed_attempts": 1},
+                "$set": {
+                    "status": "pending",
+                    "error": error,
+                    "lease_expires_at": current_time + delay,
+                    "updated_at": current_time
+                }
+            }
+        )
+    
+    async def release_job(self, job_id: str):
+        """Give up the lease on a running job so another worker can resume it"""
+        await self.collection.update_one(
+            {"_id": ObjectId(job_id), "status": "running"},
+            {"$set": {"lease_expires_at": None, "updated_at": datetime.utcnow()}}
+        )
+    
+    async def get_resumable_job_ids(self) -> List[str]:
+        """IDs of unfinished jobs whose lease is free or expired"""
+        cursor = self.collection.find(
+            {
+                "status": {"$in": ["pending", "running"]},
+                "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": datetime.utcnow()}}]
+            },
+            {"_id": 1}
+        )
+        return [str(job["_id"]) async for job in cursor]
+
 class HistoryByDateCRUD:
     """CRUD operations for History by Date"""
     
@@ -595,11 +1080,15 @@ class HistoryByDateCRUD:
             # Store as datetime with time set to 00:00:00 for consistency
             history_dict['study_date'] = study_datetime.replace(hour=0, minute=0, second=0, microsecond=0)
         
+        history_dict['vocab_id'] = ObjectId(history_dict['vocab_id'])
+        if history_dict.get('user_id'):
+            history_dict['user_id'] = ObjectId(history_dict['user_id'])
+        else:
+            history_dict.pop('user_id', None)
         history_dict['created_at'] = datetime.utcnow()
         
-        result = await self.collection.insert_one(history_dict)
-        created_history = await self.collection.find_one({"_id": result.inserted_id})
-        return HistoryByDateInDB(**created_history)
+        await self.collection.insert_one(history_dict)  # sets history_dict["_id"]
+        return HistoryByDateInDB(**history_dict)
     
     async def get_history_by_vocab_id(self, vocab_id: str) -> List[HistoryByDateInDB]:
         """Get all history entries for a specific vocab"""
@@ -624,68 +1113,101 @@ class HistoryByDateCRUD:
             histories.append(HistoryByDateInDB(**history))
         return histories
     
-    async def increment_study_count(self, vocab_id: str, study_date: datetime) -> HistoryByDateInDB:
-        """Increment or create study count for a specific date"""
+    async def increment_study_count(self, vocab_id: str, study_date: datetime,
+                                    user_id: Optional[str] = None) -> HistoryByDateInDB:
+        """Increment or create study count for a specific date (user_id: owner of the vocab)"""
         # Convert to date-only (remove time component)
         date_only = study_date.replace(hour=0, minute=0, second=0, microsecond=0)
         
-        # Try to find existing entry for this vocab and exact date
-        existing_entry = await self.collection.find_one({
-            "vocab_id": ObjectId(vocab_id),
-            "study_date": date_only
-        })
-        
-        if existing_entry:
-            # Increment existing count
-            await self.collection.update_one(
-                {"_id": existing_entry["_id"]},
-                {"$inc": {"count": 1}}
+        # One atomic upsert on the unique (vocab_id, study_date) index
+        history_filter = {"vocab_id": ObjectId(vocab_id), "study_date": date_only}
+        history_update = {"$inc": {"count": 1}, "$setOnInsert": {"created_at": datetime.utcnow()}}
+        if user_id:
+            history_update["$set"] = {"user_id": ObjectId(user_id)}
+        try:
+            history = await self.collection.find_one_and_update(
+                history_filter, history_update, upsert=True, return_document=ReturnDocument.AFTER
             )
-            updated_entry = await self.collection.find_one({"_id": existing_entry["_id"]})
-            return HistoryByDateInDB(**updated_entry)
-        else:
-            # Create new entry with date-only
-            history_data = HistoryByDateCreate(
-                vocab_id=vocab_id,
-                study_date=date_only,  # Use date-only
-                count=1
+        except DuplicateKeyError:
+            # A concurrent request inserted the day first; the retry updates it
+            history = await self.collection.find_one_and_update(
+                history_filter, history_update, upsert=True, return_document=ReturnDocument.AFTER
             )
-            return await self.create_history_by_date(history_data)
+        return HistoryByDateInDB(**history)
     
-    async def get_user_study_history(self, user_id: str, limit: int = 100) -> List[dict]:
-        """Get user's study history with vocab info"""
-        # Aggregation pipeline to join with learned_vocabs collection
-        pipeline = [
-            {
-                "$lookup": {
-                    "from": "learned_vocabs",
-                    "localField": "vocab_id",
-                    "foreignField": "_id",
-                    "as": "vocab_info"
-                }
-            },
-            {
-                "$unwind": "$vocab_info"
-            },
-            {
-                "$match": {
-                    "vocab_info.user_id": ObjectId(user_id),
-                    "vocab_info.is_deleted": False
-                }
-            },
-            {
-                "$sort": {"study_date": -1}
-            },
-            {
-                "$limit": limit
-            }
+    async def record_study_events(self, events: List[Tuple[str, datetime]],
+                                  user_id: Optional[str] = None) -> List[HistoryByDateInDB]:
+        """
+        Record many (vocab_id, study_date) study events with one bulk write
+        
+        Events for the same vocab and day are added up into one upsert. Returns the
+        resulting history entry of every (vocab, day) touched. user_id is the owner
+        of the vocabs.
+        """
+        counts = Counter(
+            (ObjectId(vocab_id), study_date.replace(hour=0, minute=0, second=0, microsecond=0))
+            for vocab_id, study_date in events
+        )
+        if not counts:
+            return []
+        
+        current_time = datetime.utcnow()
+        owner = {"$set": {"user_id": ObjectId(user_id)}} if user_id else {}
+        operations = [
+            UpdateOne(
+                {"vocab_id": vocab_oid, "study_date": date_only},
+                {"$inc": {"count": count}, "$setOnInsert": {"created_at": current_time}, **owner},
+                upsert=True
+            )
+            for (vocab_oid, date_only), count in counts.items()
         ]
         
-        cursor = self.collection.aggregate(pipeline)
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except BulkWriteError as e:
+            write_errors = e.details.get("writeErrors", [])
+            if any(error.get("code") != 11000 for error in write_errors):
+                raise
+            # Upserts that lost an insert race against a concurrent request now update
+            await self.collection.bulk_write([operations[error["index"]] for error in write_errors], ordered=False)
+        
+        keys = set(counts)
+        cursor = self.collection.find({
+            "vocab_id": {"$in": list({vocab_oid for vocab_oid, _ in keys})},
+            "study_date": {"$in": list({date_only for _, date_only in keys})}
+        })
         histories = []
         async for history in cursor:
-            histories.append(history)
+            if (history["vocab_id"], history["study_date"]) in keys:
+                histories.append(HistoryByDateInDB(**history))
         return histories
+    
+    async def get_user_study_history(self, user_id: str, limit: int = 100,
+                                     after: Optional[str] = None, before: Optional[str] = None) -> List[dict]:
+        """
+        Get user's study history with vocab info (latest study_date first, keyset paged)
+        
+        The page is read on the (user_id, study_date, _id) index; learned_vocabs are
+        fetched only for the returned rows. vocab_info is None when the vocab has
+        been deleted.
+        """
+        range_filter, sort = keyset_query("study_date", DESCENDING, after, before)
+        cursor = self.collection.find({"user_id": ObjectId(user_id), **range_filter}).sort(sort).limit(limit)
+        histories = []
+        async for history in cursor:
+            histories.append(history)
+        
+        # Join the page's vocabs with one $in query
+        vocab_ids = list({history["vocab_id"] for history in histories})
+        vocabs = {}
+        if vocab_ids:
+            vocabs_cursor = get_collection("learned_vocabs").find({"_id": {"$in": vocab_ids}, "is_deleted": False})
+            async for vocab in vocabs_cursor:
+                vocabs[vocab["_id"]] = vocab
+        for history in histories:
+            history["vocab_info"] = vocabs.get(history["vocab_id"])
+        
+        return keyset_order(histories, before)
 
 class UserFeedbackCRUD:
     """CRUD operations for User Feedback"""
@@ -699,22 +1221,23 @@ class UserFeedbackCRUD:
         feedback_dict = feedback_data.dict()
         feedback_dict['created_at'] = datetime.utcnow()
         
-        result = await self.collection.insert_one(feedback_dict)
-        created_feedback = await self.collection.find_one({"_id": result.inserted_id})
-        return UserFeedbackInDB(**created_feedback)
+        await self.collection.insert_one(feedback_dict)  # sets feedback_dict["_id"]
+        return UserFeedbackInDB(**feedback_dict)
     
     async def get_feedback_by_id(self, feedback_id: str) -> Optional[UserFeedbackInDB]:
         """Get feedback by ID"""
         feedback = await self.collection.find_one({"_id": ObjectId(feedback_id)})
         return UserFeedbackInDB(**feedback) if feedback else None
     
-    async def get_all_feedback(self, limit: int = 100) -> List[UserFeedbackInDB]:
-        """Get all feedback entries"""
-        cursor = self.collection.find({}).sort("created_at", -1).limit(limit)
+    async def get_all_feedback(self, limit: int = 100,
+                               after: Optional[str] = None, before: Optional[str] = None) -> List[UserFeedbackInDB]:
+        """Get feedback entries (newest first, keyset paged)"""
+        range_filter, sort = keyset_query("created_at", DESCENDING, after, before)
+        cursor = self.collection.find(range_filter).sort(sort).limit(limit)
         feedbacks = []
         async for feedback in cursor:
             feedbacks.append(UserFeedbackInDB(**feedback))
-        return feedbacks
+        return keyset_order(feedbacks, before)
     
     async def get_feedback_by_email(self, email: str, limit: int = 50) -> List[UserFeedbackInDB]:
         """Get feedback by user email"""
@@ -748,55 +1271,33 @@ class StreakCRUD:
             date_only = learned_date.date()
             streak_dict['learned_date'] = datetime.combine(date_only, datetime.min.time())
         
-        # Check if streak already exists for this user and date
-        existing_streak = await self.collection.find_one({
+        # One atomic upsert (unique user_id + learned_date): count is incremented
+        # (a new day starts from the provided count, or 0) and is_qualify is set
+        # once the count reaches 5
+        streak_filter = {
             "user_id": streak_dict['user_id'],
             "learned_date": streak_dict['learned_date']
-        })
+        }
+        streak_update = [
+            {"$set": {
+                "count": {"$add": [{"$ifNull": ["$count", streak_dict.get('count') or 0]}, 1]},
+                "created_at": {"$ifNull": ["$created_at", datetime.utcnow()]}
+            }},
+            {"$set": {
+                "is_qualify": {"$or": [{"$gte": ["$count", 5]}, bool(streak_dict.get('is_qualify'))]}
+            }}
+        ]
         
-        if existing_streak:
-            # Update existing streak
-            update_fields = {}
-            
-            # Increment count if provided or if existing count exists
-            current_count = existing_streak.get('count', 0) or 0
-            if streak_dict.get('count') is not None:
-                # Use provided count
-                new_count = current_count + 1
-            else:
-                # Increment existing count
-                new_count = current_count + 1
-            
-            update_fields['count'] = new_count
-            
-            # Check if count reached 5, set is_qualify to true
-            if new_count >= 5:
-                update_fields['is_qualify'] = True
-            else:
-                update_fields['is_qualify'] = streak_dict.get('is_qualify', False)
-            
-            await self.collection.update_one(
-                {"_id": existing_streak["_id"]},
-                {"$set": update_fields}
+        try:
+            streak = await self.collection.find_one_and_update(
+                streak_filter, streak_update, upsert=True, return_document=ReturnDocument.AFTER
             )
-            updated_streak = await self.collection.find_one({"_id": existing_streak["_id"]})
-            return StreakInDB(**updated_streak)
-        else:
-            # Create new streak
-            streak_dict['created_at'] = datetime.utcnow()
-            # Initialize count to 1 if not provided
-            if streak_dict.get('count') is None:
-                streak_dict['count'] = 1
-            else:
-                streak_dict['count'] = (streak_dict.get('count') or 0) + 1
-            
-            # Check if count reached 5
-            if streak_dict['count'] >= 5:
-                streak_dict['is_qualify'] = True
-            
-            result = await self.collection.insert_one(streak_dict)
-            created_streak = await self.collection.find_one({"_id": result.inserted_id})
-            return StreakInDB(**created_streak)
+        except DuplicateKeyError:
+            # A concurrent request inserted the day first; the retry updates it
+            streak = await self.collection.find_one_and_update(
+                streak_filter, streak_update, upsert=True, return_document=ReturnDocument.AFTER
+            )
+        return StreakInDB(**streak)
     
     async def get_streak_by_id(self, streak_id: str) -> Optional[StreakInDB]:
         """Get streak by ID"""
@@ -868,6 +1369,9 @@ def get_vocab_collection_crud():
 def get_history_by_date_crud():
     return HistoryByDateCRUD()
 
+def get_collection_deletion_job_crud():
+    return CollectionDeletionJobCRUD()
+
 def get_user_feedback_crud():
     return UserFeedbackCRUD()
 
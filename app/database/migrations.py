@@ -3,21 +3,93 @@ MongoDB Schema Migration and Synchronization
 Automatically syncs Pydantic models with MongoDB collections
 """
 import asyncio
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Set
 from motor.motor_asyncio import AsyncIOMotorDatabase
-from pymongo import IndexModel, ASCENDING, DESCENDING
-from datetime import datetime
+from pymongo import IndexModel, ASCENDING, DESCENDING, ReturnDocument
+from pymongo.errors import DuplicateKeyError
+from datetime import datetime, timedelta
+import hashlib
+import json
 import logging
+import os
+import socket
+import uuid
 
 from app.database.models import (
     UserInDB,
     InputHistoryInDB, 
     SavedParagraphInDB,
-    RefreshTokenInDB
+    RefreshTokenInDB,
+    LearnedVocabsInDB,
+    VocabCollectionInDB,
+    HistoryByDateInDB,
+    UserFeedbackInDB,
+    StreakInDB,
+    CollectionDeletionJobInDB,
+    VOCAB_COLLATION
 )
 
 logger = logging.getLogger(__name__)
 
+# Where the fingerprint of the last completed sync and the migration lease live
+SCHEMA_METADATA_COLLECTION = "schema_metadata"
+SCHEMA_SYNC_DOCUMENT_ID = "schema_sync"
+
+# Query shapes the CRUD layer issues for API routes (lookups by _id are left out).
+# "equality" fields are matched exactly (or with $in), "range_or_sort" fields are
+# range-filtered or sorted on, in that order. A pattern with neither cannot use an
+# index at all (e.g. an aggregation that starts with $lookup).
+ROUTE_QUERY_PATTERNS = [
+    {"collection": "users", "equality": ["email"], "range_or_sort": [], "used_by": "UserCRUD.get_user_by_email"},
+    {"collection": "users", "equality": ["google_id", "auth_type"], "range_or_sort": [], "used_by": "UserCRUD.get_user_by_google_id / upsert_google_user"},
+    {"collection": "refresh_tokens", "equality": ["refresh_token"], "range_or_sort": [], "used_by": "RefreshTokenCRUD.get_refresh_token_by_token"},
+    {"collection": "refresh_tokens", "equality": ["user_id"], "range_or_sort": [], "used_by": "RefreshTokenCRUD.delete_user_refresh_tokens"},
+    {"collection": "input_history", "equality": ["user_id", "words_key"], "range_or_sort": [], "used_by": "InputHistoryCRUD.find_by_exact_words"},
+    {"collection": "input_history", "equality": ["user_id"], "range_or_sort": ["created_at"], "used_by": "InputHistoryCRUD.get_user_input_history"},
+    {"collection": "saved_paragraph", "equality": ["input_history_id"], "range_or_sort": ["created_at"], "used_by": "SavedParagraphCRUD.get_paragraphs_by_input_history"},
+    {"collection": "saved_paragraph", "equality": ["user_id"], "range_or_sort": ["created_at", "_id"], "used_by": "SavedParagraphCRUD.get_user_saved_paragraphs / get_user_paragraph_groups"},
+    {"collection": "learned_vocabs", "equality": ["collection_id", "vocab_norm", "is_deleted"], "range_or_sort": [], "used_by": "LearnedVocabsCRUD.find_by_exact_vocab / upsert_vocabs_batch"},
+    {"collection": "learned_vocabs", "equality": ["collection_id", "is_deleted"], "range_or_sort": ["created_at", "_id"], "used_by": "LearnedVocabsCRUD.get_vocabs_by_collection (newest/oldest)"},
+    {"collection": "learned_vocabs", "equality": ["collection_id", "is_deleted"], "range_or_sort": ["usage_count", "created_at", "_id"], "used_by": "LearnedVocabsCRUD.get_vocabs_by_collection (frequent)"},
+    {"collection": "learned_vocabs", "equality": ["collection_id", "is_deleted"], "range_or_sort": ["vocab", "_id"], "collation": VOCAB_COLLATION, "used_by": "LearnedVocabsCRUD.get_vocabs_by_collection (alphabetical)"},
+    {"collection": "learned_vocabs", "equality": ["collection_id"], "range_or_sort": [], "used_by": "LearnedVocabsCRUD.count_vocabs_by_collection / delete_vocabs_chunk"},
+    {"collection": "vocab_collections", "equality": ["user_id"], "range_or_sort": ["created_at", "_id"], "used_by": "VocabCollectionCRUD.get_user_vocab_collections / UserCRUD.ensure_selected_collection"},
+    {"collection": "history_by_date", "equality": ["vocab_id", "study_date"], "range_or_sort": [], "used_by": "HistoryByDateCRUD.increment_study_count"},
+    {"collection": "history_by_date", "equality": ["user_id"], "range_or_sort": ["study_date", "_id"], "used_by": "HistoryByDateCRUD.get_user_study_history"},
+    {"collection": "streak", "equality": ["user_id", "learned_date"], "range_or_sort": [], "used_by": "StreakCRUD.create_streak / get_streak_by_user_and_date"},
+    {"collection": "streak", "equality": ["user_id"], "range_or_sort": ["learned_date"], "used_by": "StreakCRUD.get_streak_by_date_range"},
+    {"collection": "user_feedback", "equality": [], "range_or_sort": ["created_at", "_id"], "used_by": "UserFeedbackCRUD.get_all_feedback"},
+    {"collection": "collection_deletion_jobs", "equality": ["status"], "range_or_sort": ["lease_expires_at"], "used_by": "CollectionDeletionJobCRUD.get_resumable_job_ids"},
+]
+
+def _index_supports_pattern(index: Dict[str, Any], pattern: Dict[str, Any]) -> bool:
+    """Whether an index (as returned by list_indexes) can serve a query pattern"""
+    keys = [field for field in index["key"].keys()]
+    equality = set(pattern["equality"])
+    range_or_sort = pattern["range_or_sort"]
+    
+    if not equality and not range_or_sort:
+        return False
+    
+    # String comparisons only use an index built with the query's collation
+    index_collation = index.get("collation") or {}
+    pattern_collation = pattern.get("collation") or {}
+    if (index_collation.get("locale"), index_collation.get("strength")) != (pattern_collation.get("locale"), pattern_collation.get("strength")):
+        return False
+    
+    # A partial index only applies when the query filters on every field of its filter
+    partial_fields = set(index.get("partialFilterExpression", {}).keys())
+    if not partial_fields <= equality:
+        return False
+    
+    # Leading keys matched by equality, followed by the range/sort fields in order
+    prefix_length = 0
+    while prefix_length < len(keys) and keys[prefix_length] in equality:
+        prefix_length += 1
+    if equality and prefix_length == 0:
+        return False
+    return keys[prefix_length:prefix_length + len(range_or_sort)] == range_or_sort
+
 class SchemaMigration:
     """Handles automatic schema synchronization with MongoDB"""
     
@@ -33,6 +105,13 @@ class SchemaMigration:
                 "indexes": [
                     IndexModel([("email", ASCENDING)], unique=True, name="email_unique"),
                     IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
+                    IndexModel([("tokens_revoked_before", DESCENDING)], sparse=True, name="tokens_revoked_before_desc"),
+                    IndexModel(
+                        [("google_id", ASCENDING), ("auth_type", ASCENDING)],
+                        unique=True,
+                        partialFilterExpression={"google_id": {"$type": "string"}},
+                        name="google_id_auth_type_unique"
+                    ),
                 ],
                 "validation": {
                     "$jsonSchema": {
@@ -73,6 +152,12 @@ class SchemaMigration:
                     IndexModel([("user_id", ASCENDING)], name="user_id_asc"),
                     IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
                     IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING)], name="user_created_compound"),
+                    IndexModel(
+                        [("user_id", ASCENDING), ("words_key", ASCENDING)],
+                        unique=True,
+                        partialFilterExpression={"words_key": {"$exists": True}},
+                        name="user_words_key_unique"
+                    ),
                 ],
                 "validation": {
                     "$jsonSchema": {
@@ -91,6 +176,10 @@ class SchemaMigration:
                                 },
                                 "description": "List of input words"
                             },
+                            "words_key": {
+                                "bsonType": ["string", "null"],
+                                "description": "SHA-256 of the normalized, sorted words"
+                            },
                             "created_at": {
                                 "bsonType": "date",
                                 "description": "Input timestamp"
@@ -105,6 +194,7 @@ class SchemaMigration:
                     IndexModel([("input_history_id", ASCENDING)], name="input_history_id_asc"),
                     IndexModel([("created_at", DESCENDING)], name="created_at_desc"),
                     IndexModel([("input_history_id", ASCENDING), ("created_at", DESCENDING)], name="input_history_created_compound"),
+                    IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_created_id_compound"),
                 ],
                 "validation": {
                     "$jsonSchema": {
@@ -115,6 +205,10 @@ class SchemaMigration:
                                 "bsonType": "objectId",
                                 "description": "Reference to input history document"
                             },
+                            "user_id": {
+                                "bsonType": "objectId",
+                                "description": "Owner (copied from the input history)"
+                            },
                             "paragraph": {
                                 "bsonType": "string",
                                 "minLength": 1,
@@ -157,12 +251,87 @@ class SchemaMigration:
                         }
                     }
                 }
+            },
+            "learned_vocabs": {
+                "model": LearnedVocabsInDB,
+                "indexes": [
+                    IndexModel([("collection_id", ASCENDING), ("is_deleted", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="collection_active_created_id_compound"),
+                    IndexModel(
+                        [("collection_id", ASCENDING), ("is_deleted", ASCENDING), ("usage_count", DESCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                        name="collection_active_frequent_compound"
+                    ),
+                    IndexModel(
+                        [("collection_id", ASCENDING), ("is_deleted", ASCENDING), ("vocab", ASCENDING), ("_id", ASCENDING)],
+                        collation=VOCAB_COLLATION,
+                        name="collection_active_vocab_ci_compound"
+                    ),
+                    IndexModel(
+                        [("collection_id", ASCENDING), ("vocab_norm", ASCENDING)],
+                        unique=True,
+                        partialFilterExpression={"is_deleted": False, "vocab_norm": {"$exists": True}},
+                        name="collection_vocab_norm_unique"
+                    ),
+                ],
+            },
+            "vocab_collections": {
+                "model": VocabCollectionInDB,
+                "indexes": [
+                    IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_created_id_compound"),
+                ],
+            },
+            "history_by_date": {
+                "model": HistoryByDateInDB,
+                "indexes": [
+                    IndexModel([("vocab_id", ASCENDING), ("study_date", DESCENDING)], unique=True, name="vocab_study_date_unique"),
+                    IndexModel([("user_id", ASCENDING), ("study_date", DESCENDING), ("_id", DESCENDING)], name="user_study_date_id_compound"),
+                ],
+            },
+            "streak": {
+                "model": StreakInDB,
+                "indexes": [
+                    IndexModel([("user_id", ASCENDING), ("learned_date", DESCENDING)], unique=True, name="user_learned_date_unique"),
+                ],
+            },
+            "user_feedback": {
+                "model": UserFeedbackInDB,
+                "indexes": [
+                    IndexModel([("created_at", DESCENDING), ("_id", DESCENDING)], name="created_id_desc"),
+                    IndexModel([("email", ASCENDING), ("created_at", DESCENDING)], name="email_created_compound"),
+                ],
+            },
+            "collection_deletion_jobs": {
+                "model": CollectionDeletionJobInDB,
+                "indexes": [
+                    IndexModel([("status", ASCENDING), ("lease_expires_at", ASCENDING)], name="status_lease_compound"),
+                ],
+            },
+            "generation_cache": {
+                # Shared backend of the paragraph generation cache (_id is the request hash)
+                "indexes": [
+                    IndexModel([("expires_at", ASCENDING)], expireAfterSeconds=0, name="expires_at_ttl"),
+                ],
             }
         }
     
+    def schema_fingerprint(self, auto_create: bool = True, update_indexes: bool = True, update_validation: bool = True) -> str:
+        """Digest of the desired indexes and validation rules (and the sync options)"""
+        desired = {
+            "options": [auto_create, update_indexes, update_validation],
+            "collections": {
+                collection_name: {
+                    "indexes": [index.document for index in config.get("indexes", [])],
+                    "validation": config.get("validation"),
+                }
+                for collection_name, config in sorted(self.collections_config.items())
+            },
+        }
+        # Index keys are order-sensitive, so dict order is kept (it is fixed by the config above)
+        canonical = json.dumps(desired, default=str, separators=(",", ":"))
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+    
     async def sync_all_collections(self, auto_create: bool = True, update_indexes: bool = True, update_validation: bool = True) -> Dict[str, bool]:
         """
-        Synchronize all collections with their schemas
+        Synchronize all collections with their schemas, all collections concurrently
         
         Args:
             auto_create: Create collections if they don't exist
@@ -172,36 +341,43 @@ class SchemaMigration:
         Returns:
             Dict with sync status for each collection
         """
-        results = {}
-        
         logger.info("Starting schema synchronization...")
         
-        for collection_name, config in self.collections_config.items():
+        existing_collections = set(await self.db.list_collection_names())
+        
+        async def sync_one(collection_name: str, config: Dict[str, Any]) -> bool:
             try:
                 result = await self._sync_collection(
                     collection_name, 
                     config, 
                     auto_create, 
                     update_indexes, 
-                    update_validation
+                    update_validation,
+                    existing_collections
                 )
-                results[collection_name] = result
                 logger.info(f"✓ {collection_name}: {'Synced' if result else 'Skipped'}")
+                return result
             except Exception as e:
                 logger.error(f"✗ {collection_name}: Failed to sync - {e}")
-                results[collection_name] = False
+                return False
+        
+        names = list(self.collections_config.keys())
+        outcomes = await asyncio.gather(*(sync_one(name, self.collections_config[name]) for name in names))
+        results = dict(zip(names, outcomes))
         
         logger.info(f"Schema synchronization completed. Results: {results}")
         return results
     
     async def _sync_collection(self, collection_name: str, config: Dict[str, Any], 
-                              auto_create: bool, update_indexes: bool, update_validation: bool) -> bool:
+                              auto_create: bool, update_indexes: bool, update_validation: bool,
+                              existing_collections: Optional[Set[str]] = None) -> bool:
         """Sync a single collection"""
         collection = self.db[collection_name]
         
         # Check if collection exists
-        collections = await self.db.list_collection_names()
-        collection_exists = collection_name in collections
+        if existing_collections is None:
+            existing_collections = set(await self.db.list_collection_names())
+        collection_exists = collection_name in existing_collections
         
         if not collection_exists and auto_create:
             await self._create_collection_with_validation(collection_name, config.get("validation"))
@@ -251,10 +427,18 @@ class SchemaMigration:
                 except Exception as e:
                     logger.warning(f"Failed to drop index {index_name}: {e}")
             
-            # Create new indexes
-            if indexes:
-                await collection.create_indexes(indexes)
-                logger.debug(f"Created/updated {len(indexes)} indexes")
+            # Create new indexes one at a time, so a unique index blocked by
+            # duplicate data does not keep the others from being built
+            failed = []
+            for index in indexes:
+                try:
+                    await collection.create_indexes([index])
+                except Exception as e:
+                    logger.error("Failed to create index %s on %s: %s", index.document["name"], collection.name, e)
+                    failed.append(index.document["name"])
+            if failed:
+                raise RuntimeError(f"Failed to create indexes: {', '.join(failed)}")
+            logger.debug("Created/updated %d indexes", len(indexes))
         
         except Exception as e:
             logger.error(f"Failed to update indexes: {e}")
@@ -314,6 +498,22 @@ class SchemaMigration:
             logger.error(f"Failed to get collection info for {collection_name}: {e}")
             return {"exists": False, "error": str(e)}
     
+    async def find_unsupported_query_patterns(self) -> List[Dict[str, Any]]:
+        """Return the route query patterns that no existing index supports"""
+        indexes_by_collection = {}
+        unsupported = []
+        
+        for pattern in ROUTE_QUERY_PATTERNS:
+            collection_name = pattern["collection"]
+            if collection_name not in indexes_by_collection:
+                indexes_by_collection[collection_name] = await self.db[collection_name].list_indexes().to_list(length=None)
+            
+            indexes = indexes_by_collection[collection_name]
+            if not any(_index_supports_pattern(index, pattern) for index in indexes):
+                unsupported.append(pattern)
+        
+        return unsupported
+    
     async def validate_all_collections(self) -> Dict[str, Dict[str, Any]]:
         """Validate all collections and return their status"""
         results = {}
@@ -341,3 +541,112 @@ async def auto_sync_schema(database: AsyncIOMotorDatabase,
     """
     migration = SchemaMigration(database)
     return await migration.sync_all_collections(auto_create, update_indexes, update_validation)
+
+async def schema_is_current(database: AsyncIOMotorDatabase, fingerprint: str) -> bool:
+    """Whether the last completed sync was for this fingerprint (one read)"""
+    state = await database[SCHEMA_METADATA_COLLECTION].find_one(
+        {"_id": SCHEMA_SYNC_DOCUMENT_ID}, {"fingerprint": 1}
+    )
+    return bool(state) and state.get("fingerprint") == fingerprint
+
+async def _acquire_schema_lease(metadata, owner: str, lease: timedelta) -> bool:
+    now = datetime.utcnow()
+    try:
+        # Matches a free or expired lease; if another worker holds it the upsert
+        # collides with the existing _id and we lose
+        await metadata.find_one_and_update(
+            {
+                "_id": SCHEMA_SYNC_DOCUMENT_ID,
+                "$or": [{"lease_expires_at": None}, {"lease_expires_at": {"$lt": now}}]
+            },
+            {"$set": {"lease_owner": owner, "lease_expires_at": now + lease}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+async def _renew_schema_lease(metadata, owner: str, lease: timedelta):
+    """Keep the lease while long index builds run"""
+    while True:
+        await asyncio.sleep(lease.total_seconds() / 3)
+        await metadata.update_one(
+            {"_id": SCHEMA_SYNC_DOCUMENT_ID, "lease_owner": owner},
+            {"$set": {"lease_expires_at": datetime.utcnow() + lease}}
+        )
+
+async def sync_schema_under_lease(database: AsyncIOMotorDatabase,
+                                  auto_create: bool = True,
+                                  update_indexes: bool = True,
+                                  update_validation: bool = True,
+                                  lease_seconds: int = 300) -> Optional[Dict[str, bool]]:
+    """
+    Sync all schemas unless they are already at the current fingerprint, with a lease
+    in the metadata collection so that only one worker migrates at a time.
+    
+    The fingerprint is recorded only when every collection synced, so a failed sync is
+    retried on the next start.
+    
+    Returns:
+        Dict with sync status for each collection; {} when the schema was already
+        current; None when another worker holds the lease
+    """
+    migration = SchemaMigration(database)
+    fingerprint = migration.schema_fingerprint(auto_create, update_indexes, update_validation)
+    if await schema_is_current(database, fingerprint):
+        return {}
+    
+    metadata = database[SCHEMA_METADATA_COLLECTION]
+    owner = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+    lease = timedelta(seconds=lease_seconds)
+    if not await _acquire_schema_lease(metadata, owner, lease):
+        logger.info("Schema synchronization is running in another worker, skipping")
+        return None
+    
+    renew_task = asyncio.create_task(_renew_schema_lease(metadata, owner, lease))
+    try:
+        # The holder of the previous lease may have finished meanwhile
+        if await schema_is_current(database, fingerprint):
+            return {}
+        
+        results = await migration.sync_all_collections(auto_create, update_indexes, update_validation)
+        
+        state = {"synced_at": datetime.utcnow(), "results": results}
+        if all(results.values()):
+            state["fingerprint"] = fingerprint
+        await metadata.update_one(
+            {"_id": SCHEMA_SYNC_DOCUMENT_ID, "lease_owner": owner},
+            {"$set": state}
+        )
+        return results
+    finally:
+        renew_task.cancel()
+        # Release the lease; shielded so a cancelled sync still frees it
+        await asyncio.shield(metadata.update_one(
+            {"_id": SCHEMA_SYNC_DOCUMENT_ID, "lease_owner": owner},
+            {"$set": {"lease_owner": None, "lease_expires_at": None}}
+        ))
+
+async def report_unsupported_query_patterns(database: AsyncIOMotorDatabase) -> List[Dict[str, Any]]:
+    """
+    Log every route query pattern that has no supporting index
+    
+    Args:
+        database: MongoDB database instance
+        
+    Returns:
+        List of unsupported query patterns
+    """
+    migration = SchemaMigration(database)
+    unsupported = await migration.find_unsupported_query_patterns()
+    
+    if not unsupported:
+        logger.info("Index coverage: all %d route query patterns are index-backed", len(ROUTE_QUERY_PATTERNS))
+    for pattern in unsupported:
+        logger.warning(
+            f"Index coverage: no index for {pattern['collection']} "
+            f"(equality={pattern['equality']}, range_or_sort={pattern['range_or_sort']}) "
+            f"used by {pattern['used_by']}"
+        )
+    return unsupported
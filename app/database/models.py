@@ -167,6 +167,7 @@ class InputHistoryInDB(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     user_id: PyObjectId
     words: List[str]
+    words_key: Optional[str] = None  # Canonical key of the normalized word list
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
     @field_validator('id', 'user_id', mode='before')
@@ -219,10 +220,11 @@ class SavedParagraphCreate(BaseModel):
 class SavedParagraphInDB(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     input_history_id: PyObjectId
+    user_id: Optional[PyObjectId] = None  # Owner, copied from the input history
     paragraph: str
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
-    @field_validator('id', 'input_history_id', mode='before')
+    @field_validator('id', 'input_history_id', 'user_id', mode='before')
     @classmethod
     def validate_object_ids(cls, v):
         if v is None:
@@ -339,9 +341,14 @@ class LearnedVocabsCreateInternal(BaseModel):
             return v
         raise ValueError("Invalid collection_id ObjectId")
 
+# Case-insensitive collation for alphabetical vocab order; a query only uses the
+# matching index when it passes this same collation
+VOCAB_COLLATION = {"locale": "en", "strength": 2}
+
 class LearnedVocabsInDB(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     vocab: str
+    vocab_norm: Optional[str] = None  # Lowercased, stripped vocab used for lookups
     collection_id: PyObjectId  # Required reference to vocab_collections
     usage_count: int = Field(default=1)  # Track how many times this vocab is used
     created_at: datetime = Field(default_factory=datetime.utcnow)
@@ -389,26 +396,30 @@ class LearnedVocabsResponse(BaseModel):
 # History by Date Models
 class HistoryByDateCreate(BaseModel):
     vocab_id: PyObjectId
+    user_id: Optional[PyObjectId] = None  # Owner of the vocab's collection
     study_date: datetime  # Will be converted to date-only in CRUD
     count: int = Field(default=1, ge=1)
     
-    @field_validator('vocab_id', mode='before')
+    @field_validator('vocab_id', 'user_id', mode='before')
     @classmethod
-    def validate_vocab_id(cls, v):
+    def validate_object_ids(cls, v):
+        if v is None:
+            return None
         if isinstance(v, ObjectId):
             return str(v)
         if isinstance(v, str) and ObjectId.is_valid(v):
             return v
-        raise ValueError("Invalid vocab_id ObjectId")
+        raise ValueError("Invalid ObjectId")
 
 class HistoryByDateInDB(BaseModel):
     id: Optional[PyObjectId] = Field(default=None, alias="_id")
     vocab_id: PyObjectId  # Reference to learned_vocabs collection
+    user_id: Optional[PyObjectId] = None  # Owner of the vocab's collection (missing on rows from before it was stored)
     study_date: datetime  # Stored as date-only (yyyy-mm-dd)
     count: int = Field(default=1, ge=1)
     created_at: datetime = Field(default_factory=datetime.utcnow)
     
-    @field_validator('id', 'vocab_id', mode='before')
+    @field_validator('id', 'vocab_id', 'user_id', mode='before')
     @classmethod
     def validate_object_ids(cls, v):
         if v is None:
@@ -571,3 +582,36 @@ class StreakResponse(BaseModel):
     model_config = {
         "populate_by_name": True,
     }
+
+# Collection Deletion Job Models
+class CollectionDeletionJobInDB(BaseModel):
+    """Progress of the background cascade that removes a deleted collection's learned vocabs"""
+    id: Optional[PyObjectId] = Field(default=None, alias="_id")
+    collection_id: PyObjectId  # The (already deleted) vocab collection
+    user_id: PyObjectId
+    collection_name: str
+    status: str = "pending"  # pending | running | completed | failed
+    total_vocabs: int = 0
+    deleted_vocabs: int = 0
+    lease_expires_at: Optional[datetime] = None  # Set while a worker is running the job
+    error: Optional[str] = None  # Last failure, also kept while the job waits for a retry
+    failed_attempts: int = 0
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    completed_at: Optional[datetime] = None
+    
+    @field_validator('id', 'collection_id', 'user_id', mode='before')
+    @classmethod
+    def validate_object_ids(cls, v):
+        if v is None:
+            return None
+        if isinstance(v, ObjectId):
+            return str(v)
+        if isinstance(v, str) and ObjectId.is_valid(v):
+            return v
+        raise ValueError("Invalid ObjectId")
+    
+    model_config = {
+        "populate_by_name": True,
+        "arbitrary_types_allowed": True,
+    }
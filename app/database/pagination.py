@@ -0,0 +1,151 @@
+"""
+Keyset (cursor) pagination helpers
+
+A page is read with a range condition on (sort_key, _id) instead of a skip,
+so every page is an index range scan no matter how deep it is. Cursors are
+opaque URL-safe tokens holding the (sort_key, _id) of the first or last
+document of a page. A sort key can span several fields, e.g.
+(usage_count, created_at), in which case its value is a tuple.
+
+Usage in a CRUD list method:
+    range_filter, sort = keyset_query("created_at", DESCENDING, after, before)
+    cursor = collection.find({**query, **range_filter}).sort(sort).limit(limit)
+    ...
+    return keyset_order(documents, before)
+
+and in the route (fetch one extra document to know whether there is more):
+    items = await crud.list_method(..., limit=limit + 1, after=after, before=before)
+    items, next_cursor, prev_cursor = keyset_page(items, limit, after, before, key)
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+# Largest page any list endpoint returns
+MAX_PAGE_SIZE = 1000
+
+class InvalidCursorError(ValueError):
+    """Raised for malformed cursor tokens or conflicting after/before bounds"""
+
+def _encode_value(value: Any) -> List[Any]:
+    if isinstance(value, datetime):
+        return ["d", value.isoformat()]
+    if isinstance(value, ObjectId):
+        return ["o", str(value)]
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return ["v", value]
+    if isinstance(value, (tuple, list)):
+        return ["t", [_encode_value(item) for item in value]]
+    raise TypeError(f"Unsupported cursor value type: {type(value).__name__}")
+
+def _decode_value(encoded: List[Any]) -> Any:
+    kind, value = encoded
+    if kind == "d":
+        return datetime.fromisoformat(value)
+    if kind == "o":
+        return ObjectId(value)
+    if kind == "v":
+        return value
+    if kind == "t":
+        return tuple(_decode_value(item) for item in value)
+    raise InvalidCursorError(f"Unknown cursor value kind: {kind}")
+
+def encode_cursor(sort_value: Any, document_id: Any) -> str:
+    """Opaque cursor for the (sort_value, _id) position of a document"""
+    payload = json.dumps([_encode_value(sort_value), str(document_id)], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii").rstrip("=")
+
+def decode_cursor(cursor: str) -> Tuple[Any, ObjectId]:
+    """Decode a cursor into (sort_value, _id)"""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        encoded_value, document_id = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+        return _decode_value(encoded_value), ObjectId(document_id)
+    except InvalidCursorError:
+        raise
+    except (ValueError, TypeError, InvalidId) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+def keyset_query(sort_field: Union[str, Sequence[str]], direction: int, after: Optional[str] = None,
+                 before: Optional[str] = None) -> Tuple[Dict[str, Any], List[Tuple[str, int]]]:
+    """
+    Range filter and sort specification for one page
+
+    Args:
+        sort_field: Field, or fields, the list is ordered by (ties are broken by _id)
+        direction: ASCENDING (1) or DESCENDING (-1) display order
+        after: Cursor of the last document of the previous page
+        before: Cursor of the first document of the next page
+
+    Returns:
+        (filter to merge into the query, sort specification). Pages before a cursor
+        are read in reverse order; keyset_order restores the display order.
+    """
+    if after and before:
+        raise InvalidCursorError("Use either after or before, not both")
+
+    fields = [sort_field] if isinstance(sort_field, str) else list(sort_field)
+    read_direction = -direction if before else direction
+    sort = [(field, read_direction) for field in fields] + [("_id", read_direction)]
+
+    cursor = after or before
+    if not cursor:
+        return {}, sort
+
+    sort_value, document_id = decode_cursor(cursor)
+    values = [sort_value] if isinstance(sort_field, str) else sort_value
+    if not isinstance(values, (list, tuple)) or len(values) != len(fields):
+        raise InvalidCursorError(f"Cursor does not match the sort order: {cursor}")
+
+    # (a, b, _id) > (x, y, id)  <=>  a > x, or a == x and b > y, or a == x and b == y and _id > id
+    operator = "$gt" if read_direction > 0 else "$lt"
+    fields.append("_id")
+    values = list(values) + [document_id]
+    range_filter = {
+        "$or": [
+            {**dict(zip(fields[:position], values[:position])), fields[position]: {operator: values[position]}}
+            for position in range(len(fields))
+        ]
+    }
+    return range_filter, sort
+
+def keyset_order(documents: List[Any], before: Optional[str] = None) -> List[Any]:
+    """Restore display order of a page read by keyset_query"""
+    return list(reversed(documents)) if before else documents
+
+def keyset_page(items: List[Any], limit: int, after: Optional[str], before: Optional[str],
+                key: Callable[[Any], Tuple[Any, Any]]) -> Tuple[List[Any], Optional[str], Optional[str]]:
+    """
+    Trim a limit + 1 fetch to a page and compute its cursors
+
+    Args:
+        items: Up to limit + 1 items in display order
+        limit: Page size
+        after, before: The bounds the page was read with
+        key: Returns (sort_value, _id) of an item
+
+    Returns:
+        (page items, next_cursor, prev_cursor); a cursor is None when there is nothing
+        further in that direction
+    """
+    has_more = len(items) > limit
+    if before:
+        # Read in reverse: the extra item is the first one in display order
+        page = items[1:] if has_more else items
+    else:
+        page = items[:limit]
+
+    if not page:
+        return page, None, None
+
+    next_cursor = encode_cursor(*key(page[-1])) if has_more or before else None
+    prev_cursor = encode_cursor(*key(page[0])) if (has_more and before) or after else None
+    return page, next_cursor, prev_cursor
+
+def page_size(limit: int, maximum: int = MAX_PAGE_SIZE) -> int:
+    """Clamp a requested page size to 1..maximum"""
+    return max(1, min(limit, maximum))
@@ -1,4 +1,4 @@
-from fastapi import FastAPI
+from fastapi import Depends, FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from contextlib import asynccontextmanager
 import logging
@@ -9,12 +9,20 @@ load_dotenv()
 
 from app.api.v1.routes import router as v1_router
 from app.database.connection import connect_to_mongo, close_mongo_connection
-
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+from app.core.config import settings
+from app.core.metrics import (
+    LOG_RECORDS_DROPPED, METRICS_PATH, PrometheusMiddleware, mark_worker_dead, metrics_endpoint
 )
+from app.core.security import shutdown_password_executor
+from app.services.base_client import shutdown_llm_executor
+from app.services.google_auth import google_auth_service
+from app.services.llm_registry import llm_registry
+from app.services.collection_cascade import shutdown_collection_cascades, start_cascade_scanner
+from app.services.token_cache import start_revocation_sync, stop_revocation_sync
+from app.utils.logging_conf import DroppingQueueHandler, bind_log_route, configure_logging
+
+# Configure logging (JSON lines written by a background thread)
+configure_logging()
 logger = logging.getLogger(__name__)
 
 @asynccontextmanager
@@ -22,11 +30,20 @@ async def lifespan(app: FastAPI):
     # Startup
     logger.info("Starting English Learning API server...")
     await connect_to_mongo()
+    start_cascade_scanner()
+    start_revocation_sync()
     logger.info("Server startup completed")
     yield
     # Shutdown  
     logger.info("Shutting down server...")
+    await llm_registry.aclose()
+    shutdown_llm_executor()
+    shutdown_password_executor()
+    await google_auth_service.aclose()
+    await shutdown_collection_cascades()
+    await stop_revocation_sync()
     await close_mongo_connection()
+    mark_worker_dead()
     logger.info("Server shutdown completed")
 
 app = FastAPI(
@@ -50,5 +67,11 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Include API v1 routes
-app.include_router(v1_router)
+# Include API v1 routes (their logs are sampled per route, see LOG_SAMPLE_RATES)
+app.include_router(v1_router, dependencies=[Depends(bind_log_route)])
+
+# Prometheus metrics (route latency, in-flight requests, MongoDB and LLM calls)
+if settings.METRICS_ENABLED:
+    app.add_middleware(PrometheusMiddleware)
+    app.add_route(METRICS_PATH, metrics_endpoint, include_in_schema=False)
+    DroppingQueueHandler.on_drop = LOG_RECORDS_DROPPED.inc
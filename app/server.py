@@ -0,0 +1,83 @@
+"""
+Production entry point: `python -m app.server`
+
+Runs uvicorn with WEB_CONCURRENCY worker processes (default: one per CPU
+this process may use, capped by the container's CPU quota). uvicorn spawns
+its workers rather than forking them: each one is a fresh interpreter that
+imports the app and runs its lifespan, so each one opens its own MongoDB
+client, LLM clients and HTTP pools; nothing is shared across them.
+For local development keep using `uvicorn app.main:app --reload`.
+"""
+import glob
+import math
+import os
+from typing import Optional
+
+import uvicorn
+from dotenv import load_dotenv
+
+# Same environment as the workers (app.main loads .env too)
+load_dotenv()
+
+from app.core.config import settings
+
+def cgroup_cpu_limit() -> Optional[int]:
+    """CPUs allowed by the cgroup CPU quota (docker --cpus, Kubernetes limits), None without a quota"""
+    try:
+        # cgroup v2: "<quota> <period>", quota "max" when unlimited
+        with open("/sys/fs/cgroup/cpu.max") as f:
+            quota, period = f.read().split()[:2]
+    except (OSError, ValueError):
+        try:
+            # cgroup v1: quota -1 when unlimited
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us") as f:
+                quota = f.read().strip()
+            with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us") as f:
+                period = f.read().strip()
+        except OSError:
+            return None
+    try:
+        quota_us, period_us = int(quota), int(period)
+    except ValueError:
+        return None
+    if quota_us <= 0 or period_us <= 0:
+        return None
+    return max(1, math.ceil(quota_us / period_us))
+
+def available_cpus() -> int:
+    """CPUs this process may use: its CPU set, capped by the cgroup CPU quota"""
+    if hasattr(os, "process_cpu_count"):
+        # Python 3.13+
+        cpus = os.process_cpu_count() or 1
+    elif hasattr(os, "sched_getaffinity"):
+        cpus = max(1, len(os.sched_getaffinity(0)))
+    else:
+        cpus = os.cpu_count() or 1
+    limit = cgroup_cpu_limit()
+    return min(cpus, limit) if limit else cpus
+
+def worker_count() -> int:
+    return settings.WEB_CONCURRENCY if settings.WEB_CONCURRENCY > 0 else available_cpus()
+
+def reset_metrics_dir():
+    """Start with an empty PROMETHEUS_MULTIPROC_DIR; files of a previous run would be summed in"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    os.makedirs(directory, exist_ok=True)
+    for path in glob.glob(os.path.join(directory, "*.db")):
+        os.remove(path)
+
+def main():
+    reset_metrics_dir()
+    uvicorn.run(
+        "app.main:app",
+        host=settings.HOST,
+        port=settings.PORT,
+        workers=worker_count(),
+        proxy_headers=True,
+        access_log=settings.ACCESS_LOG,
+    )
+
+if __name__ == "__main__":
+    main()
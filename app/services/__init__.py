@@ -1,6 +1,21 @@
-from .gemini_client import GeminiClient
-from .openai_client import OpenAIClient
-from .claude_client import ClaudeClient
-from .google_auth import *
+"""
+Service modules are imported on demand: provider clients pull in large SDKs,
+so importing app.services (or any one service) must not import the others.
+The names below stay importable from app.services and load on first access.
+"""
+import importlib
 
-__all__ = ['GeminiClient', 'OpenAIClient', 'ClaudeClient']
\ No newline at end of file
+_LAZY_EXPORTS = {
+    "GeminiClient": "app.services.gemini_client",
+    "OpenAIClient": "app.services.openai_client",
+    "ClaudeClient": "app.services.claude_client",
+    "GoogleAuthService": "app.services.google_auth",
+    "google_auth_service": "app.services.google_auth",
+}
+
+__all__ = ['GeminiClient', 'OpenAIClient', 'ClaudeClient']
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,97 @@
+"""
+Shared async plumbing for the LLM provider clients
+
+Every provider client subclasses BaseLLMClient and implements `_generate`
+(and `_stream` when the SDK can stream) with the SDK's native async API.
+SDK calls that only exist in a blocking form go through `run_blocking`,
+which runs them on a bounded thread pool so the event loop keeps serving
+other requests.
+"""
+import asyncio
+import os
+import time
+from abc import ABC, abstractmethod
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import Any, AsyncIterator, Callable, Optional
+
+from app.core.metrics import observe_llm_call
+
+# Upper bound for blocking SDK calls running at the same time
+LLM_EXECUTOR_MAX_WORKERS = int(os.getenv("LLM_EXECUTOR_MAX_WORKERS", "8"))
+
+# Upper bound for in-flight generations per client
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "16"))
+
+_executor: Optional[ThreadPoolExecutor] = None
+
+def get_llm_executor() -> ThreadPoolExecutor:
+    """Get (or lazily create) the shared executor for blocking SDK calls"""
+    global _executor
+    if _executor is None:
+        _executor = ThreadPoolExecutor(
+            max_workers=LLM_EXECUTOR_MAX_WORKERS,
+            thread_name_prefix="llm-sdk"
+        )
+    return _executor
+
+async def run_blocking(func: Callable[..., Any], *args, **kwargs) -> Any:
+    """Run a blocking SDK call on the bounded executor"""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_llm_executor(), partial(func, *args, **kwargs))
+
+def shutdown_llm_executor():
+    """Shut down the shared executor (called on application shutdown)"""
+    global _executor
+    if _executor is not None:
+        _executor.shutdown(wait=False, cancel_futures=True)
+        _executor = None
+
+class BaseLLMClient(ABC):
+    """Base class for async LLM provider clients"""
+
+    provider: str = "base"
+
+    def __init__(self, model_name: str, max_concurrency: Optional[int] = None):
+        self.model_name = model_name
+        self._semaphore = asyncio.Semaphore(max_concurrency or LLM_MAX_CONCURRENCY)
+
+    async def generate_text(self, prompt: str, max_output_tokens: int = 256) -> str:
+        """Generate text without blocking the event loop"""
+        async with self._semaphore:
+            started = time.perf_counter()
+            try:
+                text = await self._generate(prompt, max_output_tokens)
+            except BaseException as e:
+                observe_llm_call(self.provider, "generate", prompt, started, error=e)
+                raise
+            observe_llm_call(self.provider, "generate", prompt, started, response=text)
+            return text
+
+    async def stream_text(self, prompt: str, max_output_tokens: int = 256) -> AsyncIterator[str]:
+        """Yield generated text chunks as the provider produces them"""
+        async with self._semaphore:
+            started = time.perf_counter()
+            size = 0
+            try:
+                async for chunk in self._stream(prompt, max_output_tokens):
+                    if chunk:
+                        size += len(chunk)
+                        yield chunk
+            except BaseException as e:
+                # Includes the client going away mid-stream (GeneratorExit / CancelledError)
+                observe_llm_call(self.provider, "stream", prompt, started, error=e)
+                raise
+            observe_llm_call(self.provider, "stream", prompt, started, response_chars=size)
+
+    @abstractmethod
+    async def _generate(self, prompt: str, max_output_tokens: int) -> str:
+        """Generate the whole response with the SDK"""
+
+    async def _stream(self, prompt: str, max_output_tokens: int) -> AsyncIterator[str]:
+        # Providers without streaming support answer in a single chunk
+        yield await self._generate(prompt, max_output_tokens)
+
+    async def aclose(self):
+        """Release network resources held by the SDK client"""
+        return None
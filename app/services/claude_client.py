@@ -1,20 +1,27 @@
-import os
-from dotenv import load_dotenv
-from anthropic import Anthropic
+from anthropic import AsyncAnthropic
 
-load_dotenv()
-api_key = os.getenv("CLAUDE_API_KEY")
-if not api_key:
-    raise ValueError("Bạn chưa đặt CLAUDE_API_KEY trong .env")
+from app.core.config import settings
+from app.services.base_client import BaseLLMClient
+
+class ClaudeClient(BaseLLMClient):
+    provider = "claude"
 
-class ClaudeClient:
     def __init__(self, model_name: str = "claude-3-sonnet-20240229"):
-        self.model_name = model_name
-        self.client = Anthropic(api_key=api_key)
+        if not settings.CLAUDE_API_KEY:
+            raise ValueError("Bạn chưa đặt CLAUDE_API_KEY trong .env")
+        super().__init__(model_name)
+        self.client = AsyncAnthropic(api_key=settings.CLAUDE_API_KEY)
 
     async def generate_text(self, prompt: str, max_output_tokens: int = 2048) -> str:
+        return await super().generate_text(prompt, max_output_tokens)
+
+    async def stream_text(self, prompt: str, max_output_tokens: int = 2048):
+        async for chunk in super().stream_text(prompt, max_output_tokens):
+            yield chunk
+
+    async def _generate(self, prompt: str, max_output_tokens: int) -> str:
         try:
-            response = self.client.messages.create(
+            response = await self.client.messages.create(
                 model=self.model_name,
                 max_tokens=max_output_tokens,
                 messages=[
@@ -25,3 +32,23 @@ class ClaudeClient:
             return response.content[0].text
         except Exception as e:
             raise Exception(f"Error generating text with Claude: {str(e)}")
+
+    async def _stream(self, prompt: str, max_output_tokens: int):
+        try:
+            stream = await self.client.messages.create(
+                model=self.model_name,
+                max_tokens=max_output_tokens,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                temperature=0.7,
+                stream=True
+            )
+            async for event in stream:
+                if event.type == "content_block_delta" and getattr(event.delta, "text", None):
+                    yield event.delta.text
+        except Exception as e:
+            raise Exception(f"Error streaming text with Claude: {str(e)}")
+
+    async def aclose(self):
+        await self.client.close()
@@ -0,0 +1,126 @@
+"""
+Background cascade for deleted vocab collections
+
+DELETE /vocab-collections/{id} removes the collection document right away and,
+for large collections, leaves its learned_vocabs to a job that deletes them
+CASCADE_CHUNK_SIZE at a time. Progress lives in the `collection_deletion_jobs`
+collection. The job is written before the collection document is deleted, so
+the vocabularies are never left without one; a job whose collection still
+exists waits for the request to delete it, and is marked failed after
+CASCADE_LEASE if it never does. A lease on the job document keeps two workers from running the
+same job; every CASCADE_SCAN_INTERVAL each worker looks for jobs whose lease
+is free or expired (their worker was killed, or the process restarted) and
+runs them. A failed run puts the job back to pending after CASCADE_RETRY_DELAY,
+up to CASCADE_MAX_ATTEMPTS failures before it is marked failed.
+"""
+import asyncio
+from datetime import datetime, timedelta
+from typing import Dict, Optional
+
+from app.database.crud import (
+    CASCADE_CHUNK_SIZE, get_collection_deletion_job_crud, get_learned_vocabs_crud, get_vocab_collection_crud
+)
+from app.utils.logging_conf import get_logger
+
+logger = get_logger("collection_cascade")
+
+# A worker that dies mid-job holds it for at most this long
+CASCADE_LEASE = timedelta(seconds=60)
+
+# How often each worker looks for jobs to pick up
+CASCADE_SCAN_INTERVAL = 30
+
+# A failed job is retried after this delay, until it has failed this many times
+CASCADE_RETRY_DELAY = timedelta(minutes=2)
+CASCADE_MAX_ATTEMPTS = 5
+
+# Running jobs by ID; holding the task objects keeps them from being garbage collected
+_tasks: Dict[str, asyncio.Task] = {}
+_scan_task: Optional[asyncio.Task] = None
+
+async def run_collection_cascade(job_id: str):
+    """Delete the learned vocabs of a job's collection chunk by chunk, recording progress"""
+    job_crud = get_collection_deletion_job_crud()
+    learned_vocabs_crud = get_learned_vocabs_crud()
+
+    job = await job_crud.claim_job(job_id, CASCADE_LEASE)
+    if not job:
+        # Finished, or another worker holds the lease
+        return
+
+    if await get_vocab_collection_crud().get_vocab_collection_by_id(str(job.collection_id)):
+        # The request that wrote the job has not deleted the collection (yet)
+        if datetime.utcnow() - job.created_at < CASCADE_LEASE:
+            await job_crud.release_job(job_id)
+        else:
+            logger.warning("Cascade job %s: collection %s was never deleted, dropping the job", job_id, job.collection_id)
+            await job_crud.finish_job(job_id, error="collection_not_deleted")
+        return
+
+    try:
+        while True:
+            deleted = await learned_vocabs_crud.delete_vocabs_chunk(job.collection_id, CASCADE_CHUNK_SIZE)
+            if not deleted:
+                break
+            await job_crud.record_progress(job_id, deleted, CASCADE_LEASE)
+        await job_crud.finish_job(job_id)
+        logger.info("Cascade job %s removed the vocabularies of collection '%s'", job_id, job.collection_name)
+    except asyncio.CancelledError:
+        # Shutting down: let the next startup (or another worker) resume the job
+        await asyncio.shield(job_crud.release_job(job_id))
+        raise
+    except Exception as e:
+        if job.failed_attempts + 1 < CASCADE_MAX_ATTEMPTS:
+            logger.exception("Cascade job %s failed, retrying in %s", job_id, CASCADE_RETRY_DELAY)
+            await job_crud.retry_job_later(job_id, str(e), CASCADE_RETRY_DELAY)
+        else:
+            logger.exception("Cascade job %s failed %d times, giving up", job_id, CASCADE_MAX_ATTEMPTS)
+            await job_crud.finish_job(job_id, error=str(e))
+
+def start_collection_cascade(job_id: str) -> asyncio.Task:
+    """Run a cascade job in the background of the current event loop"""
+    task = _tasks.get(job_id)
+    if task and not task.done():
+        return task
+    task = asyncio.create_task(run_collection_cascade(job_id))
+    _tasks[job_id] = task
+    task.add_done_callback(lambda done: _tasks.pop(job_id) if _tasks.get(job_id) is done else None)
+    return task
+
+async def resume_collection_cascades() -> int:
+    """Start the unfinished jobs no worker holds a live lease on; returns how many were started"""
+    job_ids = [
+        job_id for job_id in await get_collection_deletion_job_crud().get_resumable_job_ids()
+        if job_id not in _tasks
+    ]
+    for job_id in job_ids:
+        start_collection_cascade(job_id)
+    if job_ids:
+        logger.info("Resuming %d collection cascade job(s)", len(job_ids))
+    return len(job_ids)
+
+async def _scan_collection_cascades(interval: float):
+    while True:
+        try:
+            await resume_collection_cascades()
+        except Exception as e:
+            logger.warning("Could not scan for collection cascade jobs: %s", e)
+        await asyncio.sleep(interval)
+
+def start_cascade_scanner(interval: float = CASCADE_SCAN_INTERVAL) -> asyncio.Task:
+    """Resume unfinished jobs now and then every `interval` seconds, until shutdown"""
+    global _scan_task
+    if _scan_task is None or _scan_task.done():
+        _scan_task = asyncio.create_task(_scan_collection_cascades(interval))
+    return _scan_task
+
+async def shutdown_collection_cascades():
+    """Stop the scanner and cancel running jobs; they keep their progress for the next worker"""
+    global _scan_task
+    tasks = list(_tasks.values())
+    if _scan_task is not None:
+        tasks.append(_scan_task)
+        _scan_task = None
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
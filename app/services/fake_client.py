@@ -0,0 +1,60 @@
+"""
+Local fake LLM provider for load tests and offline development
+"""
+import asyncio
+import json
+import time
+from typing import List, Optional
+
+from app.services.base_client import BaseLLMClient, run_blocking
+
+DEFAULT_FAKE_RESPONSE = json.dumps({
+    "paragraph": "This is a **fake** paragraph.",
+    "explain_vocabs": {},
+    "explanation_in_paragraph": {}
+})
+
+class FakeLLMClient(BaseLLMClient):
+    """
+    Fake provider that answers after a fixed latency, or streams scripted chunks
+
+    mode:
+        "async"    - awaits asyncio.sleep, like a native async SDK
+        "executor" - time.sleep on the bounded executor, like a blocking SDK behind run_blocking
+        "inline"   - time.sleep on the event loop, like calling a blocking SDK directly
+    """
+    provider = "fake"
+
+    def __init__(self, model_name: str = "fake-model", latency: float = 0.5,
+                 response: Optional[str] = None, mode: str = "async",
+                 chunks: Optional[List[str]] = None, chunk_delay: float = 0.0):
+        super().__init__(model_name)
+        if mode not in ("async", "executor", "inline"):
+            raise ValueError(f"Unknown fake provider mode: {mode}")
+        self.latency = latency
+        self.response = response if response is not None else DEFAULT_FAKE_RESPONSE
+        self.mode = mode
+        # Scripted stream; defaults to the response split into small pieces
+        self.chunks = chunks if chunks is not None else [
+            self.response[i:i + 16] for i in range(0, len(self.response), 16)
+        ]
+        self.chunk_delay = chunk_delay
+        self.calls = 0
+
+    async def _generate(self, prompt: str, max_output_tokens: int) -> str:
+        self.calls += 1
+        if self.mode == "async":
+            await asyncio.sleep(self.latency)
+        elif self.mode == "executor":
+            await run_blocking(time.sleep, self.latency)
+        else:
+            time.sleep(self.latency)
+        return self.response
+
+    async def _stream(self, prompt: str, max_output_tokens: int):
+        self.calls += 1
+        await asyncio.sleep(self.latency)
+        for chunk in self.chunks:
+            if self.chunk_delay:
+                await asyncio.sleep(self.chunk_delay)
+            yield chunk
@@ -1,18 +1,47 @@
-import os
-from dotenv import load_dotenv
 import google.generativeai as genai
 
-load_dotenv()
-api_key = os.getenv("GEMINI_API_KEY")
-if not api_key:
-    raise ValueError("Bạn chưa đặt GEMINI_API_KEY trong .env")
+from app.core.config import settings
+from app.services.base_client import BaseLLMClient, run_blocking
 
-genai.configure(api_key=api_key)
+class GeminiClient(BaseLLMClient):
+    provider = "gemini"
 
-class GeminiClient:
     def __init__(self, model_name: str = "gemini-2.5-flash"):
+        if not settings.GEMINI_API_KEY:
+            raise ValueError("Bạn chưa đặt GEMINI_API_KEY trong .env")
+        super().__init__(model_name)
+        genai.configure(api_key=settings.GEMINI_API_KEY)
         self.model = genai.GenerativeModel(model_name)
 
-    async def generate_text(self, prompt: str, max_output_tokens: int = 256) -> str:
-        response = self.model.generate_content(prompt)
+    async def _generate(self, prompt: str, max_output_tokens: int) -> str:
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(prompt)
+        else:
+            # Older SDKs only ship the blocking call
+            response = await run_blocking(self.model.generate_content, prompt)
         return response.text
+
+    async def _stream(self, prompt: str, max_output_tokens: int):
+        if hasattr(self.model, "generate_content_async"):
+            response = await self.model.generate_content_async(prompt, stream=True)
+            async for chunk in response:
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+        else:
+            # Older SDKs only ship the blocking call; pull each chunk on the executor
+            response = await run_blocking(self.model.generate_content, prompt, stream=True)
+            chunks = iter(response)
+            while True:
+                chunk = await run_blocking(next, chunks, None)
+                if chunk is None:
+                    break
+                text = _chunk_text(chunk)
+                if text:
+                    yield text
+
+def _chunk_text(chunk) -> str:
+    """Text of a streamed chunk; safety and finish chunks have no text parts (chunk.text raises on them)"""
+    if not chunk.candidates:
+        return ""
+    return "".join(part.text for part in chunk.candidates[0].content.parts if getattr(part, "text", None))
@@ -0,0 +1,216 @@
+"""
+Content-addressed cache for paragraph generation results
+
+Requests are keyed on a SHA-256 of their normalized fields (language, level,
+tone, topic, length, prompt, provider/model and the vocabulary *set*), so
+the same word list in a different order or casing hits the same entry.
+
+Backends:
+    memory - in-process OrderedDict with TTL and LRU eviction (per worker)
+    mongo  - shared `generation_cache` collection, expired by a TTL index
+"""
+import hashlib
+import json
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from app.core.config import settings
+from app.utils.logging_conf import get_logger
+
+logger = get_logger("generation_cache")
+
+def _normalize_text(value: Optional[str]) -> str:
+    """Lowercase and collapse whitespace; None becomes an empty string"""
+    if not value:
+        return ""
+    return " ".join(value.split()).lower()
+
+def normalize_vocabularies(vocabularies: Iterable[str]) -> list:
+    """Normalized, de-duplicated and sorted vocabulary list"""
+    return sorted({_normalize_text(word) for word in vocabularies if isinstance(word, str) and word.strip()})
+
+def make_cache_key(language: str, level: str, vocabularies: Iterable[str], length: Optional[int] = None,
+                   tone: Optional[str] = None, topic: Optional[str] = None,
+                   prompt: Optional[str] = None, model: str = "") -> str:
+    """Build the content-addressed key for a generation request"""
+    payload = {
+        "language": _normalize_text(language),
+        "level": _normalize_text(level),
+        "tone": _normalize_text(tone),
+        "topic": _normalize_text(topic),
+        "length": length or 1,
+        "prompt": _normalize_text(prompt),
+        "model": model,
+        "vocabularies": normalize_vocabularies(vocabularies),
+    }
+    encoded = json.dumps(payload, sort_keys=True, separators=(",", ":")).encode("utf-8")
+    return hashlib.sha256(encoded).hexdigest()
+
+class CacheBackend(ABC):
+    """Storage interface for the generation cache"""
+
+    name = "base"
+
+    @abstractmethod
+    async def get(self, key: str) -> Optional[str]:
+        """Cached value, or None if missing or expired"""
+
+    @abstractmethod
+    async def set(self, key: str, value: str):
+        """Store a value under key"""
+
+    @abstractmethod
+    async def clear(self):
+        """Remove every entry"""
+
+    def size(self) -> Optional[int]:
+        """Number of entries, if cheap to compute"""
+        return None
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process cache with TTL expiry and LRU eviction"""
+
+    name = "memory"
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 86400):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+
+        value, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return None
+
+        # Mark as most recently used
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str):
+        self._entries[key] = (value, time.monotonic() + self.ttl_seconds)
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.evictions += 1
+
+    async def clear(self):
+        self._entries.clear()
+
+    def size(self) -> Optional[int]:
+        return len(self._entries)
+
+class MongoCacheBackend(CacheBackend):
+    """Cache shared by all workers, stored in MongoDB"""
+
+    name = "mongo"
+
+    def __init__(self, ttl_seconds: int = 86400, collection_name: str = "generation_cache"):
+        self.ttl_seconds = ttl_seconds
+        self.collection_name = collection_name
+
+    @property
+    def collection(self):
+        from app.database.connection import get_collection
+        return get_collection(self.collection_name)
+
+    async def get(self, key: str) -> Optional[str]:
+        # The TTL monitor only runs once a minute, so filter on expires_at too
+        entry = await self.collection.find_one(
+            {"_id": key, "expires_at": {"$gt": datetime.utcnow()}},
+            {"result": 1}
+        )
+        return entry["result"] if entry else None
+
+    async def set(self, key: str, value: str):
+        now = datetime.utcnow()
+        await self.collection.update_one(
+            {"_id": key},
+            {"$set": {
+                "result": value,
+                "created_at": now,
+                "expires_at": now + timedelta(seconds=self.ttl_seconds)
+            }},
+            upsert=True
+        )
+
+    async def clear(self):
+        await self.collection.delete_many({})
+
+class GenerationCache:
+    """Generation cache front end with hit/miss counters"""
+
+    def __init__(self, backend: CacheBackend):
+        self.backend = backend
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.errors = 0
+
+    async def get(self, key: str) -> Optional[str]:
+        try:
+            value = await self.backend.get(key)
+        except Exception as e:
+            # A broken cache must never fail the generation itself
+            self.errors += 1
+            logger.warning("Generation cache lookup failed: %s", e)
+            value = None
+
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    async def set(self, key: str, value: str):
+        try:
+            await self.backend.set(key, value)
+            self.writes += 1
+        except Exception as e:
+            self.errors += 1
+            logger.warning("Generation cache write failed: %s", e)
+
+    async def clear(self):
+        await self.backend.clear()
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.backend.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "writes": self.writes,
+            "errors": self.errors,
+            "evictions": getattr(self.backend, "evictions", 0),
+            "entries": self.backend.size(),
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+def create_generation_cache() -> Optional[GenerationCache]:
+    """Build the cache configured in settings (None when disabled)"""
+    if not settings.GENERATION_CACHE_ENABLED:
+        return None
+
+    backend_name = settings.GENERATION_CACHE_BACKEND.lower()
+    if backend_name == "memory":
+        backend = InMemoryCacheBackend(
+            max_entries=settings.GENERATION_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS
+        )
+    elif backend_name == "mongo":
+        backend = MongoCacheBackend(ttl_seconds=settings.GENERATION_CACHE_TTL_SECONDS)
+    else:
+        raise ValueError(f"Unknown GENERATION_CACHE_BACKEND: {settings.GENERATION_CACHE_BACKEND}")
+
+    return GenerationCache(backend)
+
+generation_cache = create_generation_cache()
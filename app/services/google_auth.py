@@ -1,15 +1,45 @@
+import asyncio
 import httpx
+import logging
 import jwt
+import re
+import time
 from datetime import datetime, timedelta
-from typing import Optional, Dict, Any
-from google.auth.transport.requests import Request
-from google.oauth2 import id_token
-from google_auth_oauthlib.flow import Flow
+from typing import Optional, Dict, Any, List
 import os
+from app.core.config import settings
 from app.utils.logging_conf import get_logger
 
 logger = get_logger("google_auth")
 
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+# Redirect URIs the frontends are known to use, tried in this order when a
+# client neither sends one nor comes from an origin seen before
+KNOWN_REDIRECT_URIS = [
+    "http://localhost:5173",  # Vite default
+    "http://localhost:3000",  # React default
+    "postmessage",            # For popup mode
+    "urn:ietf:wg:oauth:2.0:oob"  # For desktop/mobile
+]
+
+# Upper bound for the learned origin -> redirect_uri mapping
+MAX_LEARNED_ORIGINS = 256
+
+class GoogleTokenExchangeError(Exception):
+    """Google rejected an authorization code exchange"""
+
+    def __init__(self, message: str, error_code: Optional[str] = None):
+        super().__init__(message)
+        self.error_code = error_code
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
 class GoogleAuthService:
     def __init__(self):
         self.client_id = os.getenv("GOOGLE_CLIENT_ID")
@@ -17,9 +47,90 @@ class GoogleAuthService:
         self.redirect_uri = os.getenv("GOOGLE_REDIRECT_URI", "http://localhost:3000")
         self.jwt_secret = os.getenv("JWT_SECRET", "your-secret-key")
         
+        # Shared connection pool, created on first use and closed on shutdown
+        self._http_client: Optional[httpx.AsyncClient] = None
+        
+        # Redirect URI that last worked for each request Origin
+        self._redirect_uri_by_origin: Dict[str, str] = {}
+        
+        # Google's ID token signing certificates, refreshed per their Cache-Control
+        self._certs: Optional[Dict[str, str]] = None
+        self._certs_expire_at = 0.0
+        self._certs_lock = asyncio.Lock()
+        
         if not self.client_id or not self.client_secret:
             logger.warning("Google OAuth credentials not found in environment variables")
 
+    @property
+    def http_client(self) -> httpx.AsyncClient:
+        """Pooled client reused by every call to Google (keep-alive, HTTP/2 when h2 is installed)"""
+        if self._http_client is None or self._http_client.is_closed:
+            self._http_client = httpx.AsyncClient(
+                http2=settings.GOOGLE_HTTP2 and _http2_available(),
+                timeout=httpx.Timeout(
+                    settings.GOOGLE_HTTP_TIMEOUT_SECONDS,
+                    connect=settings.GOOGLE_HTTP_CONNECT_TIMEOUT_SECONDS
+                ),
+                limits=httpx.Limits(
+                    max_connections=settings.GOOGLE_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.GOOGLE_HTTP_MAX_CONNECTIONS
+                )
+            )
+        return self._http_client
+
+    async def aclose(self):
+        """Close the pooled HTTP client (called on application shutdown)"""
+        if self._http_client is not None:
+            await self._http_client.aclose()
+            self._http_client = None
+
+    def redirect_uris_for(self, origin: Optional[str] = None, redirect_uri: Optional[str] = None) -> List[str]:
+        """
+        Redirect URIs to try for a code exchange, best guess first.
+        An explicit redirect_uri or one learned for the origin is the only candidate.
+        """
+        if redirect_uri:
+            return [redirect_uri]
+        if origin and origin in self._redirect_uri_by_origin:
+            return [self._redirect_uri_by_origin[origin]]
+        
+        candidates = []
+        if origin in KNOWN_REDIRECT_URIS:
+            candidates.append(origin)
+        for candidate in [self.redirect_uri] + KNOWN_REDIRECT_URIS:
+            if candidate not in candidates:
+                candidates.append(candidate)
+        return candidates
+
+    def remember_redirect_uri(self, origin: Optional[str], redirect_uri: str):
+        """Record the redirect URI that worked for an origin"""
+        if not origin:
+            return
+        if origin not in self._redirect_uri_by_origin and len(self._redirect_uri_by_origin) >= MAX_LEARNED_ORIGINS:
+            return
+        self._redirect_uri_by_origin[origin] = redirect_uri
+
+    async def exchange_code(self, authorization_code: str, origin: Optional[str] = None,
+                            redirect_uri: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Exchange an authorization code, choosing the redirect URI from the request or the origin.
+        
+        Only an origin seen for the first time without a redirect_uri falls back to the
+        known URIs, and only while Google answers redirect_uri_mismatch (a mismatched
+        exchange does not consume the code). The URI that works is remembered.
+        """
+        candidates = self.redirect_uris_for(origin, redirect_uri)
+        for index, candidate in enumerate(candidates):
+            try:
+                result = await self.exchange_code_for_tokens(authorization_code, candidate)
+            except GoogleTokenExchangeError as e:
+                if e.error_code == "redirect_uri_mismatch" and index + 1 < len(candidates):
+                    logger.info("redirect_uri %s rejected for origin %s, trying the next one", candidate, origin)
+                    continue
+                raise
+            self.remember_redirect_uri(origin, candidate)
+            return result
+
     async def exchange_code_for_tokens(self, authorization_code: str, redirect_uri: str = None) -> Dict[str, Any]:
         """
         Exchange authorization code for access token and user info
@@ -28,12 +139,10 @@ class GoogleAuthService:
             # Use provided redirect_uri or default
             used_redirect_uri = redirect_uri or self.redirect_uri
             
-            # Debug log environment variables
-            logger.info(f"Using client_id: {self.client_id[:20]}..." if self.client_id else "No client_id")
-            logger.info(f"Using redirect_uri: {used_redirect_uri}")
+            logger.debug("Exchanging authorization code with redirect_uri %s", used_redirect_uri)
             
             # Prepare token exchange request
-            token_url = "https://oauth2.googleapis.com/token"
+            token_url = settings.GOOGLE_TOKEN_URL
             
             # Include redirect_uri - Google might still need it even for popup mode
             data = {
@@ -44,17 +153,17 @@ class GoogleAuthService:
                 "redirect_uri": used_redirect_uri
             }
             
-            # Debug log request data (without sensitive info)
-            debug_data = {k: v for k, v in data.items() if k != "client_secret"}
-            debug_data["client_secret"] = "***" if data.get("client_secret") else "MISSING"
-            logger.info(f"Token exchange request data: {debug_data}")
+            # Debug log request data (without secrets), built only when DEBUG is on
+            if logger.isEnabledFor(logging.DEBUG):
+                debug_data = {k: v for k, v in data.items() if k not in ("client_secret", "code")}
+                debug_data["client_secret"] = "***" if data.get("client_secret") else "MISSING"
+                logger.debug("Token exchange request data: %s", debug_data)
             
             # Exchange code for tokens
-            async with httpx.AsyncClient() as client:
-                response = await client.post(token_url, data=data)
-                logger.info(f"Google response status: {response.status_code}")
-                response.raise_for_status()
-                token_data = response.json()
+            response = await self.http_client.post(token_url, data=data)
+            logger.debug("Google token endpoint answered %s", response.status_code)
+            response.raise_for_status()
+            token_data = response.json()
             
             # Get user info using access token
             user_info = await self.get_user_info(token_data["access_token"])
@@ -69,20 +178,19 @@ class GoogleAuthService:
             
         except httpx.HTTPStatusError as e:
             error_response = e.response.text
-            logger.error(f"HTTP error during token exchange: {error_response}")
-            logger.error(f"Response status: {e.response.status_code}")
-            logger.error(f"Response headers: {dict(e.response.headers)}")
+            logger.error("HTTP error %s during token exchange: %s", e.response.status_code, error_response)
             
             # Try to parse error details
+            error_code = None
             try:
                 error_json = e.response.json()
-                logger.error(f"Error details: {error_json}")
+                error_code = error_json.get("error")
             except:
                 pass
                 
-            raise Exception(f"Failed to exchange authorization code: {error_response}")
+            raise GoogleTokenExchangeError(f"Failed to exchange authorization code: {error_response}", error_code)
         except Exception as e:
-            logger.error(f"Error exchanging authorization code: {str(e)}")
+            logger.error("Error exchanging authorization code: %s", e)
             raise Exception(f"Authentication failed: {str(e)}")
 
     async def get_user_info(self, access_token: str) -> Dict[str, Any]:
@@ -90,38 +198,60 @@ class GoogleAuthService:
         Get user information from Google using access token
         """
         try:
-            user_info_url = "https://www.googleapis.com/oauth2/v2/userinfo"
+            user_info_url = settings.GOOGLE_USERINFO_URL
             headers = {"Authorization": f"Bearer {access_token}"}
             
-            async with httpx.AsyncClient() as client:
-                response = await client.get(user_info_url, headers=headers)
-                response.raise_for_status()
-                return response.json()
+            response = await self.http_client.get(user_info_url, headers=headers)
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
-            logger.error(f"Error getting user info: {str(e)}")
+            logger.error("Error getting user info: %s", e)
             raise Exception("Failed to get user information")
 
-    def verify_id_token(self, id_token_str: str) -> Dict[str, Any]:
+    async def get_google_certs(self) -> Dict[str, str]:
+        """
+        Google's ID token signing certificates (key id -> PEM), fetched with the pooled
+        client and cached for the max-age Google sends
+        """
+        if self._certs is not None and time.monotonic() < self._certs_expire_at:
+            return self._certs
+        
+        async with self._certs_lock:
+            # Another request may have refreshed them while we waited
+            if self._certs is not None and time.monotonic() < self._certs_expire_at:
+                return self._certs
+            
+            response = await self.http_client.get(settings.GOOGLE_CERTS_URL)
+            response.raise_for_status()
+            
+            max_age = re.search(r"max-age=(\d+)", response.headers.get("cache-control", ""))
+            self._certs = response.json()
+            self._certs_expire_at = time.monotonic() + (int(max_age.group(1)) if max_age else 3600)
+            return self._certs
+
+    async def verify_id_token(self, id_token_str: str) -> Dict[str, Any]:
         """
         Verify Google ID token and extract user information
         """
+        # Imported here: only ID token logins need the google-auth stack
+        from google.auth import exceptions as google_auth_exceptions
+        from google.auth import jwt as google_jwt
+        
         try:
-            # Verify the token
-            id_info = id_token.verify_oauth2_token(
-                id_token_str, 
-                Request(), 
-                self.client_id
-            )
+            certs = await self.get_google_certs()
+            
+            # Signature, exp and audience checks; no network involved
+            id_info = google_jwt.decode(id_token_str, certs=certs, audience=self.client_id)
             
             # Check issuer
-            if id_info['iss'] not in ['accounts.google.com', 'https://accounts.google.com']:
+            if id_info['iss'] not in GOOGLE_ISSUERS:
                 raise ValueError('Wrong issuer.')
                 
             return id_info
             
-        except ValueError as e:
-            logger.error(f"Invalid ID token: {str(e)}")
+        except (ValueError, google_auth_exceptions.GoogleAuthError) as e:
+            logger.error("Invalid ID token: %s", e)
             raise Exception("Invalid ID token")
 
     def create_jwt_token(self, user_data: Dict[str, Any]) -> str:
@@ -134,6 +264,7 @@ class GoogleAuthService:
             "name": user_data.get("name"),
             "picture": user_data.get("picture"),
             "selected_collection_id": user_data.get("selected_collection_id"),
+            "iat": time.time(),  # Fractional, so a logout and a login within one second are told apart
             "exp": datetime.utcnow() + timedelta(hours=1)  # Token expires in 1 hour
         }
         
@@ -163,10 +294,11 @@ class GoogleAuthService:
             payload = jwt.decode(token, self.jwt_secret, algorithms=["HS256"])
             return payload
         except jwt.ExpiredSignatureError:
-            logger.error("JWT token has expired")
+            # Routine for clients holding an old token; the route answers 401
+            logger.debug("JWT token has expired")
             return None
         except jwt.InvalidTokenError:
-            logger.error("Invalid JWT token")
+            logger.debug("Invalid JWT token")
             return None
 
     def verify_jwt_refresh_token(self, refresh_token: str) -> Optional[Dict[str, Any]]:
@@ -191,7 +323,7 @@ class GoogleAuthService:
         Refresh access token using refresh token
         """
         try:
-            token_url = "https://oauth2.googleapis.com/token"
+            token_url = settings.GOOGLE_TOKEN_URL
             
             data = {
                 "client_id": self.client_id,
@@ -200,13 +332,12 @@ class GoogleAuthService:
                 "grant_type": "refresh_token"
             }
             
-            async with httpx.AsyncClient() as client:
-                response = await client.post(token_url, data=data)
-                response.raise_for_status()
-                return response.json()
+            response = await self.http_client.post(token_url, data=data)
+            response.raise_for_status()
+            return response.json()
                 
         except Exception as e:
-            logger.error(f"Error refreshing token: {str(e)}")
+            logger.error("Error refreshing token: %s", e)
             raise Exception("Failed to refresh access token")
 
 # Global instance
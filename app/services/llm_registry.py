@@ -0,0 +1,81 @@
+"""
+Registry of LLM provider clients
+
+Provider modules pull in large SDKs (google.generativeai, openai, anthropic),
+so none of them is imported until a request asks for that provider; the
+client is then built once and reused. Providers are enabled with
+LLM_PROVIDERS, and one whose API key is missing only fails the requests that
+ask for it, not the app's startup.
+"""
+import importlib
+from typing import Dict, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.base_client import BaseLLMClient
+from app.utils.logging_conf import get_logger
+
+logger = get_logger("llm_registry")
+
+# provider -> (module, class, settings attribute holding its API key)
+PROVIDERS: Dict[str, Tuple[str, str, Optional[str]]] = {
+    "gemini": ("app.services.gemini_client", "GeminiClient", "GEMINI_API_KEY"),
+    "openai": ("app.services.openai_client", "OpenAIClient", "OPENAI_API_KEY"),
+    "claude": ("app.services.claude_client", "ClaudeClient", "CLAUDE_API_KEY"),
+    "fake": ("app.services.fake_client", "FakeLLMClient", None),
+}
+
+class UnknownProviderError(ValueError):
+    """The provider is not enabled (or does not exist)"""
+
+class ProviderUnavailableError(RuntimeError):
+    """The provider is enabled but cannot be used (e.g. its API key is missing)"""
+
+class LLMProviderRegistry:
+    """Builds provider clients on first use and keeps them for the life of the process"""
+
+    def __init__(self, enabled: List[str]):
+        self.enabled = [name for name in enabled if name in PROVIDERS]
+        self._clients: Dict[str, BaseLLMClient] = {}
+
+    def get(self, name: str) -> BaseLLMClient:
+        """Client for a provider, importing and building it on first use"""
+        client = self._clients.get(name)
+        if client is not None:
+            return client
+
+        if name not in self.enabled:
+            raise UnknownProviderError(f"Provider must be one of: {', '.join(self.enabled)}")
+
+        module_name, class_name, key_setting = PROVIDERS[name]
+        if key_setting and not getattr(settings, key_setting, None):
+            raise ProviderUnavailableError(f"Provider '{name}' is not configured: {key_setting} is not set")
+
+        try:
+            client_class = getattr(importlib.import_module(module_name), class_name)
+            client = client_class()
+        except Exception as e:
+            logger.exception("Could not initialize LLM provider '%s'", name)
+            raise ProviderUnavailableError(f"Provider '{name}' could not be initialized: {e}")
+
+        self._clients[name] = client
+        return client
+
+    def register(self, name: str, client: BaseLLMClient):
+        """Use a ready-made client for a provider (tests, load tests)"""
+        if name not in self.enabled:
+            self.enabled.append(name)
+        self._clients[name] = client
+
+    def loaded(self) -> List[str]:
+        """Providers whose client has been built"""
+        return list(self._clients)
+
+    async def aclose(self):
+        """Close every client that was built (called on application shutdown)"""
+        for client in self._clients.values():
+            await client.aclose()
+        self._clients.clear()
+
+llm_registry = LLMProviderRegistry(
+    [name.strip().lower() for name in settings.LLM_PROVIDERS.split(",") if name.strip()]
+)
@@ -1,22 +1,20 @@
-import os
-from dotenv import load_dotenv
 import openai
 
-load_dotenv()
-api_key = os.getenv("OPENAI_API_KEY")
-if not api_key:
-    raise ValueError("Bạn chưa đặt OPENAI_API_KEY trong .env")
+from app.core.config import settings
+from app.services.base_client import BaseLLMClient
 
-openai.api_key = api_key
+class OpenAIClient(BaseLLMClient):
+    provider = "openai"
 
-class OpenAIClient:
     def __init__(self, model_name: str = "gpt-3.5-turbo"):
-        self.model_name = model_name
-        self.client = openai.OpenAI(api_key=api_key)
+        if not settings.OPENAI_API_KEY:
+            raise ValueError("Bạn chưa đặt OPENAI_API_KEY trong .env")
+        super().__init__(model_name)
+        self.client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
 
-    async def generate_text(self, prompt: str, max_output_tokens: int = 256) -> str:
+    async def _generate(self, prompt: str, max_output_tokens: int) -> str:
         try:
-            response = self.client.chat.completions.create(
+            response = await self.client.chat.completions.create(
                 model=self.model_name,
                 messages=[
                     {"role": "user", "content": prompt}
@@ -26,4 +24,24 @@ class OpenAIClient:
             )
             return response.choices[0].message.content
         except Exception as e:
-            raise Exception(f"Error generating text with OpenAI: {str(e)}")
\ No newline at end of file
+            raise Exception(f"Error generating text with OpenAI: {str(e)}")
+
+    async def _stream(self, prompt: str, max_output_tokens: int):
+        try:
+            stream = await self.client.chat.completions.create(
+                model=self.model_name,
+                messages=[
+                    {"role": "user", "content": prompt}
+                ],
+                max_tokens=max_output_tokens,
+                temperature=0.7,
+                stream=True
+            )
+            async for chunk in stream:
+                if chunk.choices and chunk.choices[0].delta.content:
+                    yield chunk.choices[0].delta.content
+        except Exception as e:
+            raise Exception(f"Error streaming text with OpenAI: {str(e)}")
+
+    async def aclose(self):
+        await self.client.close()
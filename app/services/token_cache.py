@@ -0,0 +1,196 @@
+"""
+Cache of verified access-token claims, and access-token revocation
+
+get_current_user runs on every authenticated request; chatty clients send
+the same token hundreds of times a minute. Verified claims are kept in a
+bounded LRU keyed by a SHA-256 digest of the token (the token itself is never
+stored). Each entry expires at the token's `exp`; revoke_token / revoke_user
+evict entries early. Eviction only frees the cache, it does not reject the
+token: a token that is still valid verifies again on the next request.
+
+Revocation is done by TokenRevocations: logout stores a per-user cutoff on the
+user document (`tokens_revoked_before`), and get_current_user rejects tokens
+whose `iat` is before the cutoff. The worker handling the logout applies it at
+once; the others load recent cutoffs from MongoDB every
+TOKEN_REVOCATION_SYNC_SECONDS.
+"""
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Optional, Set
+
+from app.core.config import settings
+from app.database.crud import get_user_crud
+from app.utils.logging_conf import get_logger
+
+logger = get_logger("token_cache")
+
+# Lifetime of an access token (see GoogleAuthService.create_jwt_token); a cutoff
+# older than this can no longer match a token that passes the exp check
+ACCESS_TOKEN_LIFETIME = timedelta(hours=1)
+
+class VerifiedTokenCache:
+    """Bounded LRU of verified JWT claims with expiry at each token's exp"""
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._digests_by_user: Dict[str, Set[str]] = {}
+
+    @staticmethod
+    def token_digest(token: str) -> str:
+        return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+    def get(self, token: str) -> Optional[Dict[str, Any]]:
+        """Cached claims of a token, or None if unknown or expired"""
+        digest = self.token_digest(token)
+        entry = self._entries.get(digest)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        claims, expires_at = entry
+        if expires_at <= time.time():
+            self._remove(digest)
+            self.misses += 1
+            return None
+
+        # Mark as most recently used
+        self._entries.move_to_end(digest)
+        self.hits += 1
+        return claims
+
+    def put(self, token: str, claims: Dict[str, Any]):
+        """Cache the claims of a verified token until its exp (tokens without exp are not cached)"""
+        expires_at = claims.get("exp")
+        if not isinstance(expires_at, (int, float)) or expires_at <= time.time():
+            return
+
+        digest = self.token_digest(token)
+        self._entries[digest] = (claims, expires_at)
+        self._entries.move_to_end(digest)
+        user_id = claims.get("user_id") or claims.get("id")
+        if user_id:
+            self._digests_by_user.setdefault(str(user_id), set()).add(digest)
+
+        while len(self._entries) > self.max_entries:
+            oldest_digest = next(iter(self._entries))
+            self._remove(oldest_digest)
+            self.evictions += 1
+
+    def revoke_token(self, token: str):
+        """Evict one token"""
+        self._remove(self.token_digest(token))
+
+    def revoke_user(self, user_id: str) -> int:
+        """Evict every cached token of a user; returns how many were evicted (see TokenRevocations to reject them)"""
+        digests = self._digests_by_user.pop(str(user_id), set())
+        for digest in digests:
+            self._entries.pop(digest, None)
+        return len(digests)
+
+    def clear(self):
+        self._entries.clear()
+        self._digests_by_user.clear()
+
+    def _remove(self, digest: str):
+        entry = self._entries.pop(digest, None)
+        if entry is None:
+            return
+        user_id = entry[0].get("user_id") or entry[0].get("id")
+        digests = self._digests_by_user.get(str(user_id))
+        if digests is not None:
+            digests.discard(digest)
+            if not digests:
+                del self._digests_by_user[str(user_id)]
+
+    def stats(self) -> Dict[str, object]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self._entries),
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+        }
+
+class TokenRevocations:
+    """Per-user cutoffs: access tokens issued before a user's cutoff are rejected"""
+
+    def __init__(self):
+        self._revoked_before: Dict[str, float] = {}
+
+    def revoke_user(self, user_id: str, revoked_before: float):
+        """Reject the user's tokens issued before `revoked_before` (a Unix timestamp)"""
+        user_id = str(user_id)
+        self._revoked_before[user_id] = max(revoked_before, self._revoked_before.get(user_id, 0.0))
+
+    def is_revoked(self, claims: Dict[str, Any]) -> bool:
+        user_id = claims.get("user_id") or claims.get("id")
+        revoked_before = self._revoked_before.get(str(user_id))
+        if revoked_before is None:
+            return False
+        # Tokens issued before iat was added to the claims are treated as old
+        issued_at = claims.get("iat")
+        return not isinstance(issued_at, (int, float)) or issued_at < revoked_before
+
+    def prune(self):
+        """Forget cutoffs older than any token that could still be valid"""
+        oldest = time.time() - ACCESS_TOKEN_LIFETIME.total_seconds()
+        for user_id in [user_id for user_id, cutoff in self._revoked_before.items() if cutoff < oldest]:
+            del self._revoked_before[user_id]
+
+    def clear(self):
+        self._revoked_before.clear()
+
+    def __len__(self) -> int:
+        return len(self._revoked_before)
+
+verified_token_cache = VerifiedTokenCache(max_entries=settings.TOKEN_CACHE_MAX_ENTRIES)
+token_revocations = TokenRevocations()
+
+_sync_task: Optional[asyncio.Task] = None
+
+async def revoke_user_tokens(user_id: str) -> datetime:
+    """Revoke every access token issued to a user so far, in all workers; returns the cutoff"""
+    revoked_before = datetime.utcnow()
+    await get_user_crud().set_tokens_revoked_before(user_id, revoked_before)
+    token_revocations.revoke_user(user_id, revoked_before.replace(tzinfo=timezone.utc).timestamp())
+    verified_token_cache.revoke_user(user_id)
+    return revoked_before
+
+async def sync_token_revocations() -> int:
+    """Load the cutoffs other workers stored; returns how many are active"""
+    cutoffs = await get_user_crud().get_tokens_revoked_since(datetime.utcnow() - ACCESS_TOKEN_LIFETIME)
+    for user_id, revoked_before in cutoffs.items():
+        token_revocations.revoke_user(user_id, revoked_before.replace(tzinfo=timezone.utc).timestamp())
+        verified_token_cache.revoke_user(user_id)
+    token_revocations.prune()
+    return len(token_revocations)
+
+async def _sync_token_revocations(interval: float):
+    while True:
+        try:
+            await sync_token_revocations()
+        except Exception as e:
+            logger.warning("Could not sync token revocations: %s", e)
+        await asyncio.sleep(interval)
+
+def start_revocation_sync(interval: float = settings.TOKEN_REVOCATION_SYNC_SECONDS) -> asyncio.Task:
+    """Sync revocations now and then every `interval` seconds, until stop_revocation_sync()"""
+    global _sync_task
+    if _sync_task is None or _sync_task.done():
+        _sync_task = asyncio.create_task(_sync_token_revocations(interval))
+    return _sync_task
+
+async def stop_revocation_sync():
+    global _sync_task
+    if _sync_task is not None:
+        _sync_task.cancel()
+        await asyncio.gather(_sync_task, return_exceptions=True)
+        _sync_task = None
@@ -1,13 +1,193 @@
+"""
+Logging pipeline: one QueueHandler on the root logger, one listener thread
+
+Request handlers only put records on a bounded queue; formatting (JSON or
+text) and writing to the stream happen on a QueueListener thread, so a slow
+stdout or log shipper never stalls the event loop. When the queue is full,
+records are dropped instead of blocking; with METRICS_ENABLED the drops are
+counted in the log_records_dropped_total metric.
+
+Noisy INFO logs of the route modules can be sampled per route: LOG_SAMPLE_RATES
+maps route names (the handler function name) to the fraction of the INFO/DEBUG
+records to keep while that route serves a request ("*" for all other routes),
+e.g. "*=0.1,google_login=1". The route is bound by the bind_log_route
+dependency, so logs of helpers called by a route are sampled with it. Warnings
+and errors are never sampled.
+
+Use %-style arguments (`logger.info("Saved %s", item_id)`) rather than
+f-strings so a record below the configured level costs no formatting.
+"""
+import atexit
+import contextvars
+import copy
+import json
 import logging
+import os
+import queue
+import random
+import sys
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Callable, Dict, Optional, TextIO
+
+from starlette.requests import Request
+
+from app.core.config import settings
+
+# Loggers whose INFO records are subject to LOG_SAMPLE_RATES
+SAMPLED_LOGGERS = frozenset({"routes", "database_routes"})
+
+# Name of the route serving the current request, set by bind_log_route
+current_route: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_route", default=None)
+
+# Attributes every LogRecord has; anything else was passed with extra=
+_RECORD_ATTRIBUTES = frozenset(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line, with any extra= fields of the record"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+            "func": record.funcName,
+            "pid": record.process,
+        }
+        for key, value in record.__dict__.items():
+            if key not in _RECORD_ATTRIBUTES and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class RouteSampler(logging.Filter):
+    """Keep a fraction of the INFO/DEBUG records logged while each route serves a request"""
+
+    def __init__(self, rates: Dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.default_rate = rates.get("*", 1.0)
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO or record.name not in SAMPLED_LOGGERS:
+            return True
+        rate = self.rates.get(current_route.get(), self.default_rate)
+        return rate >= 1.0 or random.random() < rate
+
+class DroppingQueueHandler(QueueHandler):
+    """QueueHandler that drops records when the queue is full instead of blocking"""
+
+    dropped = 0
+    # Called for every dropped record (app.main points it at the Prometheus counter)
+    on_drop: Optional[Callable[[], None]] = None
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Merge the arguments now (they may change after the call returns) but leave
+        # exc_info to the listener, so the traceback is formatted off the event loop
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            DroppingQueueHandler.dropped += 1
+            if DroppingQueueHandler.on_drop is not None:
+                DroppingQueueHandler.on_drop()
+
+async def bind_log_route(request: Request):
+    """FastAPI dependency: make the matched route the sampling key of the request's logs"""
+    route = request.scope.get("route")
+    token = current_route.set(getattr(route, "name", None))
+    try:
+        yield
+    finally:
+        current_route.reset(token)
+
+def parse_sample_rates(value: str) -> Dict[str, float]:
+    """Parse LOG_SAMPLE_RATES: "*=0.1,google_login=1" -> {"*": 0.1, "google_login": 1.0}"""
+    rates = {}
+    for item in value.split(","):
+        name, _, rate = item.partition("=")
+        if name.strip() and rate.strip():
+            rates[name.strip()] = min(1.0, max(0.0, float(rate)))
+    return rates
+
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[DroppingQueueHandler] = None
+
+def configure_logging(stream: Optional[TextIO] = None, force: bool = False):
+    """
+    Route all logging through the queue (idempotent; called on import of app.main)
+
+    uvicorn's own loggers are made to propagate to the root logger so access
+    and server logs go through the same queue and format.
+    """
+    global _listener, _queue_handler
+    if _listener is not None and not force:
+        return
+    shutdown_logging()
+
+    handler = logging.StreamHandler(stream or sys.stderr)
+    if settings.LOG_FORMAT == "json":
+        handler.setFormatter(JsonFormatter())
+    else:
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+
+    log_queue = queue.Queue(maxsize=settings.LOG_QUEUE_SIZE)
+    _queue_handler = DroppingQueueHandler(log_queue)
+    rates = parse_sample_rates(settings.LOG_SAMPLE_RATES)
+    if rates:
+        _queue_handler.addFilter(RouteSampler(rates))
+
+    root = logging.getLogger()
+    for existing in list(root.handlers):
+        root.removeHandler(existing)
+    root.addHandler(_queue_handler)
+    root.setLevel(settings.LOG_LEVEL.upper())
+
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        uvicorn_logger = logging.getLogger(name)
+        uvicorn_logger.handlers.clear()
+        uvicorn_logger.propagate = True
+
+    _listener = QueueListener(log_queue, handler, respect_handler_level=True)
+    _listener.start()
+
+def shutdown_logging():
+    """Flush queued records and stop the listener thread"""
+    global _listener, _queue_handler
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+
+def _restart_in_child():
+    """
+    The listener thread does not survive a fork; give the child its own
+    
+    Only matters for servers that fork after importing the app (e.g. gunicorn
+    with --preload); uvicorn's workers are spawned and configure logging on import.
+    """
+    global _listener
+    if _listener is not None:
+        _listener = None
+        configure_logging(force=True)
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_restart_in_child)
+
+atexit.register(shutdown_logging)
 
 def get_logger(name: str) -> logging.Logger:
-    logger = logging.getLogger(name)
-    if not logger.handlers:
-        handler = logging.StreamHandler()
-        formatter = logging.Formatter(
-            "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
-        )
-        handler.setFormatter(formatter)
-        logger.addHandler(handler)
-        logger.setLevel(logging.INFO)
-    return logger
+    """Logger that writes through the queue; handlers live on the root logger only"""
+    configure_logging()
+    return logging.getLogger(name)
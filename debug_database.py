@@ -71,7 +71,7 @@ async def test_database_operations():
                     paragraph=test_paragraph
                 )
                 
-                saved_paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data)
+                saved_paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data, str(input_history.user_id))
                 print(f"   ✅ SavedParagraph created with ID: {saved_paragraph.id}")
                 
                 return True
@@ -0,0 +1,129 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the Google code exchange of /auth/google/login: a fresh
+httpx client per call with the redirect-URI retry loop vs the pooled client
+with the redirect URI learned per origin
+
+Serves a fake token endpoint and userinfo endpoint on localhost. Like
+Google, the token endpoint answers redirect_uri_mismatch unless the
+redirect_uri is the one the code was issued for ("postmessage", popup mode,
+third in the old retry order). Reports p50 / p95 / p99 latency of the
+exchange (token + userinfo) at the given concurrency. The fake endpoint is
+plain HTTP, so the TLS handshake a fresh client pays against Google is not
+included; --latency-ms adds per-request server delay.
+
+Usage:
+    python scripts/benchmark_google_login.py [--requests 500] [--concurrency 20] [--latency-ms 0]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+from urllib.parse import parse_qs
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.services.google_auth import KNOWN_REDIRECT_URIS, google_auth_service
+
+ISSUED_FOR = "postmessage"
+ORIGIN = "http://localhost:3000"
+
+def fake_google(latency: float) -> FastAPI:
+    fake = FastAPI()
+
+    @fake.post("/token")
+    async def token(request: Request):
+        form = parse_qs((await request.body()).decode())
+        await asyncio.sleep(latency)
+        if form.get("redirect_uri") != [ISSUED_FOR]:
+            return JSONResponse({"error": "redirect_uri_mismatch"}, status_code=400)
+        return {"access_token": f"access-{form['code'][0]}", "expires_in": 3600, "id_token": "x"}
+
+    @fake.get("/userinfo")
+    async def userinfo():
+        await asyncio.sleep(latency)
+        return {"id": "1234567890", "email": "user@example.com", "name": "User", "verified_email": True}
+
+    return fake
+
+async def exchange_fresh_client(code: str):
+    """The previous login path: every redirect URI in turn, each with its own client"""
+    for redirect_uri in KNOWN_REDIRECT_URIS:
+        async with httpx.AsyncClient() as client:
+            response = await client.post(settings.GOOGLE_TOKEN_URL, data={
+                "code": code, "grant_type": "authorization_code", "redirect_uri": redirect_uri
+            })
+        if response.status_code != 200:
+            continue
+        async with httpx.AsyncClient() as client:
+            access_token = response.json()["access_token"]
+            await client.get(settings.GOOGLE_USERINFO_URL, headers={"Authorization": f"Bearer {access_token}"})
+        return
+    raise RuntimeError("no redirect_uri accepted")
+
+async def exchange_pooled(code: str):
+    await google_auth_service.exchange_code(code, origin=ORIGIN)
+
+async def measure(exchange, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies = []
+
+    async def one(i: int):
+        async with semaphore:
+            start = time.perf_counter()
+            await exchange(f"code{i}")
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    percentile = lambda p: latencies[min(len(latencies) - 1, int(len(latencies) * p))]
+    return statistics.median(latencies), percentile(0.95), percentile(0.99), requests / elapsed
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=0)
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+
+    # Per-exchange info logs would dominate the timings
+    logging.getLogger("google_auth").setLevel(logging.WARNING)
+
+    server = uvicorn.Server(uvicorn.Config(
+        fake_google(args.latency_ms / 1000), host="127.0.0.1", port=args.port, log_level="warning"
+    ))
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    settings.GOOGLE_TOKEN_URL = f"{base_url}/token"
+    settings.GOOGLE_USERINFO_URL = f"{base_url}/userinfo"
+
+    try:
+        print(f"📊 Google code exchange, {args.requests} logins at concurrency {args.concurrency}\n")
+        print(f"{'mode':>22} | {'p50 ms':>7} | {'p95 ms':>7} | {'p99 ms':>7} | {'logins/s':>8}")
+        print("-" * 66)
+        for label, exchange in (("fresh client + retry", exchange_fresh_client), ("pooled + learned URI", exchange_pooled)):
+            p50, p95, p99, throughput = await measure(exchange, args.requests, args.concurrency)
+            print(f"{label:>22} | {p50:>7.2f} | {p95:>7.2f} | {p99:>7.2f} | {throughput:>8.0f}")
+    finally:
+        await google_auth_service.aclose()
+        server.should_exit = True
+        await server_task
+
+if __name__ == "__main__":
+    asyncio.run(main())
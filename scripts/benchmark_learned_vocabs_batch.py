@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Benchmark for adding learned vocabularies: per-word loop vs batched upsert
+
+Runs both code paths of POST /learned-vocabs against a throwaway database
+on MONGODB_URL and reports wall time and the number of database commands
+(round trips) for batches of 1, 50 and 500 words. Half of each batch is
+already in the collection, so both the increment and the insert paths run.
+
+Usage:
+    python scripts/benchmark_learned_vocabs_batch.py [--sizes 1 50 500] [--repeat 3]
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import time
+from datetime import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.database import connection
+from app.database.crud import get_learned_vocabs_crud
+from app.database.models import LearnedVocabsCreateInternal
+
+class CommandCounter(monitoring.CommandListener):
+    """Counts commands sent to the server"""
+
+    def __init__(self):
+        self.count = 0
+
+    def started(self, event):
+        self.count += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+async def add_per_word(crud, collection_id: str, words):
+    """The previous route logic: one lookup plus one write (and re-read) per word"""
+    for word in words:
+        existing = await crud.find_by_exact_vocab(collection_id, word)
+        if existing:
+            await crud.increment_usage_count(str(existing.id))
+        else:
+            await crud.create_learned_vocabs(LearnedVocabsCreateInternal(vocab=word, collection_id=collection_id))
+
+async def add_batched(crud, collection_id: str, words):
+    await crud.upsert_vocabs_batch(collection_id, words)
+
+async def seed_collection(db, words) -> str:
+    """Create a collection that already contains every other word"""
+    collection_id = ObjectId()
+    now = datetime.utcnow()
+    seeded = [
+        {"vocab": word, "vocab_norm": word.lower(), "collection_id": collection_id, "usage_count": 1,
+         "created_at": now, "updated_at": now, "is_deleted": False, "deleted_at": None}
+        for word in words[::2]
+    ]
+    if seeded:
+        await db.learned_vocabs.insert_many(seeded)
+    return str(collection_id)
+
+async def measure(db, counter, crud, add, size: int, repeat: int):
+    times, commands = [], []
+    for run in range(repeat):
+        words = [f"word{run}x{i}" for i in range(size)]
+        collection_id = await seed_collection(db, words)
+
+        counter.count = 0
+        start = time.perf_counter()
+        await add(crud, collection_id, words)
+        times.append(time.perf_counter() - start)
+        commands.append(counter.count)
+    return statistics.median(times), statistics.median(commands)
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 50, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[counter])
+    db_name = f"benchmark_learned_vocabs_{os.getpid()}"
+    connection.mongodb.client = client
+    connection.mongodb.database = client[db_name]
+    db = connection.mongodb.database
+    crud = get_learned_vocabs_crud()
+
+    try:
+        print(f"📊 POST /learned-vocabs write path ({args.repeat} runs each, median)\n")
+        print(f"{'words':>6} | {'per-word ms':>11} | {'per-word cmds':>13} | {'batched ms':>10} | {'batched cmds':>12} | {'speedup':>7}")
+        print("-" * 76)
+        for size in args.sizes:
+            loop_time, loop_cmds = await measure(db, counter, crud, add_per_word, size, args.repeat)
+            batch_time, batch_cmds = await measure(db, counter, crud, add_batched, size, args.repeat)
+            speedup = loop_time / batch_time if batch_time else float("inf")
+            print(f"{size:>6} | {loop_time * 1000:>11.1f} | {loop_cmds:>13.0f} | "
+                  f"{batch_time * 1000:>10.1f} | {batch_cmds:>12.0f} | {speedup:>6.1f}x")
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+Benchmark for per-request logging overhead: the previous logging vs the
+queue-based pipeline
+
+Replays the log calls one Google login request makes, --requests times, and
+measures the time they cost the calling thread (the event loop in the
+server):
+- legacy:   the previous setup - a StreamHandler on each named logger, eager
+            f-string messages at INFO (client id, request data, per-step
+            emoji lines) and a debug print()
+- queue:    app.utils.logging_conf - %-style arguments, per-step lines at
+            DEBUG (filtered out before any formatting), JSON formatting and
+            writing on the listener thread
+- sampled:  queue with LOG_SAMPLE_RATES="*=<--sample-rate>"
+
+Output goes to a sink that takes --sink-delay-ms per write, standing in for
+a stdout pipe to a log collector that is slower than the app. Reports mean
+and p99 µs per request on the calling thread, and how long the listener
+needed afterwards to drain its queue.
+
+Usage:
+    python scripts/benchmark_logging.py [--requests 5000] [--sink-delay-ms 0.05] [--sample-rate 0.1]
+"""
+import argparse
+import io
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.utils import logging_conf
+
+CODE = "4/0AfJohXl" + "x" * 60
+CLIENT_ID = "1234567890-abcdefghijklmnop.apps.googleusercontent.com"
+REDIRECT_URI = "http://localhost:5173"
+EMAIL = "learner@example.com"
+USER_ID = "665f1f77bcf86cd799439011"
+
+class SlowSink(io.TextIOBase):
+    """Text stream that spends `delay` seconds on every write"""
+
+    def __init__(self, delay: float):
+        self.delay = delay
+        self.writes = 0
+
+    def write(self, text: str) -> int:
+        self.writes += 1
+        if self.delay:
+            time.sleep(self.delay)
+        return len(text)
+
+def legacy_loggers(sink):
+    """Named loggers with their own synchronous StreamHandler, like the previous get_logger"""
+    loggers = []
+    for name in ("legacy.routes", "legacy.google_auth"):
+        logger = logging.getLogger(name)
+        logger.handlers.clear()
+        handler = logging.StreamHandler(sink)
+        handler.setFormatter(logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s"))
+        logger.addHandler(handler)
+        logger.setLevel(logging.INFO)
+        logger.propagate = False
+        loggers.append(logger)
+    return loggers
+
+def legacy_google_login(routes, google, sink):
+    """Log calls of one login before this change"""
+    routes.info(f"🔄 Starting Google login with code: {CODE[:20]}...")
+    google.info(f"Using client_id: {CLIENT_ID[:20]}...")
+    google.info(f"Using redirect_uri: {REDIRECT_URI}")
+    data = {"client_id": CLIENT_ID, "client_secret": "secret", "code": CODE,
+            "grant_type": "authorization_code", "redirect_uri": REDIRECT_URI}
+    debug_data = {k: v for k, v in data.items() if k != "client_secret"}
+    debug_data["client_secret"] = "***"
+    google.info(f"Token exchange request data: {debug_data}")
+    google.info(f"Google response status: {200}")
+    routes.info(f"🔄 Updated existing Google user: {EMAIL}")
+    print(f"🔍 DEBUG: Checking for duplicate vocabs {['apple', 'banana']} for user {USER_ID}", file=sink)
+    routes.info(f"💾 Saved JWT refresh token for user: {EMAIL}")
+    routes.info(f"✅ User {EMAIL} logged in successfully")
+
+def google_login(routes, google):
+    """Log calls of one login now (run with the google_login route bound, see run_queue)"""
+    routes.debug("Starting Google login for origin %s", REDIRECT_URI)
+    google.debug("Exchanging authorization code with redirect_uri %s", REDIRECT_URI)
+    if google.isEnabledFor(logging.DEBUG):
+        google.debug("Token exchange request data: %s", {"client_id": CLIENT_ID, "redirect_uri": REDIRECT_URI})
+    google.debug("Google token endpoint answered %s", 200)
+    routes.debug("%s Google user %s", "Updated", USER_ID)
+    routes.debug("Checking for duplicate vocabs %s for user %s", ["apple", "banana"], USER_ID)
+    routes.info("User %s logged in with Google (new user: %s)", USER_ID, False)
+
+def measure(run_request, requests: int):
+    """Per-request µs on the calling thread"""
+    timings = []
+    for _ in range(requests):
+        start = time.perf_counter()
+        run_request()
+        timings.append((time.perf_counter() - start) * 1_000_000)
+    timings.sort()
+    return statistics.mean(timings), timings[min(len(timings) - 1, int(len(timings) * 0.99))]
+
+def run_queue(sink, requests: int, sample_rates: str):
+    settings.LOG_FORMAT = "json"
+    settings.LOG_LEVEL = "INFO"
+    settings.LOG_SAMPLE_RATES = sample_rates
+    logging_conf.configure_logging(stream=sink, force=True)
+    routes = logging.getLogger("routes")
+    google = logging.getLogger("google_auth")
+    # What bind_log_route does for a request to the route
+    logging_conf.current_route.set("google_login")
+    mean, p99 = measure(lambda: google_login(routes, google), requests)
+    start = time.perf_counter()
+    logging_conf.shutdown_logging()
+    return mean, p99, (time.perf_counter() - start) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--sink-delay-ms", type=float, default=0.05)
+    parser.add_argument("--sample-rate", type=float, default=0.1)
+    args = parser.parse_args()
+    delay = args.sink_delay_ms / 1000
+
+    print(f"📊 {args.requests} Google login requests, sink {args.sink_delay_ms} ms per write\n")
+    print(f"{'mode':>8} | {'µs/request':>10} | {'p99 µs':>8} | {'sink writes':>11} | {'drain ms':>8}")
+    print("-" * 58)
+
+    sink = SlowSink(delay)
+    routes, google = legacy_loggers(sink)
+    mean, p99 = measure(lambda: legacy_google_login(routes, google, sink), args.requests)
+    print(f"{'legacy':>8} | {mean:>10.1f} | {p99:>8.1f} | {sink.writes:>11} | {'-':>8}")
+
+    for label, rates in (("queue", ""), ("sampled", f"*={args.sample_rate}")):
+        sink = SlowSink(delay)
+        mean, p99, drain = run_queue(sink, args.requests, rates)
+        print(f"{label:>8} | {mean:>10.1f} | {p99:>8.1f} | {sink.writes:>11} | {drain:>8.0f}")
+    print(f"\nDropped records (queue full at {settings.LOG_QUEUE_SIZE}): {logging_conf.DroppingQueueHandler.dropped}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Benchmark for worker startup: import time of app.main and time to first request
+
+1. Runs `python -X importtime -c "import app.main"` and reports the total
+   import time and the packages that take longest to import (time spent in
+   each package's own modules), so an SDK that sneaks back into the import
+   path shows up here.
+2. Starts a fresh interpreter that imports the app and serves one request
+   (GET /api/v1/test-data through the ASGI app, no network, no lifespan, so
+   no MongoDB needed) and reports the wall time from process start to the
+   response.
+
+Each measurement is a fresh process; the median of --repeat runs is shown.
+
+Usage:
+    python scripts/benchmark_startup.py [--repeat 5] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+FIRST_REQUEST = """
+import asyncio, time, httpx
+from app.main import app
+async def first_request():
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://startup") as client:
+        response = await client.get("/api/v1/test-data")
+        assert response.status_code == 200, response.status_code
+asyncio.run(first_request())
+print(time.time())
+"""
+
+def import_times():
+    """(total µs, {top-level package: µs spent in its own modules}) of importing app.main"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    packages = {}
+    total = 0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        own, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        package = name.split(".")[0]
+        packages[package] = packages.get(package, 0) + int(own)
+        if name == "app.main":
+            total = int(cumulative)
+    return total, packages
+
+def time_to_first_request() -> float:
+    """Seconds from process start to the first response"""
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, "-c", FIRST_REQUEST],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    )
+    return float(result.stdout.strip().splitlines()[-1]) - start
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args()
+
+    runs = [import_times() for _ in range(args.repeat)]
+    total_ms = statistics.median(total for total, _ in runs) / 1000
+    packages = {name: statistics.median(run[1].get(name, 0) for run in runs) / 1000 for name in runs[0][1]}
+
+    print(f"📊 import app.main: {total_ms:.0f} ms (median of {args.repeat})\n")
+    print(f"{'package':>24} | {'import ms':>9}")
+    print("-" * 36)
+    for name, ms in sorted(packages.items(), key=lambda item: item[1], reverse=True)[:args.top]:
+        print(f"{name:>24} | {ms:>9.1f}")
+
+    loaded = subprocess.run(
+        [sys.executable, "-c", "import sys, app.main; print(' '.join(m for m in "
+         "('google.generativeai', 'openai', 'anthropic', 'google.auth') if m in sys.modules))"],
+        cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+    ).stdout.strip()
+    print(f"\nProvider SDKs imported at startup: {loaded or 'none'}")
+
+    first_request = statistics.median(time_to_first_request() for _ in range(args.repeat))
+    print(f"Time to first request (process start -> GET /api/v1/test-data): {first_request * 1000:.0f} ms")
+
+if __name__ == "__main__":
+    main()
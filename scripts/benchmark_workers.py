@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the multi-worker runtime: throughput from 1 to N workers
+
+For each worker count, starts `python -m app.server` with WEB_CONCURRENCY set
+to it against a throwaway database on a local mongod, seeds one user, and
+drives GET /api/v1/db/users/{id} (one indexed find_one per request) from
+--clients load-generator processes for --seconds. Reports requests/s and
+p50 / p99 latency per worker count, then drops the database.
+
+Load generators run in their own processes so they do not compete with the
+server for one event loop; on a machine with few cores, keep in mind that
+they still compete for CPU.
+
+Usage:
+    python scripts/benchmark_workers.py [--max-workers 4] [--clients 4]
+        [--concurrency 32] [--seconds 10] [--mongodb-url mongodb://localhost:27017]
+"""
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import subprocess
+import sys
+import time
+import uuid
+from datetime import datetime
+
+import httpx
+from pymongo import MongoClient
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Add the project root to the Python path
+sys.path.append(PROJECT_ROOT)
+
+from app.server import available_cpus
+
+def seed_user(mongodb_url: str, database: str) -> str:
+    client = MongoClient(mongodb_url)
+    try:
+        result = client[database].users.insert_one({
+            "name": "Benchmark User",
+            "email": f"benchmark-{uuid.uuid4().hex[:8]}@example.com",
+            "password": "!unusable",
+            "auth_type": "local",
+            "selected_collection_id": None,
+            "created_at": datetime.utcnow(),
+        })
+        return str(result.inserted_id)
+    finally:
+        client.close()
+
+def drop_database(mongodb_url: str, database: str):
+    client = MongoClient(mongodb_url)
+    try:
+        client.drop_database(database)
+    finally:
+        client.close()
+
+def start_server(workers: int, port: int, mongodb_url: str, database: str) -> subprocess.Popen:
+    env = dict(
+        os.environ,
+        WEB_CONCURRENCY=str(workers),
+        PORT=str(port),
+        HOST="127.0.0.1",
+        MONGODB_URL=mongodb_url,
+        MONGODB_DATABASE=database,
+        AUTO_SYNC_SCHEMA="false",
+    )
+    return subprocess.Popen(
+        [sys.executable, "-m", "app.server"],
+        cwd=PROJECT_ROOT, env=env,
+        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+
+def wait_until_ready(base_url: str, workers: int, timeout: float = 60.0):
+    """Wait until the server answers; give every worker time to finish its lifespan"""
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"{base_url}/api/v1/test-data", timeout=1.0).status_code == 200:
+                time.sleep(0.5 * workers)
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"Server with {workers} worker(s) did not start within {timeout:.0f}s")
+
+def stop_server(process: subprocess.Popen):
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+
+async def drive(url: str, concurrency: int, seconds: float):
+    """(latencies in ms, error count) of `concurrency` request loops for `seconds`"""
+    latencies = []
+    errors = 0
+    deadline = time.perf_counter() + seconds
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=10.0) as client:
+        async def loop():
+            nonlocal errors
+            while time.perf_counter() < deadline:
+                start = time.perf_counter()
+                try:
+                    response = await client.get(url)
+                    if response.status_code != 200:
+                        errors += 1
+                        continue
+                except httpx.HTTPError:
+                    errors += 1
+                    continue
+                latencies.append((time.perf_counter() - start) * 1000)
+
+        await asyncio.gather(*(loop() for _ in range(concurrency)))
+    return latencies, errors
+
+def load_generator(url: str, concurrency: int, seconds: float, results):
+    results.put(asyncio.run(drive(url, concurrency, seconds)))
+
+def measure(url: str, clients: int, concurrency: int, seconds: float):
+    results = multiprocessing.Queue()
+    processes = [
+        multiprocessing.Process(target=load_generator, args=(url, concurrency, seconds, results))
+        for _ in range(clients)
+    ]
+    for process in processes:
+        process.start()
+    collected = [results.get() for _ in processes]
+    for process in processes:
+        process.join()
+
+    latencies = sorted(latency for run, _ in collected for latency in run)
+    errors = sum(run_errors for _, run_errors in collected)
+    if not latencies:
+        return 0.0, 0.0, 0.0, errors
+    p99 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.99))]
+    return len(latencies) / seconds, statistics.median(latencies), p99, errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--max-workers", type=int, default=available_cpus())
+    parser.add_argument("--clients", type=int, default=max(1, available_cpus()))
+    parser.add_argument("--concurrency", type=int, default=32, help="in-flight requests per load generator")
+    parser.add_argument("--seconds", type=float, default=10.0)
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    args = parser.parse_args()
+
+    database = f"benchmark_workers_{uuid.uuid4().hex[:8]}"
+    base_url = f"http://127.0.0.1:{args.port}"
+    user_id = seed_user(args.mongodb_url, database)
+    url = f"{base_url}/api/v1/db/users/{user_id}"
+
+    print(f"📊 GET /api/v1/db/users/{{id}} for {args.seconds:.0f}s, {args.clients} load generator(s) x "
+          f"{args.concurrency} in flight, {available_cpus()} CPU(s) available\n")
+    print(f"{'workers':>7} | {'req/s':>9} | {'p50 ms':>8} | {'p99 ms':>8} | {'errors':>6} | {'scaling':>7}")
+    print("-" * 60)
+
+    baseline = None
+    try:
+        for workers in range(1, args.max_workers + 1):
+            server = start_server(workers, args.port, args.mongodb_url, database)
+            try:
+                wait_until_ready(base_url, workers)
+                throughput, p50, p99, errors = measure(url, args.clients, args.concurrency, args.seconds)
+            finally:
+                stop_server(server)
+            baseline = baseline or throughput
+            scaling = throughput / baseline if baseline else 0.0
+            print(f"{workers:>7} | {throughput:>9.0f} | {p50:>8.2f} | {p99:>8.2f} | {errors:>6} | {scaling:>6.2f}x")
+    finally:
+        drop_database(args.mongodb_url, database)
+        print(f"\n🧹 Dropped {database}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: duplicates blocking the streak / history_by_date unique indexes
+
+The find-then-insert code paths could write two documents for the same key
+under concurrent requests. This script:
+1. Merges duplicate streak documents per (user_id, learned_date): counts are added up,
+   is_qualify is recomputed (count >= 5), the oldest document is kept
+2. Merges duplicate history_by_date documents per (vocab_id, study_date): counts are
+   added up, the oldest document is kept
+3. Runs the schema sync so the unique indexes get built
+
+Safe to run multiple times.
+"""
+
+import asyncio
+import sys
+import os
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import connect_to_mongo, get_database, close_mongo_connection
+from app.database.migrations import auto_sync_schema, report_unsupported_query_patterns
+
+async def merge_duplicates(collection_name: str, key_fields, is_streak: bool = False):
+    """Merge documents sharing the same key; returns the number of removed documents"""
+    print(f"🔄 Merging duplicate {collection_name} documents...")
+
+    db = get_database()
+    collection = db[collection_name]
+
+    pipeline = [
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {field: f"${field}" for field in key_fields},
+            "ids": {"$push": "$_id"},
+            "total": {"$sum": {"$ifNull": ["$count", 1]}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+
+    merged_groups = 0
+    removed_documents = 0
+    async for group in collection.aggregate(pipeline, allowDiskUse=True):
+        keeper_id, duplicate_ids = group["ids"][0], group["ids"][1:]
+
+        update_fields = {"count": group["total"]}
+        if is_streak and group["total"] >= 5:
+            update_fields["is_qualify"] = True
+        await collection.update_one({"_id": keeper_id}, {"$set": update_fields})
+
+        result = await collection.delete_many({"_id": {"$in": duplicate_ids}})
+        removed_documents += result.deleted_count
+        merged_groups += 1
+
+    if merged_groups == 0:
+        print(f"✅ No duplicate {collection_name} documents found")
+    else:
+        print(f"✅ Merged {merged_groups} keys ({removed_documents} documents removed)")
+    return removed_documents
+
+async def main():
+    """Run the deduplication and rebuild indexes"""
+    print("🚀 Starting streak / history_by_date Deduplication")
+    print("="*60)
+
+    try:
+        print("🔄 Connecting to database...")
+        await connect_to_mongo()
+        print("✅ Database connected successfully")
+
+        # Step 1-2: Merge duplicates
+        await merge_duplicates("streak", ["user_id", "learned_date"], is_streak=True)
+        await merge_duplicates("history_by_date", ["vocab_id", "study_date"])
+
+        # Step 3: Build the unique indexes
+        print("🔄 Syncing indexes...")
+        db = get_database()
+        results = await auto_sync_schema(db, auto_create=False, update_indexes=True, update_validation=False)
+        unsupported = await report_unsupported_query_patterns(db)
+
+        if all(results.get(name, True) for name in ("streak", "history_by_date")):
+            print(f"\n✅ Deduplication completed successfully! ({len(unsupported)} route query patterns without an index)")
+            return 0
+        else:
+            print("\n❌ Index creation failed, check the logs.")
+            return 1
+
+    except Exception as e:
+        print(f"\n❌ Deduplication failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        print("🔄 Closing database connection...")
+        await close_mongo_connection()
+        print("✅ Database connection closed")
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
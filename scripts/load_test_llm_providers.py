@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Load test for the async LLM provider layer
+
+Fires concurrent /generate-paragraph requests at the app (in-process, via
+httpx's ASGI transport) while probing a cheap endpoint, using the local
+FakeLLMClient instead of a real provider. For each fake provider mode it
+reports the latency of the generations and of the probe requests that
+were served while generations were in flight.
+
+Usage:
+    python scripts/load_test_llm_providers.py [--concurrency 20] [--latency 0.5]
+"""
+import argparse
+import asyncio
+import logging
+import os
+import statistics
+import sys
+import time
+
+# Add the project root to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import httpx
+
+from app.main import app
+from app.api.v1 import routes
+from app.services.fake_client import FakeLLMClient
+from app.services.llm_registry import llm_registry
+
+PARAGRAPH_REQUEST = {
+    "language": "English",
+    "vocabularies": ["resilient", "meticulous", "abundant"],
+    "length": 50,
+    "level": "B2",
+    "tone": "friendly",
+    "topic": "travel"
+}
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+async def timed(coro):
+    start = time.perf_counter()
+    response = await coro
+    return time.perf_counter() - start, response
+
+async def run_scenario(mode: str, concurrency: int, latency: float, probes: int):
+    llm_registry.register("gemini", FakeLLMClient(latency=latency, mode=mode))
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://loadtest", timeout=None) as client:
+        async def generate():
+            return await timed(client.post("/api/v1/generate-paragraph", json=PARAGRAPH_REQUEST))
+
+        async def probe_loop():
+            # Probes follow a fixed schedule while the generations are in flight. Latency is
+            # measured from the scheduled send time, so time spent waiting for a frozen
+            # event loop counts against the probe.
+            samples = []
+            start = time.perf_counter()
+            for i in range(probes):
+                scheduled = start + latency * (i + 1) / (probes + 1)
+                await asyncio.sleep(max(0.0, scheduled - time.perf_counter()))
+                await client.get("/api/v1/test-data")
+                samples.append(time.perf_counter() - scheduled)
+            return samples
+
+        wall_start = time.perf_counter()
+        results = await asyncio.gather(probe_loop(), *[generate() for _ in range(concurrency)])
+        wall = time.perf_counter() - wall_start
+
+    probe_samples = results[0]
+    generate_samples = [elapsed for elapsed, response in results[1:] if response.status_code == 200]
+    failures = concurrency - len(generate_samples)
+
+    print(f"\nMode: {mode}")
+    print(f"  wall time:            {wall:.3f}s for {concurrency} generations")
+    print(f"  generate p50 / p95:   {statistics.median(generate_samples or [0]):.3f}s / {percentile(generate_samples, 95):.3f}s")
+    print(f"  probe    p50 / p95:   {statistics.median(probe_samples or [0]) * 1000:.1f}ms / {percentile(probe_samples, 95) * 1000:.1f}ms")
+    if failures:
+        print(f"  ❌ failed generations: {failures}")
+
+async def main():
+    parser = argparse.ArgumentParser(description="Concurrent-request latency against a fake LLM provider")
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency", type=float, default=0.5, help="Fake provider latency in seconds")
+    parser.add_argument("--probes", type=int, default=10, help="Probe requests sent while generating")
+    parser.add_argument("--modes", nargs="+", default=["inline", "executor", "async"],
+                        choices=["inline", "executor", "async"])
+    args = parser.parse_args()
+
+    logging.getLogger("httpx").setLevel(logging.WARNING)
+
+    # The load test exercises the provider layer only, not JWT verification
+    app.dependency_overrides[routes.get_current_user] = lambda: {"user_id": "000000000000000000000000"}
+
+    print("🚀 LLM provider load test")
+    print(f"   concurrency={args.concurrency} latency={args.latency}s probes={args.probes}")
+    print("   inline   = blocking SDK called on the event loop (previous behaviour)")
+    print("   executor = blocking SDK behind the bounded executor")
+    print("   async    = native async SDK")
+
+    for mode in args.modes:
+        await run_scenario(mode, args.concurrency, args.latency, args.probes)
+
+    app.dependency_overrides.clear()
+
+if __name__ == "__main__":
+    asyncio.run(main())
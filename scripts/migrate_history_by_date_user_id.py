@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: user_id for history_by_date
+
+This script:
+1. Backfills user_id on history_by_date documents from the owner of the vocab's
+   collection (learned_vocabs.collection_id -> vocab_collections.user_id)
+2. Creates the (user_id, study_date desc, _id desc) index used by /study-history
+
+Rows whose vocab or collection no longer exists are reported and left unchanged
+(/study-history drops them anyway).
+
+Safe to run multiple times.
+"""
+
+import asyncio
+import sys
+import os
+from pymongo import IndexModel, ASCENDING, DESCENDING, UpdateOne
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import connect_to_mongo, get_database, close_mongo_connection
+
+BATCH_SIZE = 1000
+
+async def backfill_batch(db, histories):
+    """Set user_id on one batch of history rows; returns (updated, orphaned)"""
+    vocab_ids = list({history["vocab_id"] for history in histories})
+    vocab_collections = {
+        vocab["_id"]: vocab["collection_id"]
+        async for vocab in db.learned_vocabs.find({"_id": {"$in": vocab_ids}}, {"collection_id": 1})
+        if vocab.get("collection_id")
+    }
+    collection_ids = list(set(vocab_collections.values()))
+    owners = {
+        collection["_id"]: collection["user_id"]
+        async for collection in db.vocab_collections.find({"_id": {"$in": collection_ids}}, {"user_id": 1})
+    }
+
+    operations = []
+    orphaned = 0
+    for history in histories:
+        owner = owners.get(vocab_collections.get(history["vocab_id"]))
+        if owner is None:
+            orphaned += 1
+            continue
+        operations.append(UpdateOne({"_id": history["_id"]}, {"$set": {"user_id": owner}}))
+
+    if not operations:
+        return 0, orphaned
+    result = await db.history_by_date.bulk_write(operations, ordered=False)
+    return result.modified_count, orphaned
+
+async def backfill_user_id():
+    """Add user_id to history_by_date documents that don't have it"""
+    print("🔄 Backfilling user_id on history_by_date...")
+
+    db = get_database()
+
+    count_without_field = await db.history_by_date.count_documents({"user_id": {"$exists": False}})
+    if count_without_field == 0:
+        print("✅ All history_by_date documents already have user_id")
+        return 0
+
+    print(f"📊 Found {count_without_field} documents without user_id")
+
+    updated = 0
+    orphaned = 0
+    batch = []
+    cursor = db.history_by_date.find({"user_id": {"$exists": False}}, {"vocab_id": 1})
+    async for history in cursor:
+        batch.append(history)
+        if len(batch) >= BATCH_SIZE:
+            batch_updated, batch_orphaned = await backfill_batch(db, batch)
+            updated += batch_updated
+            orphaned += batch_orphaned
+            batch = []
+            print(f"   ... {updated} updated")
+
+    if batch:
+        batch_updated, batch_orphaned = await backfill_batch(db, batch)
+        updated += batch_updated
+        orphaned += batch_orphaned
+
+    print(f"✅ Backfilled user_id on {updated} documents")
+    if orphaned:
+        print(f"   ⚠️ Skipped {orphaned} rows whose vocab or collection no longer exists")
+    return updated
+
+async def create_user_study_date_index():
+    """Create the (user_id, study_date desc, _id desc) index"""
+    print("🔄 Creating user_id index...")
+
+    db = get_database()
+    index = IndexModel([("user_id", ASCENDING), ("study_date", DESCENDING), ("_id", DESCENDING)], name="user_study_date_id_compound")
+
+    try:
+        await db.history_by_date.create_indexes([index])
+        print("✅ user_study_date_id_compound")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create index user_study_date_id_compound: {e}")
+        return False
+
+async def main():
+    """Run the user_id migration"""
+    print("🚀 Starting history_by_date user_id Migration")
+    print("="*60)
+
+    try:
+        print("🔄 Connecting to database...")
+        await connect_to_mongo()
+        print("✅ Database connected successfully")
+
+        # Step 1: Backfill user_id
+        await backfill_user_id()
+
+        # Step 2: Create the index
+        index_success = await create_user_study_date_index()
+
+        if index_success:
+            print("\n✅ Migration completed successfully!")
+            return 0
+        else:
+            print("\n❌ Migration completed with errors.")
+            return 1
+
+    except Exception as e:
+        print(f"\n❌ Migration failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        print("🔄 Closing database connection...")
+        await close_mongo_connection()
+        print("✅ Database connection closed")
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,214 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: words_key for input_history
+
+This script:
+1. Backfills words_key (canonical key of the normalized word list) on input_history documents;
+   a document whose key another document of the user already holds (the unique index exists
+   and the app has stored the same word set again) is merged into that document
+2. Merges duplicate word sets of the same user (keeps the oldest, re-points saved paragraphs)
+3. Creates the unique (user_id, words_key) index used by find_by_exact_words
+
+Connects without the startup schema sync, so the index is only built in step 3.
+Safe to run multiple times, and while the app is running.
+"""
+
+import asyncio
+import sys
+import os
+from pymongo import IndexModel, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.database.connection import connect_to_mongo, get_database, close_mongo_connection
+from app.database.crud import make_words_key
+
+BATCH_SIZE = 1000
+
+async def merge_into(keeper_id, duplicate_ids) -> int:
+    """Re-point the saved paragraphs of duplicate_ids to keeper_id and delete them; returns paragraphs moved"""
+    db = get_database()
+    result = await db.saved_paragraph.update_many(
+        {"input_history_id": {"$in": duplicate_ids}},
+        {"$set": {"input_history_id": keeper_id}}
+    )
+    await db.input_history.delete_many({"_id": {"$in": duplicate_ids}})
+    return result.modified_count
+
+async def write_words_keys(operations, documents):
+    """
+    Apply a batch of words_key updates; returns (updated, merged)
+
+    documents[i] is (_id, user_id, words_key) of operations[i]. An update
+    rejected by the unique index (E11000) means another document of the user
+    holds the key: the document is merged into that one instead.
+    """
+    input_history = get_database().input_history
+    try:
+        result = await input_history.bulk_write(operations, ordered=False)
+        return result.modified_count, 0
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in write_errors):
+            raise
+        updated = e.details.get("nModified", 0)
+
+    merged = 0
+    for error in write_errors:
+        history_id, user_id, words_key = documents[error["index"]]
+        keeper = await input_history.find_one({"user_id": user_id, "words_key": words_key}, {"_id": 1})
+        if keeper is None:
+            # The holder was removed in the meantime: the key is free again
+            await input_history.update_one({"_id": history_id}, {"$set": {"words_key": words_key}})
+            updated += 1
+            continue
+        await merge_into(keeper["_id"], [history_id])
+        merged += 1
+    return updated, merged
+
+async def backfill_words_key():
+    """Add words_key to input_history documents that don't have it"""
+    print("🔄 Backfilling words_key on input_history...")
+
+    db = get_database()
+    input_history = db.input_history
+
+    count_without_field = await input_history.count_documents({"words_key": {"$exists": False}})
+    if count_without_field == 0:
+        print("✅ All input_history documents already have words_key")
+        return 0
+
+    print(f"📊 Found {count_without_field} documents without words_key")
+
+    updated = 0
+    merged = 0
+    skipped = 0
+    operations = []
+    documents = []
+    cursor = input_history.find({"words_key": {"$exists": False}}, {"words": 1, "user_id": 1})
+    async for history in cursor:
+        words_key = make_words_key(history.get("words", []))
+        if not words_key:
+            skipped += 1
+            continue
+
+        operations.append(UpdateOne({"_id": history["_id"]}, {"$set": {"words_key": words_key}}))
+        documents.append((history["_id"], history.get("user_id"), words_key))
+        if len(operations) >= BATCH_SIZE:
+            batch_updated, batch_merged = await write_words_keys(operations, documents)
+            updated += batch_updated
+            merged += batch_merged
+            operations = []
+            documents = []
+            print(f"   ... {updated} updated, {merged} merged")
+
+    if operations:
+        batch_updated, batch_merged = await write_words_keys(operations, documents)
+        updated += batch_updated
+        merged += batch_merged
+
+    print(f"✅ Backfilled words_key on {updated} documents")
+    if merged:
+        print(f"   🔀 Merged {merged} documents into a document already holding their words_key")
+    if skipped:
+        print(f"   ⚠️ Skipped {skipped} documents without any valid words")
+    return updated
+
+async def merge_duplicate_word_sets():
+    """Merge input_history documents of the same user with the same words_key"""
+    print("🔄 Merging duplicate word sets...")
+
+    input_history = get_database().input_history
+
+    pipeline = [
+        {"$match": {"words_key": {"$exists": True}}},
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {"user_id": "$user_id", "words_key": "$words_key"},
+            "ids": {"$push": "$_id"},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+
+    merged_groups = 0
+    removed_documents = 0
+    moved_paragraphs = 0
+    async for group in input_history.aggregate(pipeline, allowDiskUse=True):
+        keeper_id, duplicate_ids = group["ids"][0], group["ids"][1:]
+
+        # Re-point paragraphs of the duplicates to the oldest document
+        moved_paragraphs += await merge_into(keeper_id, duplicate_ids)
+        removed_documents += len(duplicate_ids)
+        merged_groups += 1
+
+    if merged_groups == 0:
+        print("✅ No duplicate word sets found")
+    else:
+        print(f"✅ Merged {merged_groups} duplicate word sets "
+              f"({removed_documents} documents removed, {moved_paragraphs} paragraphs re-pointed)")
+
+async def create_words_key_index():
+    """Create the unique (user_id, words_key) index"""
+    print("🔄 Creating words_key index...")
+
+    db = get_database()
+    index = IndexModel(
+        [("user_id", ASCENDING), ("words_key", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"words_key": {"$exists": True}},
+        name="user_words_key_unique"
+    )
+
+    try:
+        await db.input_history.create_indexes([index])
+        print("✅ user_words_key_unique")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create index user_words_key_unique: {e}")
+        return False
+
+async def main():
+    """Run the words_key migration"""
+    print("🚀 Starting input_history words_key Migration")
+    print("="*60)
+
+    try:
+        print("🔄 Connecting to database...")
+        # The startup schema sync would build the unique index before the duplicates are merged
+        settings.AUTO_SYNC_SCHEMA = False
+        await connect_to_mongo()
+        print("✅ Database connected successfully")
+
+        # Step 1: Backfill words_key
+        await backfill_words_key()
+
+        # Step 2: Merge duplicates so the unique index can be built
+        await merge_duplicate_word_sets()
+
+        # Step 3: Create the index
+        index_success = await create_words_key_index()
+
+        if index_success:
+            print("\n✅ Migration completed successfully!")
+            return 0
+        else:
+            print("\n❌ Migration completed with errors.")
+            return 1
+
+    except Exception as e:
+        print(f"\n❌ Migration failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        print("🔄 Closing database connection...")
+        await close_mongo_connection()
+        print("✅ Database connection closed")
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,255 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: vocab_norm for learned_vocabs
+
+This script:
+1. Backfills vocab_norm (stripped, lowercased vocab) on learned_vocabs documents; an
+   active document whose norm another active document of the collection already holds
+   (the unique index exists and the app has stored the word again) is merged into it
+2. Merges active duplicates within a collection (keeps the oldest, adds up usage_count,
+   re-points study history, soft-deletes the rest)
+3. Creates the unique (collection_id, vocab_norm) index used by the vocab lookups
+
+Connects without the startup schema sync, so the index is only built in step 3.
+Safe to run multiple times, and while the app is running.
+"""
+
+import asyncio
+import sys
+import os
+from datetime import datetime
+from pymongo import IndexModel, ASCENDING, UpdateOne
+from pymongo.errors import BulkWriteError
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.core.config import settings
+from app.database.connection import connect_to_mongo, get_database, close_mongo_connection
+from app.database.crud import normalize_vocab
+
+BATCH_SIZE = 1000
+
+async def merge_into(keeper_id, duplicate_ids, usage_count: int) -> int:
+    """
+    Add usage_count to keeper_id, re-point the study history of duplicate_ids
+    to it and soft-delete them; returns history entries moved
+    """
+    db = get_database()
+    now = datetime.utcnow()
+    await db.learned_vocabs.update_one(
+        {"_id": keeper_id},
+        {"$inc": {"usage_count": usage_count}, "$set": {"updated_at": now}}
+    )
+    result = await db.history_by_date.update_many(
+        {"vocab_id": {"$in": duplicate_ids}},
+        {"$set": {"vocab_id": keeper_id}}
+    )
+    await db.learned_vocabs.update_many(
+        {"_id": {"$in": duplicate_ids}},
+        {"$set": {"is_deleted": True, "deleted_at": now, "updated_at": now}}
+    )
+    return result.modified_count
+
+async def write_vocab_norms(operations, documents):
+    """
+    Apply a batch of vocab_norm updates; returns (updated, merged)
+
+    documents[i] is (_id, collection_id, vocab_norm, usage_count) of
+    operations[i]. An update rejected by the unique index (E11000) means an
+    active document of the collection holds the norm: the document is merged
+    into that one instead.
+    """
+    learned_vocabs = get_database().learned_vocabs
+    try:
+        result = await learned_vocabs.bulk_write(operations, ordered=False)
+        return result.modified_count, 0
+    except BulkWriteError as e:
+        write_errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != 11000 for error in write_errors):
+            raise
+        updated = e.details.get("nModified", 0)
+
+    merged = 0
+    for error in write_errors:
+        vocab_id, collection_id, vocab_norm, usage_count = documents[error["index"]]
+        keeper = await learned_vocabs.find_one(
+            {"collection_id": collection_id, "vocab_norm": vocab_norm, "is_deleted": False}, {"_id": 1}
+        )
+        if keeper is None:
+            # The holder was deleted in the meantime: the norm is free again
+            await learned_vocabs.update_one({"_id": vocab_id}, {"$set": {"vocab_norm": vocab_norm}})
+            updated += 1
+            continue
+        await merge_into(keeper["_id"], [vocab_id], usage_count)
+        # Soft-deleted now, so out of the unique index; keeps the next run from finding it again
+        await learned_vocabs.update_one({"_id": vocab_id}, {"$set": {"vocab_norm": vocab_norm}})
+        merged += 1
+    return updated, merged
+
+async def backfill_vocab_norm():
+    """Add vocab_norm to learned_vocabs documents that don't have it"""
+    print("🔄 Backfilling vocab_norm on learned_vocabs...")
+
+    db = get_database()
+    learned_vocabs = db.learned_vocabs
+
+    count_without_field = await learned_vocabs.count_documents({"vocab_norm": {"$exists": False}})
+    if count_without_field == 0:
+        print("✅ All learned_vocabs documents already have vocab_norm")
+        return 0
+
+    print(f"📊 Found {count_without_field} documents without vocab_norm")
+
+    updated = 0
+    merged = 0
+    skipped = 0
+    operations = []
+    documents = []
+    cursor = learned_vocabs.find(
+        {"vocab_norm": {"$exists": False}}, {"vocab": 1, "collection_id": 1, "usage_count": 1}
+    )
+    async for vocabs_entry in cursor:
+        vocab_norm = normalize_vocab(vocabs_entry.get("vocab"))
+        if not vocab_norm:
+            skipped += 1
+            continue
+
+        operations.append(UpdateOne({"_id": vocabs_entry["_id"]}, {"$set": {"vocab_norm": vocab_norm}}))
+        documents.append((
+            vocabs_entry["_id"], vocabs_entry.get("collection_id"), vocab_norm,
+            vocabs_entry.get("usage_count", 1)
+        ))
+        if len(operations) >= BATCH_SIZE:
+            batch_updated, batch_merged = await write_vocab_norms(operations, documents)
+            updated += batch_updated
+            merged += batch_merged
+            operations = []
+            documents = []
+            print(f"   ... {updated} updated, {merged} merged")
+
+    if operations:
+        batch_updated, batch_merged = await write_vocab_norms(operations, documents)
+        updated += batch_updated
+        merged += batch_merged
+
+    print(f"✅ Backfilled vocab_norm on {updated} documents")
+    if merged:
+        print(f"   🔀 Merged {merged} documents into a document already holding their vocab_norm")
+    if skipped:
+        print(f"   ⚠️ Skipped {skipped} documents without a valid vocab")
+    return updated
+
+async def merge_duplicate_vocabs():
+    """Merge active learned_vocabs documents of the same collection with the same vocab_norm"""
+    print("🔄 Merging duplicate vocabularies...")
+
+    db = get_database()
+    learned_vocabs = db.learned_vocabs
+    history_by_date = db.history_by_date
+
+    pipeline = [
+        {"$match": {"vocab_norm": {"$exists": True}, "is_deleted": False}},
+        {"$sort": {"created_at": 1}},
+        {"$group": {
+            "_id": {"collection_id": "$collection_id", "vocab_norm": "$vocab_norm"},
+            "ids": {"$push": "$_id"},
+            "usage_count": {"$sum": {"$ifNull": ["$usage_count", 1]}},
+            "count": {"$sum": 1}
+        }},
+        {"$match": {"count": {"$gt": 1}}}
+    ]
+
+    merged_groups = 0
+    removed_documents = 0
+    moved_history = 0
+    async for group in learned_vocabs.aggregate(pipeline, allowDiskUse=True):
+        keeper_id, duplicate_ids = group["ids"][0], group["ids"][1:]
+        now = datetime.utcnow()
+
+        await learned_vocabs.update_one(
+            {"_id": keeper_id},
+            {"$set": {"usage_count": group["usage_count"], "updated_at": now}}
+        )
+
+        # Re-point study history of the duplicates to the oldest document
+        result = await history_by_date.update_many(
+            {"vocab_id": {"$in": duplicate_ids}},
+            {"$set": {"vocab_id": keeper_id}}
+        )
+        moved_history += result.modified_count
+
+        result = await learned_vocabs.update_many(
+            {"_id": {"$in": duplicate_ids}},
+            {"$set": {"is_deleted": True, "deleted_at": now, "updated_at": now}}
+        )
+        removed_documents += result.modified_count
+        merged_groups += 1
+
+    if merged_groups == 0:
+        print("✅ No duplicate vocabularies found")
+    else:
+        print(f"✅ Merged {merged_groups} duplicate vocabularies "
+              f"({removed_documents} documents soft-deleted, {moved_history} history entries re-pointed)")
+
+async def create_vocab_norm_index():
+    """Create the unique (collection_id, vocab_norm) index"""
+    print("🔄 Creating vocab_norm index...")
+
+    db = get_database()
+    index = IndexModel(
+        [("collection_id", ASCENDING), ("vocab_norm", ASCENDING)],
+        unique=True,
+        partialFilterExpression={"is_deleted": False, "vocab_norm": {"$exists": True}},
+        name="collection_vocab_norm_unique"
+    )
+
+    try:
+        await db.learned_vocabs.create_indexes([index])
+        print("✅ collection_vocab_norm_unique")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create index collection_vocab_norm_unique: {e}")
+        return False
+
+async def main():
+    """Run the vocab_norm migration"""
+    print("🚀 Starting learned_vocabs vocab_norm Migration")
+    print("="*60)
+
+    try:
+        print("🔄 Connecting to database...")
+        # The startup schema sync would build the unique index before the duplicates are merged
+        settings.AUTO_SYNC_SCHEMA = False
+        await connect_to_mongo()
+        print("✅ Database connected successfully")
+
+        # Step 1: Backfill vocab_norm
+        await backfill_vocab_norm()
+
+        # Step 2: Merge duplicates so the unique index can be built
+        await merge_duplicate_vocabs()
+
+        # Step 3: Create the index
+        index_success = await create_vocab_norm_index()
+
+        if index_success:
+            print("\n✅ Migration completed successfully!")
+            return 0
+        else:
+            print("\n❌ Migration completed with errors.")
+            return 1
+
+    except Exception as e:
+        print(f"\n❌ Migration failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        print("🔄 Closing database connection...")
+        await close_mongo_connection()
+        print("✅ Database connection closed")
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""
+Database Migration Script: user_id for saved_paragraph
+
+This script:
+1. Backfills user_id on saved_paragraph documents from their input_history owner
+2. Creates the (user_id, created_at desc, _id desc) index used by /all-paragraphs
+
+Paragraphs whose input history no longer exists are reported and left unchanged
+(they were already invisible to /all-paragraphs).
+
+Safe to run multiple times.
+"""
+
+import asyncio
+import sys
+import os
+from pymongo import IndexModel, ASCENDING, DESCENDING, UpdateOne
+
+# Add the app directory to the Python path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.database.connection import connect_to_mongo, get_database, close_mongo_connection
+
+BATCH_SIZE = 1000
+
+async def backfill_batch(db, paragraphs):
+    """Set user_id on one batch of paragraphs; returns (updated, orphaned)"""
+    history_ids = list({paragraph["input_history_id"] for paragraph in paragraphs})
+    owners = {
+        history["_id"]: history["user_id"]
+        async for history in db.input_history.find({"_id": {"$in": history_ids}}, {"user_id": 1})
+    }
+
+    operations = []
+    orphaned = 0
+    for paragraph in paragraphs:
+        owner = owners.get(paragraph["input_history_id"])
+        if owner is None:
+            orphaned += 1
+            continue
+        operations.append(UpdateOne({"_id": paragraph["_id"]}, {"$set": {"user_id": owner}}))
+
+    if not operations:
+        return 0, orphaned
+    result = await db.saved_paragraph.bulk_write(operations, ordered=False)
+    return result.modified_count, orphaned
+
+async def backfill_user_id():
+    """Add user_id to saved_paragraph documents that don't have it"""
+    print("🔄 Backfilling user_id on saved_paragraph...")
+
+    db = get_database()
+
+    count_without_field = await db.saved_paragraph.count_documents({"user_id": {"$exists": False}})
+    if count_without_field == 0:
+        print("✅ All saved_paragraph documents already have user_id")
+        return 0
+
+    print(f"📊 Found {count_without_field} documents without user_id")
+
+    updated = 0
+    orphaned = 0
+    batch = []
+    cursor = db.saved_paragraph.find({"user_id": {"$exists": False}}, {"input_history_id": 1})
+    async for paragraph in cursor:
+        batch.append(paragraph)
+        if len(batch) >= BATCH_SIZE:
+            batch_updated, batch_orphaned = await backfill_batch(db, batch)
+            updated += batch_updated
+            orphaned += batch_orphaned
+            batch = []
+            print(f"   ... {updated} updated")
+
+    if batch:
+        batch_updated, batch_orphaned = await backfill_batch(db, batch)
+        updated += batch_updated
+        orphaned += batch_orphaned
+
+    print(f"✅ Backfilled user_id on {updated} documents")
+    if orphaned:
+        print(f"   ⚠️ Skipped {orphaned} paragraphs whose input history no longer exists")
+    return updated
+
+async def create_user_created_index():
+    """Create the (user_id, created_at desc, _id desc) index"""
+    print("🔄 Creating user_id index...")
+
+    db = get_database()
+    index = IndexModel([("user_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)], name="user_created_id_compound")
+
+    try:
+        await db.saved_paragraph.create_indexes([index])
+        print("✅ user_created_id_compound")
+        return True
+    except Exception as e:
+        print(f"❌ Failed to create index user_created_id_compound: {e}")
+        return False
+
+async def main():
+    """Run the user_id migration"""
+    print("🚀 Starting saved_paragraph user_id Migration")
+    print("="*60)
+
+    try:
+        print("🔄 Connecting to database...")
+        await connect_to_mongo()
+        print("✅ Database connected successfully")
+
+        # Step 1: Backfill user_id
+        await backfill_user_id()
+
+        # Step 2: Create the index
+        index_success = await create_user_created_index()
+
+        if index_success:
+            print("\n✅ Migration completed successfully!")
+            return 0
+        else:
+            print("\n❌ Migration completed with errors.")
+            return 1
+
+    except Exception as e:
+        print(f"\n❌ Migration failed with error: {e}")
+        import traceback
+        traceback.print_exc()
+        return 1
+    finally:
+        print("🔄 Closing database connection...")
+        await close_mongo_connection()
+        print("✅ Database connection closed")
+
+if __name__ == "__main__":
+    exit_code = asyncio.run(main())
+    sys.exit(exit_code)
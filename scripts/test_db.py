@@ -63,7 +63,7 @@ async def test_database():
             paragraph="This is a test paragraph containing hello, world, and test words."
         )
         
-        paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data)
+        paragraph = await saved_paragraph_crud.create_saved_paragraph(paragraph_data, str(history.user_id))
         print(f"✓ Created saved paragraph: {paragraph.paragraph[:50]}...")
         
         # Get paragraphs by input history
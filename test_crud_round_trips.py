@@ -0,0 +1,176 @@
+"""
+Test script for CRUD write-path round trips
+
+Counts the commands each create/update method sends to MongoDB (with a
+pymongo CommandListener) and checks that every one of them is a single
+round trip: creates build the returned model from the inserted document,
+updates use find_one_and_update with ReturnDocument.AFTER. Also checks the
+Google login upsert and default-collection steps, that paragraph groups
+come back capped at paragraphs_per_group, and that batch study events with
+a "Z" / offset study_date are returned as recorded.
+
+Runs against MONGODB_URL in a throwaway database that is dropped afterwards.
+
+Usage:
+    python test_crud_round_trips.py
+"""
+
+import asyncio
+import os
+from datetime import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.api.v1.routes import _parse_study_date
+from app.core.config import settings
+from app.database import connection
+from app.database.crud import (
+    get_user_crud, get_refresh_token_crud, get_input_history_crud, get_saved_paragraph_crud,
+    get_learned_vocabs_crud, get_vocab_collection_crud, get_history_by_date_crud,
+    get_user_feedback_crud
+)
+from app.database.models import (
+    UserCreate, UserUpdate, GoogleUserCreate, RefreshTokenCreate, InputHistoryCreateInternal, SavedParagraphCreate,
+    LearnedVocabsCreateInternal, VocabCollectionCreate, HistoryByDateCreate, UserFeedbackCreate
+)
+
+# Driver housekeeping, not part of the CRUD call
+IGNORED_COMMANDS = {"endSessions", "killCursors"}
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.commands = []
+
+    def started(self, event):
+        if event.command_name not in IGNORED_COMMANDS:
+            self.commands.append(event.command_name)
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+async def round_trips(counter, description, coro):
+    """Await a CRUD call and check it took exactly one command"""
+    counter.commands = []
+    result = await coro
+    check(f"{description}: {len(counter.commands)} round trip(s) {counter.commands}", len(counter.commands) == 1)
+    return result
+
+async def main():
+    print("🧪 Testing CRUD round trips\n")
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[counter])
+    db_name = f"test_crud_round_trips_{os.getpid()}"
+    connection.mongodb.client = client
+    connection.mongodb.database = client[db_name]
+
+    try:
+        print("TEST 1: Create methods")
+        user = await round_trips(counter, "create_user", get_user_crud().create_user(
+            UserCreate(name="Round Trip", email="round.trip@example.com", password="secret123")))
+        check("Created user has an id", user.id is not None)
+        user_id = str(user.id)
+
+        await round_trips(counter, "create_refresh_token", get_refresh_token_crud().create_refresh_token(
+            RefreshTokenCreate(user_id=user_id, refresh_token="round-trip-token")))
+        history = await round_trips(counter, "create_input_history", get_input_history_crud().create_input_history(
+            InputHistoryCreateInternal(user_id=user_id, words=["apple", "banana"])))
+        await round_trips(counter, "create_saved_paragraph", get_saved_paragraph_crud().create_saved_paragraph(
+            SavedParagraphCreate(input_history_id=str(history.id), paragraph="An apple and a banana."), user_id))
+        collection = await round_trips(counter, "create_vocab_collection", get_vocab_collection_crud().create_vocab_collection(
+            VocabCollectionCreate(name="Fruits", user_id=user_id)))
+        vocab = await round_trips(counter, "create_learned_vocabs", get_learned_vocabs_crud().create_learned_vocabs(
+            LearnedVocabsCreateInternal(vocab="apple", collection_id=str(collection.id))))
+        check("Created vocab matches the stored document",
+              (await connection.mongodb.database.learned_vocabs.find_one({"_id": ObjectId(str(vocab.id))}))["vocab"] == "apple")
+        await round_trips(counter, "create_history_by_date", get_history_by_date_crud().create_history_by_date(
+            HistoryByDateCreate(vocab_id=str(vocab.id), study_date=datetime.utcnow())))
+        await round_trips(counter, "create_feedback", get_user_feedback_crud().create_feedback(
+            UserFeedbackCreate(email="round.trip@example.com", message="Works")))
+
+        print("\nTEST 2: Update methods")
+        updated = await round_trips(counter, "update_user", get_user_crud().update_user(user_id, UserUpdate(name="Renamed")))
+        check("update_user returns the updated document", updated.name == "Renamed")
+        updated = await round_trips(counter, "update_selected_collection",
+                                    get_user_crud().update_selected_collection(user_id, str(collection.id)))
+        check("update_selected_collection returns the updated document", updated.selected_collection_id == str(collection.id))
+        updated = await round_trips(counter, "update_vocab_collection",
+                                    get_vocab_collection_crud().update_vocab_collection(str(collection.id), "Fruit"))
+        check("update_vocab_collection returns the updated document", updated.name == "Fruit")
+        updated = await round_trips(counter, "increment_usage_count",
+                                    get_learned_vocabs_crud().increment_usage_count(str(vocab.id)))
+        check("increment_usage_count returns the incremented count", updated.usage_count == 2)
+        updated = await round_trips(counter, "update_learned_vocabs",
+                                    get_learned_vocabs_crud().update_learned_vocabs(str(vocab.id), "Apple"))
+        check("update_learned_vocabs returns the updated document", updated.vocab == "Apple")
+        missing = await round_trips(counter, "update_vocab_collection (missing id)",
+                                    get_vocab_collection_crud().update_vocab_collection(str(ObjectId()), "None"))
+        check("Updating a missing document returns None", missing is None)
+
+        print("\nTEST 3: Google login pipeline")
+        google_user = GoogleUserCreate(google_id="round-trip-google", name="Google", email="google.trip@example.com")
+        user, created = await round_trips(counter, "upsert_google_user (new)", get_user_crud().upsert_google_user(google_user))
+        check("New user reported as created", created)
+        counter.commands = []
+        user = await get_user_crud().ensure_selected_collection(user, created)
+        check(f"ensure_selected_collection (new): insert, then claim {counter.commands}",
+              counter.commands == ["insert", "findAndModify"])
+        user, created = await round_trips(counter, "upsert_google_user (returning)", get_user_crud().upsert_google_user(google_user))
+        check("Returning user keeps the selected collection", not created and user.selected_collection_id is not None)
+        # The unique index schema sync creates; it is what makes concurrent upserts converge
+        await connection.mongodb.database.users.create_index(
+            [("google_id", 1), ("auth_type", 1)], unique=True, partialFilterExpression={"google_id": {"$type": "string"}})
+        results = await asyncio.gather(*(get_user_crud().upsert_google_user(
+            GoogleUserCreate(google_id="two-tabs", name="Tabs", email="two.tabs@example.com")) for _ in range(2)))
+        check("Concurrent first logins create one user",
+              len({str(u.id) for u, _ in results}) == 1 and [c for _, c in results].count(True) == 1)
+
+        print("\nTEST 4: Paragraph groups are capped")
+        saved_paragraph_crud = get_saved_paragraph_crud()
+        for i in range(5):
+            await saved_paragraph_crud.create_saved_paragraph(
+                SavedParagraphCreate(input_history_id=str(history.id), paragraph=f"Paragraph {i}"), user_id)
+        groups = await saved_paragraph_crud.get_user_paragraph_groups(user_id, limit=10, paragraphs_per_group=2)
+        group = next(g for g in groups if str(g["_id"]) == str(history.id))
+        check("Group counts every paragraph", group["total_paragraphs"] == 6)
+        check(f"Group returns paragraphs_per_group texts, newest first {group['paragraphs']}",
+              group["paragraphs"] == ["Paragraph 4", "Paragraph 3"])
+
+        print("\nTEST 5: Batch study events with UTC and offset dates")
+        check("'Z' date parsed as naive UTC",
+              _parse_study_date("2024-03-10T08:30:00Z") == datetime(2024, 3, 10, 8, 30))
+        check("Offset date converted to the UTC day",
+              _parse_study_date("2024-03-10T01:00:00+07:00") == datetime(2024, 3, 9, 18, 0))
+        events = [
+            (str(vocab.id), _parse_study_date("2024-03-10T08:30:00Z")),
+            (str(vocab.id), _parse_study_date("2024-03-10T21:00:00Z")),
+            (str(vocab.id), _parse_study_date("2024-03-10T01:00:00+07:00")),
+        ]
+        recorded = await get_history_by_date_crud().record_study_events(events, user_id=user_id)
+        by_day = {history.study_date: history.count for history in recorded}
+        check(f"Every touched day is returned {by_day}",
+              by_day == {datetime(2024, 3, 10): 2, datetime(2024, 3, 9): 1})
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Test script for the paragraph generation cache
+
+This script tests (offline, no server or database required):
+1. Cache keys ignore vocabulary order, casing and duplicates
+2. Cache keys change when a request field changes
+3. TTL expiry of the in-memory backend
+4. LRU eviction of the in-memory backend
+5. Hit/miss counters
+6. A backend missing part of the interface cannot be constructed
+
+Usage:
+    python test_generation_cache.py
+"""
+
+import asyncio
+
+from app.services.generation_cache import (
+    CacheBackend, GenerationCache, InMemoryCacheBackend, make_cache_key
+)
+
+BASE_REQUEST = {
+    "language": "English",
+    "level": "B1",
+    "vocabularies": ["apple", "Banana", "cherry"],
+    "length": 50,
+    "tone": "friendly",
+    "topic": "food",
+    "model": "gemini:gemini-2.5-flash"
+}
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+def test_key_normalization():
+    print("TEST 1: Key normalization")
+    key = make_cache_key(**BASE_REQUEST)
+    reordered = dict(BASE_REQUEST, vocabularies=["cherry ", "banana", "APPLE", "apple"], language=" english")
+    check("Same key for reordered / re-cased / duplicated vocabularies", key == make_cache_key(**reordered))
+
+def test_key_sensitivity():
+    print("\nTEST 2: Key sensitivity")
+    key = make_cache_key(**BASE_REQUEST)
+    for field, value in [("level", "C1"), ("length", 80), ("tone", "formal"), ("topic", "sport"),
+                         ("model", "openai:gpt-3.5-turbo"), ("vocabularies", ["apple", "banana"])]:
+        check(f"Different key when '{field}' changes", key != make_cache_key(**dict(BASE_REQUEST, **{field: value})))
+    check("Different key when an extra prompt is given", key != make_cache_key(prompt="use past tense", **BASE_REQUEST))
+
+async def test_ttl_expiry():
+    print("\nTEST 3: TTL expiry")
+    backend = InMemoryCacheBackend(max_entries=10, ttl_seconds=0.05)
+    await backend.set("k", "value")
+    check("Entry is returned before it expires", await backend.get("k") == "value")
+    await asyncio.sleep(0.1)
+    check("Entry is gone after it expires", await backend.get("k") is None)
+
+async def test_lru_eviction():
+    print("\nTEST 4: LRU eviction")
+    backend = InMemoryCacheBackend(max_entries=2, ttl_seconds=60)
+    await backend.set("a", "1")
+    await backend.set("b", "2")
+    await backend.get("a")  # "a" becomes most recently used
+    await backend.set("c", "3")
+    check("Least recently used entry was evicted", await backend.get("b") is None)
+    check("Recently used entry was kept", await backend.get("a") == "1")
+    check("Eviction counter incremented", backend.evictions == 1)
+
+async def test_counters():
+    print("\nTEST 5: Hit/miss counters")
+    cache = GenerationCache(InMemoryCacheBackend(max_entries=10, ttl_seconds=60))
+    key = make_cache_key(**BASE_REQUEST)
+    await cache.get(key)
+    await cache.set(key, "generated text")
+    await cache.get(key)
+    await cache.get(key)
+    stats = cache.stats()
+    check("1 miss recorded", stats["misses"] == 1)
+    check("2 hits recorded", stats["hits"] == 2)
+    check("Hit ratio reported", stats["hit_ratio"] == round(2 / 3, 4))
+
+def test_incomplete_backend():
+    print("\nTEST 6: Backend interface")
+
+    class GetOnlyBackend(CacheBackend):
+        async def get(self, key):
+            return None
+
+    try:
+        GetOnlyBackend()
+        constructed = True
+    except TypeError:
+        constructed = False
+    check("Backend without set/clear fails at construction", not constructed)
+
+async def main():
+    print("🧪 Testing generation cache\n")
+    test_key_normalization()
+    test_key_sensitivity()
+    await test_ttl_expiry()
+    await test_lru_eviction()
+    await test_counters()
+    test_incomplete_backend()
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 """
-Test Google user creation with random password
+Test Google user creation with an unusable password
 """
 import asyncio
 import sys
@@ -35,15 +35,20 @@ async def test_google_user_creation():
         user_crud = get_user_crud()
         print("✅ UserCRUD instance created")
         
-        # Test password generation
-        random_password = user_crud.generate_random_password()
-        print(f"✅ Random password generated: {random_password[:5]}... (length: {len(random_password)})")
+        # Test the unusable password stored for OAuth users
+        from app.core.security import make_unusable_password, is_password_usable
+        unusable_password = make_unusable_password()
+        assert not is_password_usable(unusable_password)
+        assert not await user_crud.verify_password(unusable_password, unusable_password)
+        print(f"✅ Unusable password generated (length: {len(unusable_password)}) and never verifies")
         
         # Test password hashing
-        hashed_password = user_crud.hash_password(random_password)
+        random_password = user_crud.generate_random_password()
+        hashed_password = await user_crud.hash_password(random_password)
+        assert await user_crud.verify_password(random_password, hashed_password)
         print(f"✅ Password hashed successfully (length: {len(hashed_password)})")
         
-        print("🎉 All tests passed! Ready to create Google users with random passwords.")
+        print("🎉 All tests passed! Ready to create Google users with unusable passwords.")
         
     except Exception as e:
         print(f"💥 Error: {type(e).__name__}: {str(e)}")
@@ -0,0 +1,140 @@
+"""
+Test script for keyset pagination helpers
+
+Pages through an in-memory list the same way the list endpoints page through
+MongoDB (range filter on (sort_key, _id), limit + 1 fetch) and checks that:
+1. Cursors round-trip datetimes and ObjectIds
+2. Walking forward with next_cursor visits every item exactly once, ties included
+3. Walking back with prev_cursor returns the previous page
+4. Sort keys spanning several fields (e.g. usage_count, created_at) page correctly
+5. Malformed cursors and after + before are rejected
+
+No database needed.
+
+Usage:
+    python test_keyset_pagination.py
+"""
+
+from datetime import datetime, timedelta
+
+from bson import ObjectId
+from pymongo import ASCENDING, DESCENDING
+
+from app.database.pagination import (
+    InvalidCursorError, decode_cursor, encode_cursor, keyset_order, keyset_page, keyset_query
+)
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+def matches(document, range_filter):
+    """Evaluate a keyset_query range filter against a document"""
+    if not range_filter:
+        return True
+    for clause in range_filter["$or"]:
+        ok = True
+        for field, condition in clause.items():
+            if isinstance(condition, dict):
+                (operator, value), = condition.items()
+                ok = ok and (document[field] > value if operator == "$gt" else document[field] < value)
+            else:
+                ok = ok and document[field] == condition
+        if ok:
+            return True
+    return False
+
+def fetch(documents, direction, limit, after=None, before=None, sort_field="created_at"):
+    """Stand-in for a CRUD list method"""
+    range_filter, sort = keyset_query(sort_field, direction, after, before)
+    read_direction = sort[0][1]
+    selected = [document for document in documents if matches(document, range_filter)]
+    selected.sort(key=lambda d: tuple(d[field] for field, _ in sort), reverse=read_direction < 0)
+    return keyset_order(selected[:limit], before)
+
+def key(document):
+    return document["created_at"], document["_id"]
+
+def frequent_key(document):
+    return (document["usage_count"], document["created_at"]), document["_id"]
+
+def main():
+    print("🧪 Testing keyset pagination\n")
+    start = datetime(2024, 1, 1)
+    # Three documents per timestamp to exercise the _id tiebreak
+    documents = [{"_id": ObjectId(), "created_at": start + timedelta(minutes=i // 3)} for i in range(10)]
+
+    print("TEST 1: Cursor encoding")
+    value, document_id = decode_cursor(encode_cursor(documents[4]["created_at"], documents[4]["_id"]))
+    check("datetime and ObjectId round-trip", (value, document_id) == key(documents[4]))
+    check("Cursor is URL-safe", all(c.isalnum() or c in "-_" for c in encode_cursor(start, ObjectId())))
+
+    for direction, label in ((DESCENDING, "newest first"), (ASCENDING, "oldest first")):
+        print(f"\nTEST 2: Forward walk, {label}")
+        expected = sorted(documents, key=key, reverse=direction < 0)
+        pages = []
+        after = None
+        while True:
+            items = fetch(documents, direction, 4, after=after)
+            page, next_cursor, prev_cursor = keyset_page(items, 3, after, None, key)
+            pages.append(page)
+            if not next_cursor:
+                break
+            after = next_cursor
+        check("Every item visited once, in order", [d for page in pages for d in page] == expected)
+        check("Page sizes 3, 3, 3, 1", [len(page) for page in pages] == [3, 3, 3, 1])
+
+        print(f"\nTEST 3: Backward walk, {label}")
+        _, _, prev_cursor = keyset_page(fetch(documents, direction, 4, after=after), 3, after, None, key)
+        items = fetch(documents, direction, 4, before=prev_cursor)
+        page, next_cursor, prev_cursor = keyset_page(items, 3, None, prev_cursor, key)
+        check("prev_cursor returns the previous page", page == pages[-2])
+        check("Both cursors set in the middle", next_cursor is not None and prev_cursor is not None)
+        items = fetch(documents, direction, 4, before=encode_cursor(*key(pages[1][0])))
+        page, _, prev_cursor = keyset_page(items, 3, None, encode_cursor(*key(pages[1][0])), key)
+        check("First page has no prev_cursor", page == pages[0] and prev_cursor is None)
+
+    print("\nTEST 4: Multi-field sort key")
+    for i, document in enumerate(documents):
+        document["usage_count"] = i % 2
+    expected = sorted(documents, key=lambda d: (d["usage_count"], d["created_at"], d["_id"]), reverse=True)
+    visited = []
+    after = None
+    while True:
+        items = fetch(documents, DESCENDING, 4, after=after, sort_field=("usage_count", "created_at"))
+        page, after, _ = keyset_page(items, 3, after, None, frequent_key)
+        visited += page
+        if not after:
+            break
+    check("Every item visited once, in (usage_count, created_at) order", visited == expected)
+    try:
+        keyset_query(("usage_count", "created_at"), DESCENDING, after=encode_cursor(start, ObjectId()))
+        check("Cursor of another sort order rejected", False)
+    except InvalidCursorError:
+        check("Cursor of another sort order rejected", True)
+
+    print("\nTEST 5: Invalid input")
+    for cursor in ("garbage", "e30", encode_cursor(start, ObjectId())[:-4]):
+        try:
+            keyset_query("created_at", DESCENDING, after=cursor)
+            check(f"Rejected {cursor!r}", False)
+        except InvalidCursorError:
+            check(f"Rejected {cursor!r}", True)
+    try:
+        keyset_query("created_at", DESCENDING, after=encode_cursor(start, ObjectId()), before=encode_cursor(start, ObjectId()))
+        check("after + before rejected", False)
+    except InvalidCursorError:
+        check("after + before rejected", True)
+
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Test script for the queue-based logging pipeline
+
+Checks that:
+1. Records are written as JSON lines by the listener thread, with extra=
+   fields and formatted tracebacks
+2. Records below LOG_LEVEL never reach the queue
+3. RouteSampler keeps the configured fraction of the INFO records logged
+   while a route serves a request, keyed on the route rather than the
+   logging function, and never drops warnings
+4. A full queue drops records instead of blocking, and reports each drop
+
+No database needed.
+
+Usage:
+    python test_logging_pipeline.py
+"""
+
+import io
+import json
+import logging
+import queue
+
+from app.core.config import settings
+from app.utils import logging_conf
+from app.utils.logging_conf import DroppingQueueHandler, RouteSampler, current_route, parse_sample_rates
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+def record(name, level, func="helper"):
+    entry = logging.LogRecord(name, level, __file__, 1, "message %s", ("arg",), None)
+    entry.funcName = func
+    return entry
+
+def sampled(sampler, entry, route):
+    """Filter a record as if it was logged while `route` serves a request"""
+    token = current_route.set(route)
+    try:
+        return sampler.filter(entry)
+    finally:
+        current_route.reset(token)
+
+def main():
+    print("🧪 Testing logging pipeline\n")
+
+    print("TEST 1: JSON lines from the listener")
+    stream = io.StringIO()
+    settings.LOG_FORMAT = "json"
+    settings.LOG_LEVEL = "INFO"
+    settings.LOG_SAMPLE_RATES = ""
+    logging_conf.configure_logging(stream=stream, force=True)
+    logger = logging.getLogger("routes")
+    logger.info("Saved %s", "p1", extra={"user_id": "u1"})
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Failed")
+    logger.debug("Not written %s", "at INFO")
+    logging_conf.shutdown_logging()
+    lines = [json.loads(line) for line in stream.getvalue().splitlines()]
+    check("Two records written", len(lines) == 2)
+    check("Message merged with its arguments", lines[0]["message"] == "Saved p1")
+    check("extra= fields kept", lines[0].get("user_id") == "u1")
+    check("Traceback formatted into 'exception'", "ValueError: boom" in lines[1].get("exception", ""))
+
+    print("\nTEST 2: Level gating")
+    check("DEBUG record not written at INFO", all(line["message"] != "Not written at INFO" for line in lines))
+
+    print("\nTEST 3: Per-route sampling")
+    sampler = RouteSampler(parse_sample_rates("*=0, google_login=1"))
+    check("Rates parsed", sampler.rates == {"*": 0.0, "google_login": 1.0})
+    check("Route with rate 1 kept", sampled(sampler, record("routes", logging.INFO), "google_login"))
+    check("Other routes dropped by '*'", not sampled(sampler, record("routes", logging.INFO), "create_streak"))
+    check("Keyed on the route, not the logging function",
+          not sampled(sampler, record("routes", logging.INFO, "google_login"), "create_streak"))
+    check("Records outside a request fall under '*'", not sampled(sampler, record("routes", logging.INFO), None))
+    check("Warnings never sampled", sampled(sampler, record("routes", logging.WARNING), "create_streak"))
+    check("Non-route loggers never sampled", sampled(sampler, record("crud", logging.INFO), "create_streak"))
+    sampler = RouteSampler({"*": 0.25})
+    kept = sum(sampled(sampler, record("routes", logging.INFO), "create_streak") for _ in range(4000))
+    check(f"About a quarter kept ({kept}/4000)", 800 < kept < 1200)
+
+    print("\nTEST 4: Full queue")
+    handler = DroppingQueueHandler(queue.Queue(maxsize=2))
+    before = DroppingQueueHandler.dropped
+    reported = []
+    DroppingQueueHandler.on_drop = lambda: reported.append(1)
+    for _ in range(5):
+        handler.handle(record("routes", logging.INFO))
+    DroppingQueueHandler.on_drop = None
+    check("Queue holds its maximum", handler.queue.qsize() == 2)
+    check("Overflow counted as dropped", DroppingQueueHandler.dropped - before == 3)
+    check("Each drop reported to on_drop", len(reported) == 3)
+
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    main()
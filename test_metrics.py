@@ -0,0 +1,177 @@
+"""
+Test script for the Prometheus metrics
+
+Checks that:
+1. HTTP requests are labeled with their route template, not the raw path,
+   and unknown paths share one "unmatched" label
+2. The in-flight gauge is back to zero once requests finish
+3. The MongoDB command listener labels commands per collection and keeps
+   the collection and command labels, and its table of unfinished
+   commands, bounded
+4. LLM calls record latency, sizes and errors per provider, and nothing
+   with METRICS_ENABLED off
+5. /metrics serves the Prometheus text format
+6. Log records dropped by a full logging queue are counted
+
+No database or provider keys needed (the fake provider and synthetic
+driver events are used).
+
+Usage:
+    python test_metrics.py
+"""
+
+import asyncio
+import logging
+import queue
+from types import SimpleNamespace
+
+import httpx
+from prometheus_client import REGISTRY
+
+from app.core import metrics
+from app.core.config import settings
+from app.main import app
+from app.services.fake_client import FakeLLMClient
+from app.utils.logging_conf import DroppingQueueHandler
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+def sample(name, **labels):
+    return REGISTRY.get_sample_value(name, labels) or 0.0
+
+def command_event(name, command, request_id, connection_id=("localhost", 27017), duration_micros=1500):
+    return SimpleNamespace(
+        command_name=name, command=command, request_id=request_id,
+        connection_id=connection_id, duration_micros=duration_micros
+    )
+
+async def test_http():
+    print("TEST 1: Route labels")
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://metrics") as client:
+        await client.get("/api/v1/db/users/not-an-id")
+        await client.get("/api/v1/db/users/also-not-an-id")
+        await client.get("/no/such/path/123")
+        await client.get("/no/such/path/456")
+        exposition = await client.get("/metrics")
+
+    check("Both user lookups share the route template",
+          sample("http_requests_total", method="GET", route="/api/v1/db/users/{user_id}", status="400") == 2)
+    check("Unknown paths share the 'unmatched' label",
+          sample("http_requests_total", method="GET", route="unmatched", status="404") == 2)
+    check("Duration histogram recorded",
+          sample("http_request_duration_seconds_count", method="GET", route="/api/v1/db/users/{user_id}") == 2)
+    check("Raw paths never become labels",
+          b"not-an-id" not in exposition.content and b"/no/such/path" not in exposition.content)
+    check("/metrics is not timed itself", b'route="/metrics"' not in exposition.content)
+
+    print("\nTEST 2: In-flight gauge")
+    check("No request left in flight",
+          sample("http_requests_in_progress", method="GET", route="/api/v1/db/users/{user_id}") == 0)
+
+    print("\nTEST 5: Exposition format")
+    check("Served with the Prometheus content type",
+          exposition.headers["content-type"].startswith("text/plain"))
+    check("Contains the LLM and MongoDB families",
+          b"llm_request_duration_seconds" in exposition.content
+          and b"mongodb_command_duration_seconds" in exposition.content)
+
+def test_mongo_listener():
+    print("\nTEST 3: MongoDB command listener")
+    listener = metrics.MongoCommandMetrics(max_collections=2)
+
+    listener.started(command_event("find", {"find": "users", "filter": {}}, 1))
+    listener.succeeded(command_event("find", {}, 1))
+    check("find on users timed",
+          sample("mongodb_command_duration_seconds_count", collection="users", command="find") == 1)
+
+    listener.started(command_event("getMore", {"getMore": 42, "collection": "users"}, 2))
+    listener.succeeded(command_event("getMore", {}, 2))
+    check("getMore labeled with its collection, not the cursor id",
+          sample("mongodb_command_duration_seconds_count", collection="users", command="getMore") == 1)
+
+    listener.started(command_event("insert", {"insert": "streak"}, 3))
+    listener.failed(command_event("insert", {}, 3))
+    check("Failures counted",
+          sample("mongodb_command_failures_total", collection="streak", command="insert") == 1)
+
+    listener.started(command_event("find", {"find": "third_collection"}, 4))
+    listener.succeeded(command_event("find", {}, 4))
+    check("Collections past the limit share 'other'",
+          sample("mongodb_command_duration_seconds_count", collection="other", command="find") == 1)
+
+    listener.started(command_event("someNewCommand", {"someNewCommand": "users"}, 5))
+    listener.succeeded(command_event("someNewCommand", {}, 5))
+    check("Commands outside the allowlist share 'other'",
+          sample("mongodb_command_duration_seconds_count", collection="users", command="other") == 1)
+    check("No pending events left", not listener._pending)
+
+    listener = metrics.MongoCommandMetrics(max_pending=3)
+    for request_id in range(10, 15):
+        listener.started(command_event("find", {"find": "users"}, request_id))
+    check("Commands that never finish are bounded", len(listener._pending) == 3)
+    check("The oldest ones are forgotten first",
+          sorted(request_id for _, request_id in listener._pending) == [12, 13, 14])
+
+async def test_llm():
+    print("\nTEST 4: LLM provider metrics")
+    client = FakeLLMClient(latency=0.01, response="x" * 300)
+    await client.generate_text("p" * 500)
+    check("Generate latency recorded",
+          sample("llm_request_duration_seconds_count", provider="fake", operation="generate") == 1)
+    check("Prompt size recorded", sample("llm_prompt_chars_sum", provider="fake") == 500)
+    check("Response size recorded", sample("llm_response_chars_sum", provider="fake") == 300)
+
+    chunks = [chunk async for chunk in client.stream_text("p" * 100)]
+    check("Stream latency recorded",
+          sample("llm_request_duration_seconds_count", provider="fake", operation="stream") == 1)
+    check("Streamed size recorded", sample("llm_response_chars_sum", provider="fake") == 300 + len("".join(chunks)))
+
+    class FailingClient(FakeLLMClient):
+        async def _generate(self, prompt, max_output_tokens):
+            raise TimeoutError("provider timed out")
+
+    try:
+        await FailingClient().generate_text("prompt")
+    except TimeoutError:
+        pass
+    check("Errors counted per provider and exception type",
+          sample("llm_errors_total", provider="fake", error="TimeoutError") == 1)
+
+    before = sample("llm_request_duration_seconds_count", provider="fake", operation="generate")
+    settings.METRICS_ENABLED = False
+    try:
+        await client.generate_text("p" * 50)
+    finally:
+        settings.METRICS_ENABLED = True
+    check("Nothing recorded with METRICS_ENABLED off",
+          sample("llm_request_duration_seconds_count", provider="fake", operation="generate") == before)
+
+def test_dropped_logs():
+    print("\nTEST 6: Dropped log records")
+    handler = DroppingQueueHandler(queue.Queue(maxsize=1))
+    before = sample("log_records_dropped_total")
+    for _ in range(3):
+        handler.handle(logging.LogRecord("routes", logging.INFO, __file__, 1, "message", None, None))
+    check("Drops counted in log_records_dropped_total", sample("log_records_dropped_total") - before == 2)
+
+async def main():
+    print("🧪 Testing Prometheus metrics\n")
+    await test_http()
+    test_mongo_listener()
+    await test_llm()
+    test_dropped_logs()
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
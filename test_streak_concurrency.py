@@ -0,0 +1,102 @@
+"""
+Test script for concurrent streak updates
+
+Fires many StreakCRUD.create_streak calls for the same user and day at the
+same time and checks that:
+1. Exactly one document exists for the day (unique user_id + learned_date)
+2. No increment is lost (count == number of calls)
+3. is_qualify is set once the count reaches 5
+4. Each call is a single round trip (retries only on a lost insert race)
+
+Runs against MONGODB_URL in a throwaway database that is dropped afterwards.
+
+Usage:
+    python test_streak_concurrency.py [concurrency]
+"""
+
+import asyncio
+import os
+import sys
+from datetime import datetime
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
+
+from app.core.config import settings
+from app.database import connection
+from app.database.crud import get_streak_crud
+from app.database.migrations import auto_sync_schema
+from app.database.models import StreakCreateInternal
+
+class CommandCounter(monitoring.CommandListener):
+    def __init__(self):
+        self.find_and_modify = 0
+        self.other = 0
+
+    def started(self, event):
+        if event.command_name == "findAndModify":
+            self.find_and_modify += 1
+        elif event.command_name not in ("endSessions", "killCursors"):
+            self.other += 1
+
+    def succeeded(self, event):
+        pass
+
+    def failed(self, event):
+        pass
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+async def main(concurrency: int):
+    print(f"🧪 Testing {concurrency} concurrent streak updates\n")
+    counter = CommandCounter()
+    client = AsyncIOMotorClient(settings.MONGODB_URL, event_listeners=[counter])
+    db_name = f"test_streak_concurrency_{os.getpid()}"
+    connection.mongodb.client = client
+    connection.mongodb.database = client[db_name]
+
+    try:
+        # Build the unique (user_id, learned_date) index
+        await auto_sync_schema(connection.mongodb.database, update_validation=False)
+
+        streak_crud = get_streak_crud()
+        user_id = str(ObjectId())
+        learned_date = datetime.utcnow()
+        counter.find_and_modify = counter.other = 0
+
+        results = await asyncio.gather(*[
+            streak_crud.create_streak(StreakCreateInternal(user_id=user_id, learned_date=learned_date))
+            for _ in range(concurrency)
+        ])
+
+        documents = await connection.mongodb.database.streak.find({"user_id": ObjectId(user_id)}).to_list(None)
+        check(f"One document for the day (found {len(documents)})", len(documents) == 1)
+        check(f"No lost increments (count={documents[0]['count'] if documents else None})",
+              bool(documents) and documents[0]["count"] == concurrency)
+        check("is_qualify set", bool(documents) and documents[0]["is_qualify"] is (concurrency >= 5))
+
+        counts = sorted(streak.count for streak in results)
+        check("Every call saw a distinct count", counts == list(range(1, concurrency + 1)))
+
+        retries = counter.find_and_modify - concurrency
+        check(f"Single round trip per call ({counter.find_and_modify} findAndModify, {retries} insert-race retries)",
+              counter.other == 0 and 0 <= retries < concurrency)
+    finally:
+        await client.drop_database(db_name)
+        client.close()
+
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main(int(sys.argv[1]) if len(sys.argv) > 1 else 50))
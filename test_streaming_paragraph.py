@@ -0,0 +1,118 @@
+"""
+Test script for the streaming paragraph generation endpoint (SSE)
+
+This script tests (offline, against a scripted fake provider stream):
+1. Provider chunks are forwarded as "token" events
+2. A "paragraph" event is sent before the vocabulary explanations finish
+3. The final "result" event validates as ParagraphResponse
+4. Provider failures mid-stream become an "error" event
+5. Invalid requests are rejected before the stream starts
+
+Usage:
+    python test_streaming_paragraph.py
+"""
+
+import asyncio
+import json
+
+import httpx
+
+from app.main import app
+from app.api.v1 import routes, schemas
+from app.services.fake_client import FakeLLMClient
+from app.services.llm_registry import llm_registry
+
+SCRIPTED_CHUNKS = [
+    '{\n  "paragraph": "The **resil',
+    'ient** traveler packed',
+    ' light.",\n  "explain_vocabs": {\n',
+    '    "resilient": [{"phonetic_transcription": "/rɪˈzɪl.i.ənt/", "part_of_speech": "adjective"}]\n',
+    '  },\n  "explanation_in_paragraph": {"resilient": "able to recover quickly"}\n}',
+]
+
+REQUEST = {
+    "language": "English",
+    "vocabularies": ["resilient"],
+    "length": 20,
+    "level": "B2",
+    "use_cache": False
+}
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+def parse_sse(body: str):
+    """Parse an SSE body into a list of (event, data) tuples"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        event, data = None, None
+        for line in block.split("\n"):
+            if line.startswith("event: "):
+                event = line[len("event: "):]
+            elif line.startswith("data: "):
+                data = json.loads(line[len("data: "):])
+        events.append((event, data))
+    return events
+
+class FailingStreamClient(FakeLLMClient):
+    async def _stream(self, prompt, max_output_tokens):
+        yield '{"paragraph": "partial'
+        raise RuntimeError("provider connection reset")
+
+async def stream(client, body):
+    response = await client.post("/api/v1/generate-paragraph/stream", json=body)
+    return response, parse_sse(response.text) if response.status_code == 200 else []
+
+async def main():
+    print("🧪 Testing streaming paragraph generation\n")
+    app.dependency_overrides[routes.get_current_user] = lambda: {"user_id": "000000000000000000000000"}
+    transport = httpx.ASGITransport(app=app)
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        print("TEST 1-3: Scripted stream")
+        llm_registry.register("gemini", FakeLLMClient(latency=0, chunks=SCRIPTED_CHUNKS))
+        response, events = await stream(client, REQUEST)
+        names = [name for name, _ in events]
+
+        check("Content-Type is text/event-stream", response.headers["content-type"].startswith("text/event-stream"))
+        tokens = [data["text"] for name, data in events if name == "token"]
+        check("Every provider chunk forwarded as a token event", tokens == SCRIPTED_CHUNKS)
+
+        check("Exactly one paragraph event", names.count("paragraph") == 1)
+        if "paragraph" in names:
+            paragraph_index = names.index("paragraph")
+            tokens_before = names[:paragraph_index].count("token")
+            check("Paragraph event sent before the explanations finished", tokens_before < len(SCRIPTED_CHUNKS))
+            check("Paragraph text decoded", events[paragraph_index][1]["paragraph"] == "The **resilient** traveler packed light.")
+
+        check("Stream ends with a result event", names[-1] == "result")
+        final = schemas.ParagraphResponse(**events[-1][1])
+        check("Result validates as ParagraphResponse", final.status is True)
+        check("Result is the full concatenated text", final.result == "".join(SCRIPTED_CHUNKS))
+
+        print("\nTEST 4: Provider failure mid-stream")
+        llm_registry.register("gemini", FailingStreamClient(latency=0))
+        response, events = await stream(client, REQUEST)
+        check("Error event emitted", events[-1][0] == "error")
+        check("Error payload uses the route error shape", events[-1][1].get("error") == "paragraph_generation_failed")
+
+        print("\nTEST 5: Invalid requests")
+        response, _ = await stream(client, dict(REQUEST, vocabularies=[]))
+        check("Missing vocabularies -> 400", response.status_code == 400)
+        response, _ = await stream(client, dict(REQUEST, provider="unknown"))
+        check("Unknown provider -> 400", response.status_code == 400)
+
+    app.dependency_overrides.clear()
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,95 @@
+"""
+Test script for the verified-token cache
+
+Checks that VerifiedTokenCache:
+1. Returns cached claims for a token it has seen
+2. Drops entries once the token's exp has passed
+3. Evicts the least recently used entry when full
+4. Forgets tokens on revoke_token / revoke_user
+5. TokenRevocations rejects tokens issued before a user's logout
+
+No database needed.
+
+Usage:
+    python test_token_cache.py
+"""
+
+import time
+
+from app.services.token_cache import ACCESS_TOKEN_LIFETIME, TokenRevocations, VerifiedTokenCache
+
+passed = 0
+failed = 0
+
+def check(description, condition):
+    global passed, failed
+    if condition:
+        passed += 1
+        print(f"   ✅ {description}")
+    else:
+        failed += 1
+        print(f"   ❌ {description}")
+
+def claims(user_id, expires_in=3600):
+    return {"user_id": user_id, "email": f"{user_id}@example.com", "exp": int(time.time()) + expires_in}
+
+def main():
+    print("🧪 Testing verified-token cache\n")
+
+    print("TEST 1: Hits and misses")
+    cache = VerifiedTokenCache(max_entries=10)
+    check("Unknown token misses", cache.get("token-a") is None)
+    cache.put("token-a", claims("u1"))
+    check("Known token hits", cache.get("token-a")["user_id"] == "u1")
+    check("Token itself is not stored", all("token-a" not in key for key in cache._entries))
+    cache.put("token-b", {"user_id": "u1"})
+    check("Token without exp is not cached", cache.get("token-b") is None)
+
+    print("\nTEST 2: Expiry")
+    cache.put("token-c", claims("u2", expires_in=1))
+    check("Fresh entry hits", cache.get("token-c") is not None)
+    time.sleep(1.1)
+    check("Entry past exp misses", cache.get("token-c") is None)
+    check("Expired entry removed", cache.stats()["entries"] == 1)
+
+    print("\nTEST 3: LRU eviction")
+    cache = VerifiedTokenCache(max_entries=2)
+    cache.put("t1", claims("u1"))
+    cache.put("t2", claims("u2"))
+    cache.get("t1")
+    cache.put("t3", claims("u3"))
+    check("Least recently used entry evicted", cache.get("t2") is None)
+    check("Recently used entries kept", cache.get("t1") is not None and cache.get("t3") is not None)
+    check("Eviction counted", cache.stats()["evictions"] == 1)
+
+    print("\nTEST 4: Revocation")
+    cache = VerifiedTokenCache()
+    cache.put("t1", claims("u1"))
+    cache.put("t2", claims("u1"))
+    cache.put("t3", claims("u2"))
+    cache.revoke_token("t3")
+    check("revoke_token evicts one token", cache.get("t3") is None)
+    check("revoke_user evicts all tokens of the user", cache.revoke_user("u1") == 2)
+    check("Revoked tokens miss", cache.get("t1") is None and cache.get("t2") is None)
+    check("Cache empty", cache.stats()["entries"] == 0)
+
+    print("\nTEST 5: Revoked tokens are rejected")
+    revocations = TokenRevocations()
+    issued = time.time()
+    before_logout = dict(claims("u1"), iat=issued)
+    check("Nothing revoked yet", not revocations.is_revoked(before_logout))
+    revocations.revoke_user("u1", issued + 0.5)
+    check("Token issued before the logout is revoked", revocations.is_revoked(before_logout))
+    check("Token issued after the logout is accepted", not revocations.is_revoked(dict(claims("u1"), iat=issued + 0.6)))
+    check("Token without iat is revoked", revocations.is_revoked(claims("u1")))
+    check("Other users are not affected", not revocations.is_revoked(dict(claims("u2"), iat=issued)))
+    revocations.revoke_user("u1", issued - 10)
+    check("Cutoff never moves back", revocations.is_revoked(before_logout))
+    revocations.revoke_user("u3", issued - ACCESS_TOKEN_LIFETIME.total_seconds() - 1)
+    revocations.prune()
+    check("Cutoffs older than a token's lifetime are pruned", len(revocations) == 1)
+
+    print(f"\n📊 {passed} passed, {failed} failed")
+
+if __name__ == "__main__":
+    main()